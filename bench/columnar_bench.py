@@ -0,0 +1,104 @@
+"""
+Ürün kataloğu üzerinde fiyat/kategori özeti benchmark'ı: CSV ayrıştırma ile sütunlu Parquet okuma.
+
+feed_memory'deki sentetik feed'i üretir, urunayiklama.stream_to_csv ile CSV'leri ve Parquet dosyasını
+aynı geçişte yazar. Ardından grup başına ürün sayısı ve en düşük/en yüksek/ortalama fiyatı iki yoldan
+hesaplar:
+    csv     : dört UTF-8-BOM CSV okunur, "2699.99 TRY" dizeleri Decimal'e çevrilir
+    parquet : product_columns.price_summary; yalnızca grup ve fiyat sütunları okunur
+Her yol --repeat kez çalıştırılır, en iyi süre raporlanır. İki yolun sonuçları eşit değilse çıkış kodu 1.
+
+Kullanım:
+    python bench/columnar_bench.py --items 200000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import urunayiklama
+from feed_memory import generate_feed
+from product_columns import _CENT, iter_csv_products, parse_price, price_summary
+
+
+def csv_summary(csv_dir):
+    """price_summary'nin CSV'leri ayrıştırarak hesaplanan karşılığı"""
+    groups = {}
+    for group, row in iter_csv_products(csv_dir):
+        stats = groups.setdefault(group, {'products': 0, 'priced': 0, 'min': None, 'max': None, 'sum': 0})
+        stats['products'] += 1
+        price, _ = parse_price(row[3])
+        if price is None:
+            continue
+        stats['priced'] += 1
+        stats['sum'] += price
+        stats['min'] = price if stats['min'] is None else min(stats['min'], price)
+        stats['max'] = price if stats['max'] is None else max(stats['max'], price)
+    summary = [{
+        'group': group,
+        'products': stats['products'],
+        'priced': stats['priced'],
+        'min_price': stats['min'],
+        'max_price': stats['max'],
+        'mean_price': (stats['sum'] / stats['priced']).quantize(_CENT) if stats['priced'] else None,
+    } for group, stats in groups.items()]
+    summary.sort(key=lambda row: (-row['products'], row['group']))
+    return summary
+
+
+def best_of(repeat, function, *args):
+    """Returns: (sonuç, en iyi süre)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV ve Parquet üzerinde katalog özeti karşılaştırması")
+    parser.add_argument('--items', type=int, default=200_000, help="Sentetik feed'deki ürün sayısı")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feed_path = os.path.join(tmp, 'feed.xml')
+        generate_feed(feed_path, args.items)
+        output_dir = os.path.join(tmp, 'out')
+        parquet_path = os.path.join(output_dir, urunayiklama.PARQUET_FILE)
+        with contextlib.redirect_stdout(io.StringIO()), open(feed_path, 'rb') as f:
+            urunayiklama.stream_to_csv(f, output_dir, parquet_path=parquet_path)
+
+        csv_bytes = sum(os.path.getsize(os.path.join(output_dir, name))
+                        for name in os.listdir(output_dir) if name.endswith('.csv'))
+        from_csv, csv_seconds = best_of(args.repeat, csv_summary, output_dir)
+        from_parquet, parquet_seconds = best_of(args.repeat, price_summary, parquet_path)
+
+        failures = []
+        if from_csv != from_parquet:
+            failures.append("CSV ve Parquet özetleri farklı")
+        print(json.dumps({
+            'products': args.items,
+            'csv_mb': round(csv_bytes / 1e6, 1),
+            'parquet_mb': round(os.path.getsize(parquet_path) / 1e6, 1),
+            'csv_ms': round(csv_seconds * 1000, 1),
+            'parquet_ms': round(parquet_seconds * 1000, 1),
+            'speedup': round(csv_seconds / parquet_seconds, 1),
+            'summary': from_parquet,
+            'failures': failures,
+        }, indent=2, ensure_ascii=False, default=str))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
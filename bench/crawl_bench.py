@@ -0,0 +1,254 @@
+"""
+Crawler benchmark paketi.
+
+bench/mock_site.py ile yerel bir sahte site başlatır ve şu hatları ona karşı ayrı süreçlerde çalıştırır:
+    crawler  : crawler.SitemapCrawler (asyncio çekim + OutputWriter)
+    webcrawl : webcrawl.SitemapCrawler (çekim thread'leri + ayrıştırma süreç havuzu)
+    feed     : urunayiklama akış hattı (fetch_xml_stream + stream_to_csv)
+
+Her hat için saniyedeki sayfa (feed'de ürün) sayısı, aşama başına p50/p99 gecikme ve tepe RSS
+JSON olarak yazılır; farklı commit'lerin çıktıları karşılaştırılarak gerilemeler görülebilir.
+Aşama süreleri ilgili fonksiyonlar alt süreç içinde sarılarak ölçülür, kod değiştirilmez.
+Tepe RSS hattın ana sürecine aittir; webcrawl'ın ayrıştırma alt süreçleri dahil değildir.
+
+Kullanım:
+    python bench/crawl_bench.py --pages 500 --latency 0.02 --error-rate 0.01 --output bench.json
+    python bench/crawl_bench.py --targets crawler webcrawl --extractor lxml
+    python bench/crawl_bench.py --targets crawler webcrawl --capacity 8 --retry-after 1 --max-concurrency 32
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import io
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from feed_memory import peak_rss_mb
+from mock_site import MockSite
+
+TARGETS = ('crawler', 'webcrawl', 'feed')
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Sıralı listede en yakın sıra (nearest-rank) yüzdeliği"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+class StageTimer:
+    """Fonksiyonları sararak aşama başına çağrı sürelerini toplar"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def wrap(self, owner, name: str, stage: str) -> None:
+        func = getattr(owner, name)
+        samples = self.samples[stage]
+        if asyncio.iscoroutinefunction(func):
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    samples.append(time.perf_counter() - start)
+        else:
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    samples.append(time.perf_counter() - start)
+        setattr(owner, name, wrapper)
+
+    def wrap_pool(self, stage: str) -> None:
+        """
+        Süreç havuzuna gönderilen işlerin gönderimden tamamlanmaya kadar geçen süresini ölçer.
+        İş alt süreçte çalıştığı için süre havuz kuyruğunda bekleme dahil ana süreçte alınır.
+        """
+        submit = concurrent.futures.ProcessPoolExecutor.submit
+        samples = self.samples[stage]
+
+        def wrapper(pool, *args, **kwargs):
+            start = time.perf_counter()
+            future = submit(pool, *args, **kwargs)
+            future.add_done_callback(lambda _: samples.append(time.perf_counter() - start))
+            return future
+        concurrent.futures.ProcessPoolExecutor.submit = wrapper
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for stage, values in self.samples.items():
+            values = sorted(values)
+            result[stage] = {
+                'count': len(values),
+                'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+                'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+            }
+        return result
+
+
+def run_crawler(base_url: str, workdir: str, args, timer: StageTimer) -> Dict[str, int]:
+    import crawler
+    import sink
+    from fetcher import AsyncFetcher
+
+    timer.wrap(AsyncFetcher, 'fetch_response', 'fetch')
+    timer.wrap(crawler, 'extract_blog_post', 'extract')
+    timer.wrap(sink.OutputWriter, '_write', 'write')
+
+    instance = crawler.SitemapCrawler(output_path=workdir, concurrency=args.concurrency, rate_per_host=0,
+                                      extractor=args.extractor, max_concurrency=args.max_concurrency,
+                                      max_retries=args.retries)
+    instance.crawl_and_save(f'{base_url}/sitemap.xml')
+    counts = instance.frontier.counts()
+    return {'pages': counts.get('written', 0), 'failed': counts.get('failed', 0),
+            'concurrency_limit': instance.metrics.snapshot()['gauges'].get('concurrency_limit')}
+
+
+def run_webcrawl(base_url: str, workdir: str, args, timer: StageTimer) -> Dict[str, int]:
+    import sink
+    import webcrawl
+
+    timer.wrap(webcrawl.SitemapCrawler, 'fetch_page', 'fetch')
+    timer.wrap_pool('parse')
+    timer.wrap(sink.OutputWriter, '_write', 'write')
+
+    instance = webcrawl.SitemapCrawler(f'{base_url}/sitemap.xml', output_file=os.path.join(workdir, 'crawled.txt'),
+                                       max_workers=args.concurrency, delay=0, extractor=args.extractor,
+                                       max_concurrency=args.max_concurrency, max_retries=args.retries)
+    instance.crawl()
+    counts = instance.frontier.counts()
+    return {'pages': counts.get('written', 0), 'failed': counts.get('failed', 0),
+            'concurrency_limit': instance.metrics.snapshot()['gauges'].get('concurrency_limit')}
+
+
+def run_feed(base_url: str, workdir: str, args, timer: StageTimer) -> Dict[str, int]:
+    import urunayiklama
+
+    timer.wrap(urunayiklama, 'fetch_xml_stream', 'fetch')
+    timer.wrap(urunayiklama, 'parse_items', 'parse')
+    timer.wrap(urunayiklama.CsvSinks, 'write', 'write')
+
+    # urunayiklama.main ile aynı adımlar, URL ve çıktı dizini sahte siteye yönlendirilmiş halde
+    response = urunayiklama.fetch_xml_stream(f'{base_url}/feed.xml')
+    if response is None:
+        return {'pages': 0, 'failed': 1}
+    with response:
+        counts = urunayiklama.stream_to_csv(response.raw, workdir)
+    return {'pages': sum((counts or {}).values()), 'failed': 0 if counts is not None else 1}
+
+
+RUNNERS = {'crawler': run_crawler, 'webcrawl': run_webcrawl, 'feed': run_feed}
+
+
+def run_target(target: str, base_url: str, workdir: str, args) -> None:
+    """Alt süreç: tek bir hattı çalıştırır ve sonucu tek satır JSON olarak yazdırır"""
+    # Crawler'ların kendi basicConfig çağrıları etkisiz kalsın, URL başına loglar ölçümü bozmasın
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    timer = StageTimer()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = RUNNERS[target](base_url, workdir, args, timer)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'target': target,
+        'pages': result['pages'],
+        'failed': result['failed'],
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(result['pages'] / elapsed, 2) if elapsed else None,
+        'stages': timer.summary(),
+        'peak_rss_mb': peak_rss_mb(),
+        **({'concurrency_limit': result['concurrency_limit']} if result.get('concurrency_limit') else {}),
+    }))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sahte siteye karşı crawler benchmark'ı")
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=list(TARGETS))
+    parser.add_argument('--pages', type=int, default=200, help="Sahte sitedeki blog sayfası sayısı")
+    parser.add_argument('--feed-items', type=int, default=20000, help="Sahte feed'deki ürün sayısı")
+    parser.add_argument('--latency', type=float, default=0.01, help="İstek başına sabit gecikme (sn)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Gecikmeye eklenen en fazla rastgele süre (sn)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503 dönen blog sayfası oranı (0-1)")
+    parser.add_argument('--capacity', type=int, default=0,
+                        help="Sahte sitenin eşzamanlı istek kapasitesi, aşılınca 429 (0: sınırsız)")
+    parser.add_argument('--retry-after', type=int, default=None, help="429 yanıtlarındaki Retry-After (sn)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--concurrency', type=int, default=8, help="Eşzamanlı istek / çekim thread'i sayısı")
+    parser.add_argument('--max-concurrency', type=int, default=None,
+                        help="AIMD ile çıkılabilecek eşzamanlılık üst sınırı (verilmezse sabit)")
+    parser.add_argument('--retries', type=int, default=3, help="Geçici hatalarda yeniden deneme sayısı")
+    parser.add_argument('--extractor', choices=('soup', 'lxml'), default='soup')
+    parser.add_argument('--output', help="JSON raporun yazılacağı dosya (verilmezse stdout)")
+    parser.add_argument('--run', choices=TARGETS, help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_target(args.run, args.base_url, args.workdir, args)
+        return
+
+    config = {key: getattr(args, key) for key in
+              ('pages', 'feed_items', 'latency', 'jitter', 'error_rate', 'capacity', 'retry_after', 'seed',
+               'concurrency', 'max_concurrency', 'retries', 'extractor')}
+    results = []
+    with MockSite(pages=args.pages, feed_items=args.feed_items if 'feed' in args.targets else 0,
+                  latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed,
+                  capacity=args.capacity, retry_after=args.retry_after) as site, \
+            tempfile.TemporaryDirectory() as tmp:
+        for target in args.targets:
+            requests_before, errors_before, throttled_before = site.requests, site.errors, site.throttled
+            workdir = os.path.join(tmp, target)
+            os.makedirs(workdir)
+            print(f"# {target} çalışıyor...", file=sys.stderr)
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--run', target, '--base-url', site.base_url,
+                 '--workdir', workdir, '--concurrency', str(args.concurrency), '--extractor', args.extractor,
+                 '--retries', str(args.retries)]
+                + (['--max-concurrency', str(args.max_concurrency)] if args.max_concurrency else []),
+                cwd=workdir, capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(proc.stderr, file=sys.stderr)
+                results.append({'target': target, 'error': f"çıkış kodu {proc.returncode}"})
+                continue
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            result['server'] = {'requests': site.requests - requests_before,
+                                'injected_errors': site.errors - errors_before,
+                                'throttled': site.throttled - throttled_before}
+            results.append(result)
+
+    report = json.dumps({'commit': git_commit(), 'config': config, 'results': results}, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Dağıtık tarama simülasyonu: tek makinede birden çok düğüm (süreç) aynı ortak frontier'ı paylaşır.
+
+Her biri ayrı host (port) olan birkaç sahte site açılır, sitemap'leri SQLite ortak frontier'a eklenir
+ve düğümler ayrı süreçlerde `SitemapCrawler.crawl_shared` ile çalışır. İlk düğüm tek başına başlatılır,
+shard kiralayınca diğerleri başlar. İlk düğüm kill_after saniye sonra SIGKILL ile öldürülür (kirasını
+bırakmadan ayrılır); shard'ı kira süresi dolunca başka bir düğüme geçer. join_after saniyede yeni bir
+düğüm katılır.
+
+Doğrulananlar (biri sağlanmazsa çıkış kodu 1):
+    - dışa aktarılan çıktıda her sayfa tam bir kez var (kayıp ya da kopya yok)
+    - frontier'da sonuçlanmamış URL kalmadı
+    - her sitenin aynı anda gördüğü en fazla istek, tek düğümün eşzamanlılığını aşmadı
+      (host başına nezaket tek düğümde uygulanıyor)
+
+Kullanım:
+    python bench/distributed_sim.py
+    python bench/distributed_sim.py --sites 4 --pages 200 --nodes 5 --kill-after 2 --join-after 4
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_site import MockSite
+from shared_frontier import export, open_shared_frontier
+from sitemap import iter_sitemap
+
+
+def run_node(frontier_address: str, worker_id: str, work_dir: str, args) -> None:
+    """Bir düğüm: ortak frontier'daki URL'ler bitene kadar shard kiralayıp tarar"""
+    node_dir = os.path.join(work_dir, worker_id)
+    os.makedirs(node_dir, exist_ok=True)
+    # Crawler'ın konsol handler'ı kurulmasın, düğüm logu dosyaya gitsin
+    logging.basicConfig(filename=os.path.join(node_dir, 'node.log'), level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    from crawler import SitemapCrawler
+
+    crawler = SitemapCrawler(output_path=node_dir, use_cache=False, concurrency=args.concurrency,
+                             rate_per_host=args.rate, burst=args.concurrency)
+    with open_shared_frontier(frontier_address) as shared:
+        crawler.crawl_shared(shared, worker_id, shards=args.shards, lease_seconds=args.lease_seconds,
+                             claim_size=args.claim_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ortak frontier ile çok düğümlü tarama simülasyonu")
+    parser.add_argument('--sites', type=int, default=3, help="Ayrı host olarak açılan sahte site sayısı")
+    parser.add_argument('--pages', type=int, default=150, help="Site başına blog sayfası")
+    parser.add_argument('--latency', type=float, default=0.01, help="İstek başına gecikme (sn)")
+    parser.add_argument('--nodes', type=int, default=4, help="Başlangıçtaki düğüm sayısı")
+    parser.add_argument('--concurrency', type=int, default=2, help="Düğüm başına eşzamanlı istek")
+    parser.add_argument('--rate', type=float, default=40, help="Host başına saniyedeki istek")
+    parser.add_argument('--shards', type=int, default=2, help="Düğüm başına aynı anda kiralanan shard")
+    parser.add_argument('--lease-seconds', type=float, default=2.0)
+    parser.add_argument('--claim-size', type=int, default=10)
+    parser.add_argument('--kill-after', type=float, default=1.0,
+                        help="İlk düğüm shard kiraladıktan kaç sn sonra öldürülür")
+    parser.add_argument('--join-after', type=float, default=3.0, help="Yeni düğümün katılacağı an (sn)")
+    parser.add_argument('--keep', action='store_true', help="Çalışma dizinini silme")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='distributed_sim_')
+    frontier_address = f"sqlite://{os.path.join(work_dir, 'frontier.db')}"
+    # Kapasite sınırı 429 üretmesin diye yüksek; yalnızca eşzamanlı istek tepe değeri için açılır
+    sites = [MockSite(pages=args.pages, feed_items=0, latency=args.latency, capacity=10000, seed=i).start()
+             for i in range(args.sites)]
+    failures = []
+    try:
+        expected = set()
+        with open_shared_frontier(frontier_address) as shared:
+            for site in sites:
+                urls = list(iter_sitemap(f'{site.base_url}/sitemap.xml'))
+                expected.update(url for url, _ in urls)
+                shared.add(urls)
+
+        context = multiprocessing.get_context('spawn')
+        monitor = open_shared_frontier(frontier_address)
+        start = time.perf_counter()
+        nodes = [context.Process(target=run_node, args=(frontier_address, 'node0', work_dir, args))]
+        nodes[0].start()
+        # Öldürülecek düğüm kesin olarak bir shard tutsun
+        while nodes[0].is_alive() and not any(lease['owner'] == 'node0' for lease in monitor.leases()):
+            time.sleep(0.01)
+        print(f"{time.perf_counter() - start:.1f} sn: node0 shard kiraladı")
+        for i in range(1, args.nodes):
+            nodes.append(context.Process(target=run_node, args=(frontier_address, f'node{i}', work_dir, args)))
+            nodes[-1].start()
+
+        killed = joined = False
+        leased_at = time.perf_counter() - start
+        while any(node.is_alive() for node in nodes):
+            elapsed = time.perf_counter() - start
+            if not killed and elapsed >= leased_at + args.kill_after:
+                nodes[0].kill()
+                killed = True
+                print(f"{elapsed:.1f} sn: node0 öldürüldü, kiraları: "
+                      f"{[lease['shard'] for lease in monitor.leases() if lease['owner'] == 'node0']}")
+            if not joined and elapsed >= args.join_after:
+                node = context.Process(target=run_node, args=(frontier_address, f'node{len(nodes)}', work_dir, args))
+                node.start()
+                nodes.append(node)
+                joined = True
+                print(f"{elapsed:.1f} sn: node{len(nodes) - 1} katıldı")
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        monitor.close()
+        if not killed:
+            failures.append("Tarama node0 öldürülmeden bitti")
+
+        output_file = os.path.join(work_dir, 'blog_contents.jsonl')
+        with open_shared_frontier(frontier_address) as shared:
+            written = export(shared, output_file, 'jsonl')
+            counts = shared.counts()
+            unfinished = shared.unfinished()
+        with open(output_file, encoding='utf-8') as f:
+            exported = [json.loads(line) for line in f]
+        urls = [record['url'] for record in exported]
+        per_worker = {}
+        for record in exported:
+            per_worker[record['worker']] = per_worker.get(record['worker'], 0) + 1
+
+        if set(urls) != expected:
+            failures.append(f"Eksik {len(expected - set(urls))}, fazla {len(set(urls) - expected)} URL")
+        if len(urls) != len(set(urls)):
+            failures.append(f"{len(urls) - len(set(urls))} kopya kayıt")
+        if unfinished:
+            failures.append(f"{unfinished} URL sonuçlanmadı")
+        peaks = [site.peak_active for site in sites]
+        if max(peaks) > args.concurrency:
+            failures.append(f"Bir host'a aynı anda {max(peaks)} istek gitti (düğüm sınırı {args.concurrency})")
+
+        print(json.dumps({
+            'pages': len(expected),
+            'written': written,
+            # Sitemap istekleri hariç; sayfa sayısından fazlası öldürülen düğümün yarım bıraktıklarıdır
+            'requests': sum(site.requests - 1 for site in sites),
+            'seconds': round(elapsed, 2),
+            'frontier': counts,
+            'records_per_worker': per_worker,
+            'peak_active_per_host': peaks,
+            'exit_codes': [node.exitcode for node in nodes],
+            'failures': failures,
+        }, indent=2))
+    finally:
+        for site in sites:
+            site.stop()
+        if args.keep:
+            print(f"Çalışma dizini: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Extractor backend'lerini birbiriyle karşılaştırır.
+
+Kaydedilmiş HTML sayfaları (ya da verilmezse blog_contents.txt'den üretilen sayfalar) üzerinde
+'soup' ve 'lxml' backend'lerinin çıktılarının birebir aynı olduğunu doğrular ve süreleri ölçer.
+Farklılık varsa çıkış kodu 1'dir.
+
+Kullanım:
+    python bench/extract_compare.py
+    python bench/extract_compare.py --pages kayitli_sayfalar/
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extractors import BACKENDS, extract_blog_post, extract_page_text
+from sample_pages import iter_blog_records, render_blog_page
+
+
+def load_pages(pages_dir):
+    """(isim, html) çiftlerini döndürür"""
+    if pages_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(pages_dir, '*.html'))):
+            with open(path, 'rb') as f:
+                pages.append((os.path.basename(path), f.read().decode('utf-8', errors='replace')))
+        return pages
+    return [(url, render_blog_page(title, content)) for title, url, content in iter_blog_records()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extractor backend karşılaştırması")
+    parser.add_argument('--pages', help="Kaydedilmiş .html sayfalarının bulunduğu dizin")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    results = {}
+    timings = {}
+    for backend in BACKENDS:
+        start = time.perf_counter()
+        results[backend] = [(extract_blog_post(page, backend), extract_page_text(page, backend))
+                            for _, page in pages]
+        timings[backend] = time.perf_counter() - start
+
+    mismatches = [name for (name, _), expected, actual
+                  in zip(pages, results['soup'], results['lxml']) if expected != actual]
+    for name in mismatches[:20]:
+        print(f"Farklı çıktı: {name}", file=sys.stderr)
+
+    print(json.dumps({
+        'pages': len(pages),
+        'mismatches': len(mismatches),
+        'seconds': {backend: round(t, 3) for backend, t in timings.items()},
+        'speedup': round(timings['soup'] / timings['lxml'], 2) if timings['lxml'] else None,
+    }))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
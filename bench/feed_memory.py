@@ -0,0 +1,131 @@
+"""
+Ürün feed'i için bellek benchmark'ı.
+
+Sentetik bir Google Shopping feed'i üretir ve urunayiklama'nın akış (stream_to_csv) ile
+eski (process_xml + save_to_csv) yollarını ayrı süreçlerde çalıştırarak süre ve tepe RSS ölçer.
+--parquet ile akış yolu sütunlu Parquet çıktısıyla birlikte de ölçülür.
+
+Kullanım:
+    python bench/feed_memory.py --items 1000000
+    python bench/feed_memory.py --items 100000 --legacy
+    python bench/feed_memory.py --items 1000000 --parquet
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+GENDERS = ['Erkek', 'Kadın', 'Unisex', '']
+
+ITEM_TEMPLATE = (
+    '<item>'
+    '<g:id>{i}</g:id>'
+    '<g:title><![CDATA[POLO YAKA KISA KOL DESENLİ LACİVERT TRİKO {i}]]></g:title>'
+    '<g:description><![CDATA[&lt;ul&gt;&lt;li&gt;%100 Pamuk&lt;/li&gt;&lt;li&gt;Regular Fit&lt;/li&gt;'
+    '&lt;li&gt;Model bedeni: 50&lt;/li&gt;&lt;/ul&gt;&lt;p&gt;&lt;strong&gt;&amp;Uuml;r&amp;uuml;n {i}&lt;/strong&gt;&lt;/p&gt;]]></g:description>'
+    '<g:link>https://sarar.com/sarar-polo-yaka-kisa-kol-triko-{i}?currency=TRY</g:link>'
+    '<g:price>{price} TRY</g:price>'
+    '<g:gender>{gender}</g:gender>'
+    '</item>\n'
+)
+
+
+def generate_feed(path, items):
+    """Verilen sayıda ürün içeren feed'i parça parça diske yazar"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<rss xmlns:g="http://base.google.com/ns/1.0" version="2.0"><channel>\n')
+        f.write('<title>Sarar</title><link>https://sarar.com</link>\n')
+        for i in range(items):
+            f.write(ITEM_TEMPLATE.format(i=i, price=f"{1000 + i % 5000}.99", gender=GENDERS[i % len(GENDERS)]))
+        f.write('</channel></rss>\n')
+
+
+def peak_rss_mb():
+    """Sürecin tepe RSS değerini MB olarak döndürür"""
+    # Linux'ta ru_maxrss exec'ten önceki (üst süreçten fork edilen) belleği de sayar, VmHWM saymaz
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döndürür
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_mode(mode, feed_path, output_dir):
+    """Tek bir yolu çalıştırır ve sonucu JSON olarak yazdırır"""
+    import urunayiklama
+
+    start = time.perf_counter()
+    # urunayiklama'nın ilerleme mesajları JSON çıktısına karışmasın
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'stream':
+            with open(feed_path, 'rb') as f:
+                counts = urunayiklama.stream_to_csv(f, output_dir)
+        elif mode == 'parquet':
+            with open(feed_path, 'rb') as f:
+                counts = urunayiklama.stream_to_csv(
+                    f, output_dir, parquet_path=os.path.join(output_dir, urunayiklama.PARQUET_FILE))
+        else:
+            with open(feed_path, encoding='utf-8') as f:
+                products = urunayiklama.process_xml(f.read())
+            urunayiklama.save_to_csv(products, output_dir)
+            counts = {gender: len(rows) for gender, rows in products.items() if rows}
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'mode': mode,
+        'products': sum(counts.values()),
+        'seconds': round(elapsed, 3),
+        'peak_rss_mb': peak_rss_mb(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ürün feed'i bellek benchmark'ı")
+    parser.add_argument('--items', type=int, default=1_000_000, help="Sentetik feed'deki ürün sayısı")
+    parser.add_argument('--legacy', action='store_true', help="Eski tüm-bellek yolunu da ölç")
+    parser.add_argument('--parquet', action='store_true', help="Akış yolunu Parquet çıktısıyla da ölç")
+    parser.add_argument('--run', choices=['stream', 'parquet', 'legacy'], help=argparse.SUPPRESS)
+    parser.add_argument('--feed', help=argparse.SUPPRESS)
+    parser.add_argument('--output-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        # Alt süreç: CSV çıktıları benchmark'ın geçici dizinine yazılır
+        run_mode(args.run, args.feed, args.output_dir)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feed_path = os.path.join(tmp, 'feed.xml')
+        generate_feed(feed_path, args.items)
+        print(f"# feed: {args.items} ürün, {os.path.getsize(feed_path) / 1e6:.1f} MB", file=sys.stderr)
+
+        modes = ['stream'] + (['parquet'] if args.parquet else []) + (['legacy'] if args.legacy else [])
+        for mode in modes:
+            result = subprocess.run(
+                [sys.executable, __file__, '--run', mode, '--feed', feed_path,
+                 '--output-dir', os.path.join(tmp, mode)],
+                capture_output=True, text=True, check=True,
+            )
+            print(result.stdout.strip())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Benchmark'lar için yerel sahte site.
+
+blog_contents.txt kayıtlarından üretilen N blog sayfası, bunları listeleyen /sitemap.xml ve
+sarar_*_urunler.csv satırlarından üretilen Google Shopping biçiminde /feed.xml sunar.
+Her isteğe sabit gecikme (+ rastgele sapma) eklenebilir, blog sayfalarının belirli bir oranı
+503 ile yanıtlanabilir. Rastgelelik seed ile sabitlendiği için çalışmalar tekrarlanabilir.
+
+capacity verilirse sunucu kısıtlı bir origin gibi davranır: eşzamanlı blog isteği sayısı arttıkça
+gecikme orantılı olarak artar, capacity aşıldığında 429 (ve retry_after verilmişse Retry-After) döner.
+
+Kullanım:
+    python bench/mock_site.py --pages 500 --latency 0.05 --error-rate 0.02
+    python bench/mock_site.py --latency 0.02 --capacity 8 --retry-after 1
+"""
+import argparse
+import csv
+import glob
+import gzip
+import html
+import http.server
+import os
+import random
+import socketserver
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from sample_pages import ROOT, iter_blog_records, render_blog_page
+
+# CSV'deki cinsiyet grubundan feed'deki g:gender değerine
+FEED_GENDERS = {'erkek': 'Erkek', 'kadın': 'Kadın', 'üniseks': 'Unisex', '': ''}
+
+FEED_ITEM = (
+    '<item>'
+    '<g:id>{id}</g:id>'
+    '<g:title><![CDATA[{title}]]></g:title>'
+    '<g:description><![CDATA[{description}]]></g:description>'
+    '<g:link>{link}</g:link>'
+    '<g:price>{price}</g:price>'
+    '<g:gender>{gender}</g:gender>'
+    '</item>\n'
+)
+
+
+def iter_product_rows() -> Iterator[List[str]]:
+    """Depodaki sarar_*_urunler.csv dosyalarının satırlarını üretir"""
+    for path in sorted(glob.glob(os.path.join(ROOT, 'sarar_*_urunler.csv'))):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            yield from reader
+
+
+def render_feed(items: int) -> bytes:
+    """CSV satırlarını döngüyle kullanarak `items` ürünlük feed üretir"""
+    rows = list(iter_product_rows())
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n',
+             '<rss xmlns:g="http://base.google.com/ns/1.0" version="2.0"><channel>\n',
+             '<title>Sarar</title><link>https://sarar.com</link>\n']
+    for i in range(items):
+        gender, title, link, price, description = rows[i % len(rows)]
+        # Açıklamalar gerçek feed'deki gibi kaçışlı HTML liste olarak gönderilir
+        description = '<ul>' + ''.join(f'<li>{part}</li>' for part in description.split(' - ')) + '</ul>'
+        parts.append(FEED_ITEM.format(
+            id=i, title=title, description=html.escape(description),
+            link=html.escape(link.replace('?currency=TRY', f'-{i}?currency=TRY')),
+            price=price, gender=FEED_GENDERS.get(gender, ''),
+        ))
+    parts.append('</channel></rss>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+class MockSite:
+    """
+    Arka plan thread'inde çalışan sahte site sunucusu.
+    latency saniye cinsinden sabit gecikme, jitter buna eklenen en fazla rastgele süre,
+    error_rate blog sayfalarından 503 dönenlerin oranıdır (sitemap ve feed hata vermez).
+    capacity aynı anda işlenebilen blog isteği sayısıdır (0: sınırsız), retry_after 429 yanıtlarındaki
+    Retry-After değeridir (saniye). compress=True ise Accept-Encoding'de gzip isteyen istemcilere
+    blog sayfaları gzip ile sıkıştırılarak gönderilir.
+    """
+
+    def __init__(self, pages: int = 200, feed_items: int = 5000, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0,
+                 capacity: int = 0, retry_after: Optional[int] = None, compress: bool = False,
+                 host: str = '127.0.0.1', port: int = 0):
+        records = list(iter_blog_records())
+        self.pages: Dict[str, bytes] = {}
+        for i in range(pages):
+            title, _, content = records[i % len(records)]
+            self.pages[f'/blog/{i}/'] = render_blog_page(title, content).encode('utf-8')
+        self.compressed: Dict[str, bytes] = {}
+        if compress:
+            self.compressed = {path: gzip.compress(page) for path, page in self.pages.items()}
+        self.feed = render_feed(feed_items) if feed_items else b''
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # Toplam istek, enjekte edilen hata ve 429 sayıları
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.active = 0
+        self.peak_active = 0
+
+        site = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Başlık ve gövde ayrı yazıldığında Nagle + gecikmeli ACK her yanıta ~40 ms ekler
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                site._handle(self)
+
+        class Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+            # Varsayılan 5'lik dinleme kuyruğu taşınca SYN düşer, istemci bağlantıyı ~1 sn sonra yeniden dener
+            request_queue_size = 128
+
+        self._server = Server((host, port), Handler)
+        self.base_url = f'http://{host}:{self._server.server_address[1]}'
+        self.sitemap = self._render_sitemap()
+        self._thread: Optional[threading.Thread] = None
+
+    def _render_sitemap(self) -> bytes:
+        urls = ''.join(f'<url><loc>{self.base_url}{path}</loc><lastmod>2024-11-13</lastmod></url>'
+                       for path in self.pages)
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f'{urls}</urlset>').encode('utf-8')
+
+    def _handle(self, request) -> None:
+        path = request.path
+        is_page = path in self.pages
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            fail = is_page and self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            throttle = False
+            if is_page and self.capacity:
+                self.active += 1
+                self.peak_active = max(self.peak_active, self.active)
+                throttle = self.active > self.capacity
+                if throttle:
+                    self.throttled += 1
+                else:
+                    # Yük arttıkça yanıt süresi uzar (kuyrukta bekleyen bir origin gibi)
+                    delay *= 1 + self.active / self.capacity
+        try:
+            if delay and not throttle:
+                time.sleep(delay)
+            self._respond(request, path, fail, throttle)
+        finally:
+            if is_page and self.capacity:
+                with self._lock:
+                    self.active -= 1
+
+    def _respond(self, request, path: str, fail: bool, throttle: bool) -> None:
+        headers = {}
+        if throttle:
+            status, body, content_type = 429, b'Too Many Requests', 'text/plain'
+            if self.retry_after is not None:
+                headers['Retry-After'] = str(self.retry_after)
+        elif fail:
+            status, body, content_type = 503, b'Service Unavailable', 'text/plain'
+        elif path == '/sitemap.xml':
+            status, body, content_type = 200, self.sitemap, 'application/xml'
+        elif path == '/feed.xml':
+            status, body, content_type = 200, self.feed, 'application/xml; charset=utf-8'
+        elif path in self.compressed and 'gzip' in request.headers.get('Accept-Encoding', ''):
+            status, body, content_type = 200, self.compressed[path], 'text/html; charset=utf-8'
+            headers['Content-Encoding'] = 'gzip'
+        elif path in self.pages:
+            status, body, content_type = 200, self.pages[path], 'text/html; charset=utf-8'
+        else:
+            status, body, content_type = 404, b'Not Found', 'text/plain'
+
+        request.send_response(status)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(body)
+
+    def start(self) -> "MockSite":
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-site', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockSite":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark'lar için yerel sahte site")
+    parser.add_argument('--pages', type=int, default=200, help="Blog sayfası sayısı")
+    parser.add_argument('--feed-items', type=int, default=5000, help="Feed'deki ürün sayısı")
+    parser.add_argument('--latency', type=float, default=0.0, help="İstek başına sabit gecikme (sn)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Gecikmeye eklenen en fazla rastgele süre (sn)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503 dönen blog sayfası oranı (0-1)")
+    parser.add_argument('--capacity', type=int, default=0, help="Eşzamanlı blog isteği kapasitesi, aşılınca 429 (0: sınırsız)")
+    parser.add_argument('--retry-after', type=int, default=None, help="429 yanıtlarındaki Retry-After (sn)")
+    parser.add_argument('--gzip', action='store_true', help="İsteyen istemcilere blog sayfalarını gzip ile gönder")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    site = MockSite(pages=args.pages, feed_items=args.feed_items, latency=args.latency, jitter=args.jitter,
+                    error_rate=args.error_rate, seed=args.seed, capacity=args.capacity,
+                    retry_after=args.retry_after, compress=args.gzip, port=args.port)
+    print(f"Sitemap: {site.base_url}/sitemap.xml")
+    print(f"Feed:    {site.base_url}/feed.xml")
+    try:
+        site._server.serve_forever()
+    except KeyboardInterrupt:
+        site._server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""
+Feed alanı normalizasyonu mikro benchmark'ı.
+
+Depodaki sarar_*_urunler.csv satırlarından feed'de görülen biçimlerde (kaçışlı, CDATA'lı,
+çift kodlanmış Türkçe entity'li, <ul><li> listeli açıklama) girdiler üretir. Bu girdilerde
+normalize.py'nin tekil ve sütun API'lerinin, urunayiklama'nın önceki clean_cdata/parse_description
+uygulamalarıyla (aşağıda birebir kopyalanmıştır) aynı çıktıyı verdiğini doğrular.
+Farklılık varsa çıkış kodu 1'dir.
+
+Süreler iki girdi üzerinde ölçülür:
+    corpus : yukarıdaki üretilmiş girdiler (tekrarsız, kaçışlı metin ağırlıklı)
+    feed   : bench/mock_site.py'nin feed'inden ayrıştırılmış ham alanlar (parse_item'ın gördüğü
+             metinler; satırlar döngüyle kullanıldığı için gerçek feed'deki varyantlar gibi tekrarlar)
+
+Kullanım:
+    python bench/normalize_bench.py
+    python bench/normalize_bench.py --feed-items 50000 --repeat 9
+"""
+import argparse
+import html
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import normalize
+from mock_site import iter_product_rows, render_feed
+
+GOOGLE_NS = '{http://base.google.com/ns/1.0}'
+COLUMNS = ('gender', 'title', 'link', 'price', 'description')
+
+
+def legacy_clean_cdata(text):
+    """urunayiklama.clean_cdata'nın önceki uygulaması"""
+    if text is None:
+        return ""
+    text = text.replace('<![CDATA[', '').replace(']]>', '')
+    text = html.unescape(text)
+    text = text.replace('&uuml;', 'ü').replace('&Uuml;', 'Ü')
+    text = text.replace('&ouml;', 'ö').replace('&Ouml;', 'Ö')
+    text = text.replace('&ccedil;', 'ç').replace('&Ccedil;', 'Ç')
+    text = text.replace('&yacute;', 'ı').replace('&Yacute;', 'İ')
+    text = text.replace('&sect;', 'ş').replace('&Sect;', 'Ş')
+    text = text.replace('&gbreve;', 'ğ').replace('&Gbreve;', 'Ğ')
+    return text.strip()
+
+
+def legacy_parse_description(desc):
+    """urunayiklama.parse_description'ın önceki uygulaması"""
+    if desc is None:
+        return ""
+    desc = html.unescape(desc)
+    desc = desc.replace('<ul>', '').replace('</ul>', '')
+    desc = desc.replace('<li>', '').replace('</li>', '-')
+    desc = desc.replace('<br />', ' ').replace('<p>', '').replace('</p>', ' ')
+    desc = desc.replace('<strong>', '').replace('</strong>', '')
+    desc = desc.replace('<span>', '').replace('</span>', '')
+    parts = [x.strip() for x in desc.split('-') if x.strip()]
+    return ' - '.join(parts)
+
+
+# Eski sıralı replace'lerin davranışını belirleyen sınır durumları
+EDGE_CASES = [
+    None, '', '   ', '&', '&amp', '&amp;', '&amp;uuml;', '&#38;ouml;', '&ampccedil;', '&AMP;Gbreve;',
+    '&yacute;', '&amp;yacute;', '&uuml', '&&uuml;uuml;', ']]<![CDATA[>', '<![CDA]]>TA[x', '&am<![CDATA[p;uuml;',
+    '<![CDATA[ &lt;b&gt; ]]>', '&#0;', '&#x110000;', '&notit;', '&notin', '\x00&amp;\x00',
+    '<</ul>li>a</li>', '<<ul>ul>', '<li>a</li><li>b</li>', '&lt;ul&gt;&lt;li&gt;x&lt;/li&gt;&lt;/ul&gt;',
+    '<p>a</p><br /><strong>b</strong>', '<span>-</span>-- a --', '<br/>x<br />', ' - x　-',
+    'a - b - c', '-', '---', '<', '<ul', '</li', '<</li>/li>',
+]
+
+TURKISH_LETTERS = {'ü': '&uuml;', 'Ü': '&Uuml;', 'ö': '&ouml;', 'Ö': '&Ouml;', 'ç': '&ccedil;', 'Ç': '&Ccedil;',
+                   'ş': '&sect;', 'Ş': '&Sect;', 'ğ': '&gbreve;', 'Ğ': '&Gbreve;'}
+
+
+def field_variants(value):
+    """Bir alanın feed'de karşılaşılan kodlanmış biçimleri"""
+    double = ''.join(TURKISH_LETTERS.get(ch, ch) for ch in value)
+    return [
+        value,
+        f'  {value}\n',
+        html.escape(value),
+        f'<![CDATA[{value}]]>',
+        html.escape(double),
+        html.escape(html.escape(value)),
+    ]
+
+
+def description_variants(description):
+    """Açıklamanın feed'deki <ul><li> listesi biçimleri (clean_cdata girdisi olarak)"""
+    listed = '<ul>' + ''.join(f'<li>{part}</li>' for part in description.split(' - ')) + '</ul>'
+    return [
+        listed,
+        html.escape(listed),
+        f'<p>{description}</p><br /><strong>{description[:10]}</strong>',
+        f'<![CDATA[<span>{html.escape(description)}</span>]]>',
+    ]
+
+
+def build_corpus():
+    """CSV satırlarından üretilen (alanlar, açıklamalar); sınır durumları dahil değildir"""
+    fields, descriptions = [], []
+    for row in iter_product_rows():
+        for value in row:
+            fields.extend(field_variants(value))
+        descriptions.extend(description_variants(row[4]))
+    return fields, descriptions
+
+
+def feed_columns(items):
+    """Sahte feed'deki ürünlerin ham alan metinleri, sütun başına liste"""
+    root = ET.fromstring(render_feed(items))
+    columns = {name: [] for name in COLUMNS}
+    for item in root.iter('item'):
+        for name in COLUMNS:
+            columns[name].append(item.find(f'{GOOGLE_NS}{name}').text)
+    return columns
+
+
+def legacy_rows(columns):
+    """parse_item'ın önceki hali gibi ürün başına alanları temizler"""
+    return [[legacy_clean_cdata(gender), legacy_clean_cdata(title), legacy_clean_cdata(link),
+             legacy_clean_cdata(price), legacy_parse_description(legacy_clean_cdata(description))]
+            for gender, title, link, price, description in zip(*(columns[name] for name in COLUMNS))]
+
+
+def normalized_rows(columns):
+    """parse_item'ın şimdiki hali gibi ürün başına alanları temizler"""
+    clean_text, clean_description = normalize.clean_text, normalize.clean_description
+    return [[clean_text(gender), clean_text(title), clean_text(link), clean_text(price),
+             clean_description(clean_text(description))]
+            for gender, title, link, price, description in zip(*(columns[name] for name in COLUMNS))]
+
+
+def column_rows(columns):
+    """Sütun API'leriyle tüm alanları sütun sütun temizler"""
+    cleaned = [normalize.clean_texts(columns[name]) for name in COLUMNS[:-1]]
+    cleaned.append(normalize.clean_descriptions(normalize.clean_texts(columns['description'])))
+    return [list(row) for row in zip(*cleaned)]
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feed alanı normalizasyonu karşılaştırması")
+    parser.add_argument('--repeat', type=int, default=5, help="Ölçüm tekrarı (en iyi süre alınır)")
+    parser.add_argument('--feed-items', type=int, default=20000, help="Sahte feed'deki ürün sayısı")
+    args = parser.parse_args()
+
+    corpus_fields, descriptions = build_corpus()
+    # parse_item'daki gibi açıklama önce clean_cdata'dan geçer
+    corpus_descriptions = [legacy_clean_cdata(value) for value in descriptions]
+    # Sınır durumları yalnızca doğrulamaya katılır; '\x00' içerenler sütun API'lerini yavaş yola düşürür
+    fields = corpus_fields + EDGE_CASES
+    cleaned = corpus_descriptions + EDGE_CASES + [legacy_clean_cdata(value) for value in EDGE_CASES]
+
+    expected_fields = [legacy_clean_cdata(value) for value in fields]
+    expected_descriptions = [legacy_parse_description(value) for value in cleaned]
+    checks = {
+        'clean_text': [normalize.clean_text(value) for value in fields],
+        'clean_texts': normalize.clean_texts(fields),
+        'clean_description': [normalize.clean_description(value) for value in cleaned],
+        'clean_descriptions': normalize.clean_descriptions(cleaned),
+    }
+    mismatches = 0
+    for name, actual in checks.items():
+        expected = expected_fields if name.startswith('clean_text') else expected_descriptions
+        inputs = fields if name.startswith('clean_text') else cleaned
+        for value, want, got in zip(inputs, expected, actual):
+            if want != got:
+                mismatches += 1
+                if mismatches <= 20:
+                    print(f"Farklı çıktı ({name}): {value!r}: {want!r} != {got!r}", file=sys.stderr)
+        if len(actual) != len(expected):
+            mismatches += 1
+            print(f"Farklı uzunluk ({name}): {len(actual)} != {len(expected)}", file=sys.stderr)
+
+    columns = feed_columns(args.feed_items)
+    expected_rows = legacy_rows(columns)
+    for name, rows in (('feed', normalized_rows(columns)), ('feed sütun', column_rows(columns))):
+        if rows != expected_rows:
+            mismatches += 1
+            print(f"Farklı çıktı ({name})", file=sys.stderr)
+
+    timings = {
+        'fields': {
+            'legacy': timed(lambda: [legacy_clean_cdata(value) for value in corpus_fields], args.repeat),
+            'clean_text': timed(lambda: [normalize.clean_text(value) for value in corpus_fields], args.repeat),
+            'clean_texts': timed(lambda: normalize.clean_texts(corpus_fields), args.repeat),
+        },
+        'descriptions': {
+            'legacy': timed(lambda: [legacy_parse_description(value) for value in corpus_descriptions],
+                            args.repeat),
+            'clean_description': timed(lambda: [normalize.clean_description(value)
+                                                for value in corpus_descriptions], args.repeat),
+            'clean_descriptions': timed(lambda: normalize.clean_descriptions(corpus_descriptions), args.repeat),
+        },
+        'feed': {
+            'legacy': timed(lambda: legacy_rows(columns), args.repeat),
+            'clean_text': timed(lambda: normalized_rows(columns), args.repeat),
+            'clean_texts': timed(lambda: column_rows(columns), args.repeat),
+        },
+    }
+
+    print(json.dumps({
+        'fields': len(corpus_fields),
+        'descriptions': len(corpus_descriptions),
+        'edge_cases': len(EDGE_CASES),
+        'feed_items': args.feed_items,
+        'mismatches': mismatches,
+        'seconds': {group: {name: round(t, 4) for name, t in items.items()} for group, items in timings.items()},
+        'speedup': {group: {name: round(items['legacy'] / t, 2) for name, t in items.items() if name != 'legacy'}
+                    for group, items in timings.items()},
+    }, indent=2))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+blog_contents.txt kayıtlarından gerçek blog sayfalarına benzeyen HTML sayfaları üretir.
+Benchmark ve extractor karşılaştırma araçları tarafından kullanılır.
+"""
+import html
+import os
+import re
+from typing import Iterator, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BLOG_CONTENTS = os.path.join(ROOT, 'blog_contents.txt')
+
+SEPARATOR = '-' * 100
+_HEADING = re.compile(r'(\n### .*? ###\n)')
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="tr">
+<head>
+<meta charset="UTF-8">
+<title>{title} - Sarar Blog</title>
+<link rel="stylesheet" href="/wp-content/themes/sarar/style.css">
+<script>window.dataLayer = window.dataLayer || [];</script>
+</head>
+<body class="post-template-default single single-post">
+<header class="site-header"><nav class="menu">{nav}</nav></header>
+<div class="page-hero"><h1 class="entry-title">{title}</h1></div>
+<div class="container">
+<div class="blog-single-content">
+{body}
+</div>
+<aside class="sidebar">{sidebar}</aside>
+</div>
+<footer class="site-footer"><p>&copy; Sarar</p>{footer}</footer>
+</body>
+</html>
+"""
+
+
+def iter_blog_records(path: str = BLOG_CONTENTS) -> Iterator[Tuple[str, str, str]]:
+    """blog_contents.txt içindeki (başlık, url, içerik) kayıtlarını üretir"""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    for block in text.split('\n' + SEPARATOR + '\nBAŞLIK: ')[1:]:
+        header, _, content = block.partition('\n' + SEPARATOR + '\n\n')
+        title, _, url = header.partition('\nURL: ')
+        yield title, url.strip(), content.rstrip('\n')
+
+
+def content_blocks(content: str) -> List[Tuple[str, str]]:
+    """Çıkarılmış içeriği ('h2' | 'p', metin) bloklarına geri ayırır"""
+    blocks = []
+    for part in _HEADING.split(content):
+        if _HEADING.fullmatch(part):
+            blocks.append(('h2', part.strip()[4:-4]))
+            continue
+        for paragraph in part.split('\n\n'):
+            if paragraph.strip():
+                blocks.append(('p', paragraph.strip()))
+    return blocks
+
+
+def render_blog_page(title: str, content: str, url: str = '') -> str:
+    """Kayıttan, blog-single-content div'i ve site iskeleti olan bir HTML sayfası üretir"""
+    body = '\n'.join(f'<{tag}>{html.escape(text)}</{tag}>' for tag, text in content_blocks(content))
+    nav = ''.join(f'<a href="/kategori-{i}/">Kategori {i}</a>' for i in range(12))
+    sidebar = ''.join(f'<div class="widget"><h3>Son Yazı {i}</h3><p>Özet metni {i}</p></div>' for i in range(8))
+    footer = ''.join(f'<a href="/sayfa-{i}/">Sayfa {i}</a>' for i in range(20))
+    return PAGE_TEMPLATE.format(title=html.escape(title), body=body, nav=nav, sidebar=sidebar, footer=footer)
@@ -0,0 +1,120 @@
+"""
+Görülen URL kümesi benchmark'ı.
+
+Sarar ürün/blog URL'lerine benzeyen sentetik URL'ler üretir; her sayfanın bir kısmı sondaki '/',
+fragment ve ?currency=TRY / utm_* varyantlarıyla tekrar görünür. crawler'ın önceki ham URL set'i ile
+SeenSet'in (tablo, tablo + Bloom, yalnızca Bloom) bellek kullanımını (tracemalloc), ekleme süresini,
+bulduğu benzersiz URL sayısını ve Bloom yanlış pozitif oranını karşılaştırır.
+
+Tablo modlarında her sayfa tam bir kez yeni sayılmalıdır (kayıp ya da fazla yok); değilse çıkış kodu 1.
+
+Kullanım:
+    python bench/seen_bench.py --urls 1000000
+    python bench/seen_bench.py --urls 200000 --bloom-fp 0.001
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from urlset import SeenSet, canonical_url
+
+VARIANTS = ('{}', '{}/', '{}#yorumlar', '{}?currency=TRY', '{}?utm_source=newsletter&utm_medium=email')
+
+
+def generate_urls(pages, variant_rate, seed):
+    """(url, sayfa numarası) listesi; variant_rate oranında sayfa varyantlarıyla tekrar eder"""
+    rng = random.Random(seed)
+    urls = []
+    for i in range(pages):
+        base = f'https://www.sarar.com/sarar-polo-yaka-kisa-kol-triko-{i}-lacivert'
+        urls.append((base, i))
+        if rng.random() < variant_rate:
+            urls.append((rng.choice(VARIANTS[1:]).format(base), i))
+    rng.shuffle(urls)
+    return urls
+
+
+def fill(seen, urls, counts):
+    for url, page in urls:
+        if isinstance(seen, set):
+            if url not in seen:
+                seen.add(url)
+                counts[page] += 1
+        elif seen.add(url):
+            counts[page] += 1
+
+
+def measure(factory, urls, pages):
+    """
+    Kümeyi oluşturup tüm URL'leri ekler; süre ve bellek ayrı çalışmalarda ölçülür (tracemalloc yavaşlatır).
+    Returns: (küme, sayfa başına yeni sayılma adedi, süre, kümenin kullandığı bayt)
+    """
+    # Sayaç ölçümden önce ayrılır, bellek ölçümüne girmez
+    counts = bytearray(pages)
+    start = time.perf_counter()
+    seen = factory()
+    fill(seen, urls, counts)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    measured = factory()
+    fill(measured, urls, bytearray(pages))
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    if isinstance(measured, set):
+        # URL dizeleri ölçümden önce oluşturuldu; set'te tutulan dizeler de kümenin maliyetidir
+        size += sum(sys.getsizeof(url) for url in measured)
+    return seen, counts, elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Görülen URL kümesi karşılaştırması")
+    parser.add_argument('--urls', type=int, default=500000, help="Benzersiz sayfa sayısı")
+    parser.add_argument('--variant-rate', type=float, default=0.3, help="Varyantıyla tekrar eden sayfa oranı")
+    parser.add_argument('--bloom-fp', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    urls = generate_urls(args.urls, args.variant_rate, args.seed)
+    modes = {
+        'set[str]': set,
+        'seenset': lambda: SeenSet(args.urls, key=canonical_url),
+        'seenset+bloom': lambda: SeenSet(args.urls, key=canonical_url, bloom_fp=args.bloom_fp),
+        'bloom_only': lambda: SeenSet(args.urls, key=canonical_url, bloom_fp=args.bloom_fp, exact=False),
+    }
+    results = {}
+    failures = []
+    for name, factory in modes.items():
+        seen, counts, elapsed, size = measure(factory, urls, args.urls)
+        result = {
+            'unique': sum(counts),
+            'seconds': round(elapsed, 3),
+            'bytes': size,
+            'bytes_per_page': round(size / args.urls, 1),
+        }
+        if isinstance(seen, SeenSet):
+            result['bloom_fp_rate'] = seen.fp_rate()
+            if seen.exact and counts.count(1) != args.urls:
+                failures.append(f"{name}: {counts.count(1)}/{args.urls} sayfa tam bir kez yeni sayıldı")
+            if not seen.exact:
+                # Yanlış pozitif: görülmemiş sayılması gerekirken atlanan sayfalar
+                result['skipped_pages'] = counts.count(0)
+        results[name] = result
+
+    print(json.dumps({
+        'pages': args.urls,
+        'urls': len(urls),
+        'results': results,
+        'failures': failures,
+    }, indent=2))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
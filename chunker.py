@@ -0,0 +1,391 @@
+"""
+Yapay zeka alım (retrieval) sistemine verilecek blog ve ürün metinleri için akış halinde,
+token sınırlı parçalayıcı.
+
+Metin önce '### ... ###' başlıklarına (extract_blog_post'un h2 biçimi), sonra boş satırla ayrılmış
+paragraflara bölünür. Paragraflar max_tokens'ı aşmadan aynı parçaya toplanır; sığmayan paragraf
+cümlelere, sığmayan cümle kelimelere bölünür. Yeni başlık, mevcut parça max_tokens'ın dörtte birini
+geçmişse yeni parça başlatır. Boyuttan dolayı kesilen parçanın sonundaki cümleler (en fazla
+overlap_tokens) bir sonraki parçanın başında tekrarlanır.
+
+Token sayısı varsayılan olarak tahmin edilir: kelimeler 4 karakterlik parçalar, noktalama işaretleri ayrı
+sayılır; Türkçe metinde BPE tokenizer'larının saydığından biraz fazladır, yani sınır güvenli taraftadır.
+tiktoken kuruluysa --encoding ile gerçek tokenizer kullanılabilir.
+
+Parçalar kayıt başına JSONL'e hemen yazılır; girdi dosyası satır satır okunur. Önbellek (SQLite) kayıt
+başına metin özetini, metadata özetini ve parçaları tutar: metni değişmemiş kayıt yeniden parçalanmaz,
+parçaları önbellekten yazılır. Parça id'si anahtar ve metin özetinden türetildiği için değişmeyen parçalar
+çalışmalar arasında aynı id'yi taşır, embedding'ler id ile yeniden kullanılabilir. changed_only=True ile
+yalnızca metni ya da metadata'sı değişen kayıtların parçaları ve silinen kayıtlar ({'removed': true})
+yazılır. Parçalama ayarları (max_tokens, overlap_tokens, tokenizer) değişirse önbellek boşaltılır.
+
+Kullanım:
+    python crawler.py https://blog.sarar.com/sitemap.xml --chunks blog_chunks.jsonl
+    python urunayiklama.py --output-dir sarar_urun --chunks sarar_urun/urun_chunks.jsonl
+    python chunker.py --output blog_chunks.jsonl blogs blog_contents.txt
+    python chunker.py --output urun_chunks.jsonl --changed-only products sarar_urun
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from feed_state import product_key
+from product_columns import iter_csv_products, parse_price
+from search_index import BLOG, PRODUCT, KINDS, iter_blog_file
+
+DEFAULT_MAX_TOKENS = 512
+DEFAULT_OVERLAP_TOKENS = 64
+CACHE_FILE = 'chunk_cache.db'
+
+_HEADING = re.compile(r'^###\s*(.*?)\s*###$')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+_SENTENCE_END = re.compile(r'(?<=[.!?…])\s+')
+_TOKEN = re.compile(r'\w{1,4}|[^\w\s]')
+
+
+def count_tokens(text: str) -> int:
+    """Tokenizer olmadan token sayısı tahmini (bkz. modül açıklaması)"""
+    return len(_TOKEN.findall(text))
+
+
+def make_tokenizer(encoding: Optional[str] = None) -> Tuple[str, Callable[[str], int]]:
+    """
+    encoding verilirse tiktoken kodlamasıyla (ör. cl100k_base) sayan, verilmezse tahmin eden sayıcı.
+    Returns: (tokenizer adı, sayıcı); ad önbellek ayarlarına girer
+    """
+    if not encoding:
+        return 'estimate', count_tokens
+    try:
+        import tiktoken
+    except ImportError:
+        raise RuntimeError("--encoding için tiktoken gerekli: pip install tiktoken") from None
+    encoder = tiktoken.get_encoding(encoding)
+    return f'tiktoken:{encoding}', lambda text: len(encoder.encode_ordinary(text))
+
+
+def iter_paragraphs(content: str) -> Iterator[Tuple[bool, str]]:
+    """İçeriği (başlık mı, metin) çiftlerine böler; başlık metni '### ... ###' biçimiyle döner"""
+    for paragraph in _PARAGRAPH_BREAK.split(content):
+        paragraph = paragraph.strip()
+        if paragraph:
+            yield bool(_HEADING.match(paragraph)), paragraph
+
+
+def _split_long(text: str, max_tokens: int, tokenizer: Callable[[str], int]) -> List[Tuple[str, int]]:
+    """max_tokens'ı aşan paragrafı cümlelere, aşan cümleyi kelime gruplarına böler"""
+    pieces = []
+    for sentence in _SENTENCE_END.split(text):
+        tokens = tokenizer(sentence)
+        if tokens <= max_tokens:
+            pieces.append((sentence, tokens))
+            continue
+        words: List[str] = []
+        for word in sentence.split() + [None]:
+            if word is None or (words and tokenizer(' '.join(words + [word])) > max_tokens):
+                if words:
+                    piece = ' '.join(words)
+                    pieces.append((piece, tokenizer(piece)))
+                words = []
+            if word is None:
+                break
+            if tokenizer(word) > max_tokens:
+                # Tek kelime sınırı aşıyorsa (ör. boşluksuz uzun dizi) karakter dilimlerine bölünür
+                pieces.extend((word[i:i + max_tokens], tokenizer(word[i:i + max_tokens]))
+                              for i in range(0, len(word), max_tokens))
+            else:
+                words.append(word)
+    return pieces
+
+
+def chunk_text(content: str, max_tokens: int = DEFAULT_MAX_TOKENS,
+               overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+               tokenizer: Callable[[str], int] = count_tokens) -> List[Dict[str, object]]:
+    """
+    İçeriği max_tokens sınırlı, örtüşen parçalara böler.
+    Returns: [{'section': parçanın başladığı bölüm başlığı ya da None, 'text', 'tokens'}]
+    """
+    if not 0 <= overlap_tokens <= max_tokens // 2:
+        raise ValueError("overlap_tokens 0 ile max_tokens/2 arasında olmalı")
+    chunks: List[Dict[str, object]] = []
+    # Parçadaki birimler: (paragraf numarası, metin, token); aynı paragrafın cümleleri boşlukla birleşir
+    current: List[Tuple[int, str, int]] = []
+    size = 0
+    section: Optional[str] = None
+    chunk_section: Optional[str] = None
+    # current'ın başındaki, önceki parçadan örtüşme olarak taşınan birim sayısı
+    carried = 0
+
+    def flush(overlap: bool) -> None:
+        nonlocal current, size, chunk_section, carried
+        if len(current) <= carried:
+            # Yalnızca önceki parçadan taşınan örtüşme kaldıysa yeni parça çıkmaz
+            current, size, carried = [], 0, 0
+            return
+        parts = []
+        for i, (paragraph, text, _) in enumerate(current):
+            if i:
+                parts.append(' ' if current[i - 1][0] == paragraph else '\n\n')
+            parts.append(text)
+        text = ''.join(parts)
+        chunks.append({'section': chunk_section, 'text': text, 'tokens': tokenizer(text)})
+        tail: List[Tuple[int, str, int]] = []
+        if overlap:
+            # Örtüşme sondaki cümlelerden alınır; cümle bölünmez
+            tail_size = 0
+            for paragraph, unit_text, _ in reversed(current):
+                for sentence in reversed(_SENTENCE_END.split(unit_text)):
+                    tokens = tokenizer(sentence)
+                    if tail_size + tokens > overlap_tokens:
+                        break
+                    tail.insert(0, (paragraph, sentence, tokens))
+                    tail_size += tokens
+                else:
+                    continue
+                break
+        current = tail
+        carried = len(tail)
+        size = sum(unit[2] for unit in tail)
+        chunk_section = section
+
+    for number, (is_heading, paragraph) in enumerate(iter_paragraphs(content)):
+        if is_heading:
+            if size >= max_tokens // 4:
+                flush(overlap=False)
+            section = _HEADING.match(paragraph).group(1)
+            if not current:
+                chunk_section = section
+        tokens = tokenizer(paragraph)
+        units = [(paragraph, tokens)] if tokens <= max_tokens else _split_long(paragraph, max_tokens, tokenizer)
+        for text, tokens in units:
+            if size + tokens > max_tokens:
+                # Yalnızca önceki parçadan taşınan örtüşmeden oluşan parça yazılmaz
+                if len(current) > carried:
+                    flush(overlap=True)
+                # Örtüşme ile birlikte sığmıyorsa örtüşmenin başından birim atılır
+                while current and size + tokens > max_tokens:
+                    size -= current.pop(0)[2]
+                carried = len(current)
+            if not current:
+                chunk_section = section
+            current.append((number, text, tokens))
+            size += tokens
+    flush(overlap=False)
+    return chunks
+
+
+def text_hash(title: str, content: str) -> str:
+    return hashlib.sha1(f'{title}\x1f{content}'.encode('utf-8')).hexdigest()
+
+
+def _meta_hash(metadata: Dict[str, object]) -> str:
+    return hashlib.sha1(json.dumps(metadata, sort_keys=True, ensure_ascii=False, default=str)
+                        .encode('utf-8')).hexdigest()
+
+
+class ChunkCache:
+    """
+    Kayıt başına (tür, anahtar) -> (metin özeti, metadata özeti, parçalar JSON) deposu.
+    params parçalama ayarlarıdır; kayıtlı ayarlardan farklıysa önbellek boşaltılır.
+    """
+
+    def __init__(self, path: str, params: Dict[str, object]):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs (kind TEXT NOT NULL, key TEXT NOT NULL, text_hash TEXT NOT NULL, "
+            "meta_hash TEXT NOT NULL, chunks TEXT NOT NULL, PRIMARY KEY (kind, key)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        encoded = json.dumps(params, sort_keys=True)
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'params'").fetchone()
+        self.invalidated = row is not None and row[0] != encoded
+        if row is None or self.invalidated:
+            self._conn.execute("DELETE FROM docs")
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('params', ?)", (encoded,))
+        self._conn.commit()
+
+    def hashes(self, kind: str) -> Dict[str, Tuple[str, str]]:
+        """{anahtar: (metin özeti, metadata özeti)}"""
+        return {key: (text, meta) for key, text, meta in self._conn.execute(
+            "SELECT key, text_hash, meta_hash FROM docs WHERE kind = ?", (kind,))}
+
+    def chunks(self, kind: str, key: str) -> List[Dict[str, object]]:
+        row = self._conn.execute("SELECT chunks FROM docs WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def put(self, kind: str, key: str, text_digest: str, meta_digest: str, chunks: List[Dict[str, object]]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO docs (kind, key, text_hash, meta_hash, chunks) VALUES (?, ?, ?, ?, ?)",
+            (kind, key, text_digest, meta_digest, json.dumps(chunks, ensure_ascii=False)))
+
+    def remove(self, kind: str, keys: Iterable[str]) -> None:
+        self._conn.executemany("DELETE FROM docs WHERE kind = ? AND key = ?", ((kind, key) for key in keys))
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.commit()
+        self._conn.close()
+
+
+class ChunkWriter:
+    """
+    Kayıtları parçalayıp JSONL'e yazar. Blog kayıtları add() ile, ürünler urunayiklama'nın sink arayüzü
+    write(grup, satır) ile eklenir. Önbellek her batch_size kayıtta, çıktı diske boşaltıldıktan sonra
+    kaydedilir; yarıda kalan çalışmada yazılmamış parçalar önbellekte görünmez.
+
+    close() sayıları döndürür; sync=True ise (tam çalışma) bu çalışmada görülmeyen kayıtlar önbellekten
+    silinir ve changed_only modunda silindi olarak yazılır.
+    """
+
+    def __init__(self, output_file: str, cache_path: Optional[str] = None,
+                 max_tokens: int = DEFAULT_MAX_TOKENS, overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+                 encoding: Optional[str] = None, changed_only: bool = False, batch_size: int = 200):
+        self.output_file = output_file
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        tokenizer_name, self.tokenizer = make_tokenizer(encoding)
+        self.changed_only = changed_only
+        self.batch_size = batch_size
+        cache_path = cache_path or os.path.join(os.path.dirname(os.path.abspath(output_file)), CACHE_FILE)
+        self.cache = ChunkCache(cache_path, {'max_tokens': max_tokens, 'overlap_tokens': overlap_tokens,
+                                             'tokenizer': tokenizer_name})
+        self.counts = {'added': 0, 'changed': 0, 'unchanged': 0, 'removed': 0, 'chunks': 0, 'chunked': 0}
+        self._known: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        self._seen: Dict[str, set] = {}
+        self._pending = 0
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        self._file = open(output_file, 'w', encoding='utf-8')
+
+    def __enter__(self) -> "ChunkWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        self.close(sync=exc_type is None)
+
+    def add(self, kind: str, key: str, title: str, content: str, **metadata) -> int:
+        """
+        Kaydı parçalar (metni değişmemişse önbellekten alır) ve parçaları yazar. Aynı çalışmada tekrar
+        gelen anahtar atlanır. Returns: yazılan parça sayısı
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Bilinmeyen kayıt türü: {kind} (seçenekler: {', '.join(KINDS)})")
+        if kind not in self._known:
+            self._known[kind] = self.cache.hashes(kind)
+            self._seen[kind] = set()
+        seen = self._seen[kind]
+        if key in seen:
+            return 0
+        seen.add(key)
+        metadata = {'url': metadata.pop('url', key), 'title': title, **metadata}
+        text_digest, meta_digest = text_hash(title, content), _meta_hash(metadata)
+        old = self._known[kind].get(key)
+
+        if old is not None and old[0] == text_digest:
+            chunks = self.cache.chunks(kind, key)
+            if old[1] == meta_digest:
+                self.counts['unchanged'] += 1
+                if self.changed_only:
+                    return 0
+            else:
+                self.counts['changed'] += 1
+                self.cache.put(kind, key, text_digest, meta_digest, chunks)
+        else:
+            chunks = chunk_text(content, self.max_tokens, self.overlap_tokens, self.tokenizer)
+            self.counts['chunked'] += 1
+            self.counts['changed' if old is not None else 'added'] += 1
+            self.cache.put(kind, key, text_digest, meta_digest, chunks)
+
+        doc_id = hashlib.sha1(f'{kind}\x1f{key}\x1f{text_digest}'.encode('utf-8')).hexdigest()[:16]
+        lines = []
+        for i, chunk in enumerate(chunks):
+            record = {'id': f'{doc_id}-{i}', 'kind': kind, 'key': key, **metadata,
+                      'chunk': i, 'chunks': len(chunks), **chunk, 'content_hash': text_digest}
+            lines.append(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        self._file.write(''.join(lines))
+        self.counts['chunks'] += len(lines)
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self._commit()
+        return len(lines)
+
+    def write(self, group: str, product_data: List[str]) -> None:
+        """urunayiklama sink arayüzü: ürün satırını (cinsiyet, başlık, link, fiyat, açıklama) ekler"""
+        gender, title, link, price, description = product_data[:5]
+        amount, currency = parse_price(price)
+        # Başlık da aranabilsin diye metnin başına konur; açıklaması boş ürün de tek parça olur
+        self.add(PRODUCT, product_key(link), title, f'{title}\n\n{description}', url=link, group=group,
+                 gender=gender, price=str(amount) if amount is not None else None, currency=currency)
+
+    def _commit(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.cache.commit()
+        self._pending = 0
+
+    def close(self, sync: bool = True) -> Dict[str, int]:
+        if self._file.closed:
+            return self.counts
+        if sync:
+            for kind, known in self._known.items():
+                removed = [key for key in known if key not in self._seen[kind]]
+                if self.changed_only:
+                    self._file.write(''.join(
+                        json.dumps({'kind': kind, 'key': key, 'removed': True}, ensure_ascii=False) + '\n'
+                        for key in removed))
+                self.cache.remove(kind, removed)
+                self.counts['removed'] += len(removed)
+        self._commit()
+        self._file.close()
+        self.cache.close()
+        return self.counts
+
+
+def chunk_blog_file(input_file: str, writer: ChunkWriter) -> Dict[str, int]:
+    """crawler.py çıktısındaki (blog_contents.txt ya da .jsonl) yazıları akış halinde parçalar"""
+    for url, title, content in iter_blog_file(input_file):
+        writer.add(BLOG, url, title, content)
+    return writer.counts
+
+
+def chunk_product_csvs(directory: str, writer: ChunkWriter) -> Dict[str, int]:
+    """sarar_*_urunler.csv dosyalarındaki ürünleri parçalar"""
+    for group, row in iter_csv_products(directory):
+        writer.write(group, row)
+    return writer.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blog ve ürün metinlerini token sınırlı parçalara böler")
+    parser.add_argument('--output', required=True, help="Parçaların yazılacağı JSONL dosyası")
+    parser.add_argument('--cache', default=None, help=f"Önbellek dosyası (varsayılan: çıktı dizininde {CACHE_FILE})")
+    parser.add_argument('--max-tokens', type=int, default=DEFAULT_MAX_TOKENS)
+    parser.add_argument('--overlap-tokens', type=int, default=DEFAULT_OVERLAP_TOKENS)
+    parser.add_argument('--encoding', default=None, help="tiktoken kodlaması (ör. cl100k_base); verilmezse tahmin")
+    parser.add_argument('--changed-only', action='store_true',
+                        help="Yalnızca eklenen/değişen kayıtların parçalarını ve silinen kayıtları yaz")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    blogs = subparsers.add_parser('blogs', help="crawler.py çıktısını parçala")
+    blogs.add_argument('input', help="blog_contents.txt ya da .jsonl")
+    products = subparsers.add_parser('products', help="Ürün CSV'lerini parçala")
+    products.add_argument('csv_dir', help="sarar_*_urunler.csv dosyalarının dizini")
+    args = parser.parse_args()
+
+    with ChunkWriter(args.output, args.cache, args.max_tokens, args.overlap_tokens, args.encoding,
+                     args.changed_only) as writer:
+        if writer.cache.invalidated:
+            print("Parçalama ayarları değişti, önbellek boşaltıldı.")
+        if args.command == 'blogs':
+            chunk_blog_file(args.input, writer)
+        else:
+            chunk_product_csvs(args.csv_dir, writer)
+    print(f"Parçalar yazıldı ({args.output}): {writer.counts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,107 @@
-import requests
-from bs4 import BeautifulSoup
-import xml.etree.ElementTree as ET
 import os
+import asyncio
 import time
+import argparse
+import socket
+import itertools
 from urllib.parse import urljoin
 import logging
-from typing import List, Set
+from typing import Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 
+from fetcher import AsyncFetcher
+from fetch_control import RetryPolicy
+from fetch_cache import FetchCache, content_hash
+from frontier import Frontier, FETCHED, EXTRACTED, WRITTEN, FAILED, SKIPPED
+from sitemap import iter_sitemap
+from extractors import BACKENDS, extract_blog_post
+from sink import FORMATS, OutputWriter, format_jsonl, format_text, make_record
+from dedup import ACTIONS as DEDUP_ACTIONS, Deduplicator
+from metrics import Metrics, MetricsReporter
+from search_index import BLOG, SearchIndex, iter_blog_file
+from page_archive import PageArchive
+from shared_frontier import LeaseLost, SharedFrontier, open_shared_frontier
+from urlset import SeenSet, canonical_url
+from chunker import ChunkWriter, chunk_blog_file
+
 class SitemapCrawler:
-    def __init__(self, output_path: str = "C:\\sarar_urun2"):
+    def __init__(self, output_path: str = "C:\\sarar_urun2", concurrency: int = 5,
+                 rate_per_host: float = 1.0, burst: int = 1, use_cache: bool = True,
+                 cache_path: Optional[str] = None, frontier_path: Optional[str] = None,
+                 checkpoint_every: int = 50, extractor: str = 'soup', output_format: str = 'text',
+                 ordered: bool = True, dedup: Optional[str] = None, dedup_threshold: float = 0.95,
+                 dedup_path: Optional[str] = None, log_urls: bool = False,
+                 metrics_path: Optional[str] = None, metrics_interval: Optional[float] = None,
+                 max_concurrency: Optional[int] = None, max_retries: int = 3,
+                 index_path: Optional[str] = None, archive_path: Optional[str] = None,
+                 expected_urls: int = 100_000, bloom_fp: Optional[float] = None, bloom_only: bool = False,
+                 chunks_path: Optional[str] = None, chunks_changed_only: bool = False):
+        if extractor not in BACKENDS:
+            raise ValueError(f"Bilinmeyen extractor: {extractor} (seçenekler: {', '.join(BACKENDS)})")
+        if output_format not in FORMATS:
+            raise ValueError(f"Bilinmeyen çıktı biçimi: {output_format} (seçenekler: {', '.join(FORMATS)})")
+        if dedup is not None and dedup not in DEDUP_ACTIONS:
+            raise ValueError(f"Bilinmeyen dedup işlemi: {dedup} (seçenekler: {', '.join(DEDUP_ACTIONS)})")
         self.output_path = output_path
-        self.visited_urls: Set[str] = set()
+        # Çıktı biçimi ('text' ya da 'jsonl') ve kayıtların sitemap sırasıyla yazılıp yazılmayacağı
+        self.output_format = output_format
+        self.ordered = ordered
+        # İçerik çıkarma backend'i: 'soup' (tam ağaç) ya da 'lxml' (hızlı, yalnızca hedef alt ağaç)
+        self.extractor = extractor
+        # Sitemap'te görülen URL'ler kanonik biçimlerinin 8 baytlık özetiyle tutulur: sondaki '/', fragment ve
+        # izleme/currency parametresi farklı varyantlar tek URL sayılır. bloom_fp verilirse önünde Bloom
+        # filtresi durur; bloom_only ise yalnızca filtre kullanılır (sabit bellek, yanlış pozitifler atlanır)
+        self.expected_urls = expected_urls
+        self.bloom_fp = bloom_fp if bloom_fp or not bloom_only else 0.01
+        self.bloom_only = bloom_only
+        self.visited_urls = self._seen_set()
+        # Aynı anda yapılacak istek sayısı ve host başına saniyedeki istek limiti
+        self.concurrency = concurrency
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        # max_concurrency verilirse eşzamanlılık sunucu yanıtlarına göre (AIMD) bu değere kadar artabilir
+        self.max_concurrency = max(concurrency, max_concurrency or concurrency)
+        # 429/5xx ve ağ hatalarında üstel bekleme + jitter ile yeniden deneme
+        self.retry_policy = RetryPolicy(max_retries=max_retries)
+        
+        # Önceki çalışmalardan kalan URL önbelleği (lastmod, ETag, Last-Modified, içerik özeti)
+        self.cache: Optional[FetchCache] = None
+        if use_cache:
+            os.makedirs(output_path, exist_ok=True)
+            self.cache = FetchCache(cache_path or os.path.join(output_path, 'crawl_cache.db'))
+        
+        # URL durumlarını tutan kalıcı frontier, yarıda kalan taramaların devamı için
+        os.makedirs(output_path, exist_ok=True)
+        self.frontier = Frontier(frontier_path or os.path.join(output_path, 'frontier.db'),
+                                 batch_size=checkpoint_every)
+        
+        # Yakın kopya tespiti: 'drop' kopyaları yazmaz, 'tag' duplicate_of alanıyla işaretler
+        self.dedup_action = dedup
+        self.dedup: Optional[Deduplicator] = None
+        if dedup:
+            self.dedup = Deduplicator(dedup_path or os.path.join(output_path, 'dedup.db'),
+                                      threshold=dedup_threshold)
+        
+        # Aşama süreleri, durum kodları, aktarılan bayt ve kuyruk derinlikleri.
+        # metrics_path verilirse tarama sonunda (ve metrics_interval saniyede bir) dosyaya yazılır.
+        self.metrics = Metrics()
+        self.metrics_path = metrics_path
+        self.metrics_interval = metrics_interval
+        
+        # Verilirse tarama sonunda çıktı dosyası bu arama indeksine işlenir (yalnızca değişen yazılar)
+        self.index_path = index_path
+        
+        # Verilirse tarama sonunda yazılar token sınırlı parçalara bölünüp bu JSONL'e yazılır (bkz. chunker.py);
+        # metni değişmeyen yazılar önbellekten gelir, chunks_changed_only ile yalnızca değişenler yazılır
+        self.chunks_path = chunks_path
+        self.chunks_changed_only = chunks_changed_only
+        
+        # Verilirse çekilen her yanıt (sıkıştırılmış gövdesiyle) bu arşive eklenir; çıkarma kuralları
+        # değiştiğinde `page_archive.py reextract` ile site yeniden taranmadan içerik çıkarılabilir
+        self.archive: Optional[PageArchive] = PageArchive(archive_path) if archive_path else None
+        
+        # URL başına log satırları (DEBUG) isteğe bağlıdır; yük altında ciddi zaman harcar
+        self.log_urls = log_urls
         
         # Loglama için klasör oluştur
         self.log_dir = os.path.join(output_path, 'logs')
@@ -21,7 +111,7 @@ class SitemapCrawler:
         log_file = os.path.join(self.log_dir, f'crawler_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
         
         logging.basicConfig(
-            level=logging.DEBUG,
+            level=logging.DEBUG if log_urls else logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.FileHandler(log_file, encoding='utf-8'),
@@ -34,54 +124,39 @@ class SitemapCrawler:
         self.logger.info(f"Çıktı klasörü: {output_path}")
         self.logger.info(f"Log dosyası: {log_file}")
 
-    def fetch_url(self, url: str) -> str:
+    def _seen_set(self) -> SeenSet:
+        return SeenSet(self.expected_urls, key=canonical_url, bloom_fp=self.bloom_fp, exact=not self.bloom_only)
+
+    def _report_seen(self) -> None:
+        """Görüldü kümesinin boyutunu ve Bloom yanlış pozitif oranını metriklere yazar"""
+        self.metrics.gauge('seen_urls', len(self.visited_urls))
+        self.metrics.gauge('seen_set_bytes', self.visited_urls.nbytes)
+        fp_rate = self.visited_urls.fp_rate()
+        if fp_rate is not None:
+            self.metrics.gauge('seen_bloom_fp_rate', round(fp_rate, 6))
+
+    def iter_sitemap_urls(self, sitemap_url: str,
+                          seen: Optional[SeenSet] = None) -> Iterator[Tuple[str, Optional[str]]]:
         """
-        Verilen URL'den içeriği getirir ve hata durumlarını yönetir.
+        Sitemap'i akış halinde okur ve görülmemiş (url, lastmod) çiftlerini ayrıştırıldıkça üretir.
+        Sitemap index ve .xml.gz dosyaları desteklenir. Kanonik biçimi daha önce görülen varyantlar
+        frontier'a hiç girmez; her kanonik URL için sitemap'teki ilk yazımı çekilir.
+        seen verilmezse üretilen URL'ler visited_urls'e eklenir.
         """
-        self.logger.debug(f"URL getiriliyor: {url}")
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            self.logger.debug(f"URL başarıyla getirildi: {url} (Status: {response.status_code})")
-            return response.text
-        except requests.RequestException as e:
-            self.logger.error(f"URL'ye erişilirken hata oluştu {url}: {str(e)}")
-            return ""
+        seen = self.visited_urls if seen is None else seen
+        for loc, lastmod in iter_sitemap(sitemap_url, logger=self.logger):
+            if seen.add(loc):
+                self.logger.debug(f"Yeni URL bulundu: {loc}")
+                yield loc, lastmod
 
     def parse_sitemap(self, sitemap_url: str) -> List[str]:
         """
-        Sitemap'ten URL'leri ayıklar.
+        Sitemap'ten ziyaret edilmemiş URL'leri ayıklar. Kanonik biçimi aynı olan varyantlardan
+        yalnızca ilki alınır; visited_urls değişmez.
         """
         self.logger.info(f"Sitemap ayrıştırılıyor: {sitemap_url}")
-        urls = []
-        content = self.fetch_url(sitemap_url)
-        
-        if not content:
-            self.logger.error("Sitemap içeriği boş!")
-            return urls
-
-        try:
-            root = ET.fromstring(content)
-            namespace = root.tag.split('}')[0] + '}'
-            self.logger.debug(f"XML namespace: {namespace}")
-            
-            # URL'leri topla
-            url_elements = root.findall(f'.//{namespace}url')
-            self.logger.info(f"Bulunan URL sayısı: {len(url_elements)}")
-            
-            for url in url_elements:
-                loc = url.find(f'{namespace}loc')
-                if loc is not None and loc.text not in self.visited_urls:
-                    self.logger.debug(f"Yeni URL bulundu: {loc.text}")
-                    urls.append(loc.text)
-            
-        except ET.ParseError as e:
-            self.logger.error(f"Sitemap ayrıştırılırken hata oluştu: {str(e)}")
-            
+        urls = [loc for loc, _ in self.iter_sitemap_urls(sitemap_url, self._seen_set())
+                if loc not in self.visited_urls]
         self.logger.info(f"Toplam bulunan benzersiz URL sayısı: {len(urls)}")
         return urls
 
@@ -92,34 +167,13 @@ class SitemapCrawler:
         """
         self.logger.debug(f"İçerik çıkarma başlıyor: {url}")
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Sadece blog-single-content div'ini bul
-            content_div = soup.find('div', class_='blog-single-content')
-            if not content_div:
+            with self.metrics.time('parse_seconds'):
+                result = extract_blog_post(html, backend=self.extractor)
+            if result is None:
                 self.logger.warning(f"blog-single-content div'i bulunamadı: {url}")
                 return None, None
             
-            # Başlığı al (h2 etiketinden)
-            title = content_div.find('h2')
-            title = title.text.strip() if title else 'Başlık bulunamadı'
-            
-            # İçeriği temizle ve formatla
-            content_text = []
-            
-            # Tüm paragraf ve başlıkları topla
-            for element in content_div.find_all(['p', 'h2']):
-                if element.name == 'h2':
-                    # Başlıkları belirgin yap
-                    content_text.append(f"\n### {element.text.strip()} ###\n")
-                else:
-                    # Normal paragrafları ekle
-                    text = element.text.strip()
-                    if text:  # Boş paragrafları atlama
-                        content_text.append(text)
-            
-            final_content = '\n\n'.join(content_text)
-            
+            title, final_content = result
             if not final_content:
                 self.logger.warning(f"İçerik boş: {url}")
                 return None, None
@@ -130,52 +184,369 @@ class SitemapCrawler:
             self.logger.error(f"İçerik çıkarılırken hata oluştu: {str(e)}")
             return None, None
 
-    def crawl_and_save(self, sitemap_url: str) -> None:
+    def format_record(self, record: dict) -> str:
+        """
+        Tek bir blog kaydını metin çıktı biçimine çevirir.
+        """
+        return format_text(record)
+
+    def _on_written(self, records: List[dict]) -> bool:
+        """
+        Yazıcı thread'inde, toplu yazımdan sonra frontier durumlarını günceller.
+        Returns: checkpoint zamanı geldiyse True
+        """
+        checkpoint_due = False
+        for record in records:
+            if record['content'] is not None:
+                self.logger.debug(f"İçerik başarıyla kaydedildi: {record['url']}")
+                checkpoint_due |= self.frontier.mark(record['url'], WRITTEN)
+                self.metrics.inc('pages_total', state=WRITTEN)
+            elif record.get('duplicate_of'):
+                checkpoint_due |= self.frontier.mark(record['url'], SKIPPED, f"kopya: {record['duplicate_of']}")
+                self.metrics.inc('pages_total', state=SKIPPED)
+            else:
+                checkpoint_due |= self.frontier.mark(record['url'], FAILED, "içerik alınamadı")
+                self.metrics.inc('pages_total', state=FAILED)
+        return checkpoint_due
+
+    async def _fetch_and_extract(self, fetcher: AsyncFetcher, url: str,
+                                 lastmod: Optional[str] = None, mark_frontier: bool = True) -> tuple:
+        """
+        URL'yi önbelleği dikkate alarak çeker ve içeriği çıkarır.
+        Sitemap lastmod değişmemişse istek atılmaz, 304 yanıtında saklanan çıkarım kullanılır.
+        Arşiv açıksa ve URL arşivde yoksa önbellek atlanır ve koşulsuz istek atılır; böylece mevcut bir
+        taramada başlatılan arşiv de her sayfanın tam yanıtını içerir.
+        mark_frontier=False ise yerel frontier güncellenmez (dağıtık modda durum ortak frontier'dadır).
+        Returns: (başlık, içerik, çekim zamanı) tuple'ı; önbellekten gelen içerikte çekim zamanı
+                 önbelleğe yazıldığı andır
+        """
+        if self.cache is None:
+            response = await fetcher.fetch_response(url)
+            if response is None:
+                return None, None, None
+            await self._archive_response(response)
+            html_content = response['body'].decode(response['encoding'], errors='replace')
+            if not html_content:
+                return None, None, None
+            if mark_frontier:
+                self.frontier.mark(url, FETCHED)
+            # Ayrıştırma CPU işi olduğu için event loop'u bloklamasın
+            title, extracted_content = await asyncio.to_thread(self.extract_content, html_content, url)
+            return title, extracted_content, response['fetched_at']
+
+        # Arşivde olmayan URL'ler için 304 ya da lastmod atlaması arşive yazılacak gövdeyi kaybettirir
+        archived = self.archive is None or await asyncio.to_thread(self.archive.has, url)
+        fresh = self.cache.is_fresh(url, lastmod) if archived else None
+        if fresh:
+            self.logger.debug(f"Değişmemiş URL atlandı (lastmod={lastmod}): {url}")
+            self.metrics.inc('cache_hits_total', kind='lastmod')
+            return fresh['title'], fresh['content'], fresh['fetched_at']
+
+        entry = self.cache.get(url)
+        headers = FetchCache.conditional_headers(entry) if archived else None
+        response = await fetcher.fetch_response(url, headers=headers)
+        if response is None:
+            return None, None, None
+        if mark_frontier:
+            self.frontier.mark(url, FETCHED)
+
+        if response['status'] == 304 and entry:
+            self.logger.debug(f"304 Not Modified, önbellekteki içerik kullanılıyor: {url}")
+            self.metrics.inc('cache_hits_total', kind='not_modified')
+            self.cache.touch(url, lastmod)
+            return entry['title'], entry['content'], response['fetched_at']
+
+        await self._archive_response(response)
+        body_hash = content_hash(response['body'])
+        if entry and entry['content_hash'] == body_hash and entry['content'] is not None:
+            # Gövde aynı, yeniden ayrıştırmaya gerek yok
+            title, extracted_content = entry['title'], entry['content']
+        else:
+            html_content = response['body'].decode(response['encoding'], errors='replace')
+            title, extracted_content = await asyncio.to_thread(self.extract_content, html_content, url)
+
+        self.cache.put(
+            url,
+            lastmod=lastmod,
+            etag=response['headers'].get('ETag'),
+            last_modified=response['headers'].get('Last-Modified'),
+            content_hash=body_hash,
+            title=title,
+            content=extracted_content,
+            fetched_at=response['fetched_at'],
+        )
+        return title, extracted_content, response['fetched_at']
+
+    async def _archive_response(self, response: dict) -> None:
+        """Arşiv açıksa yanıtı sunucudan geldiği haliyle arşive ekler"""
+        if self.archive is None:
+            return
+        start = time.perf_counter()
+        await asyncio.to_thread(self.archive.add, response['url'], response['status'],
+                                response['headers'].items(), response['raw_body'], response['reason'])
+        self.metrics.observe('archive_seconds', time.perf_counter() - start)
+        self.metrics.inc('archived_bytes_total', len(response['raw_body']))
+
+    def _url_source(self, sitemap_url: str, resume: bool) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Taranacak (url, lastmod) çiftlerini üretir.
+        Devam modunda önce frontier'da yarım kalan URL'ler, ardından sitemap'ten gelen yeni URL'ler verilir.
+        """
+        if resume:
+            # Önceki çalışmada eklenen URL'lerin sitemap'teki varyantları yeniden eklenmez
+            for url in self.frontier.urls():
+                self.visited_urls.add(url)
+            # Sitemap'ten gelen lastmod frontier'da saklanır; devam eden URL'ler de lastmod atlamasından yararlanır
+            yield from self.frontier.remaining()
+        it = self.iter_sitemap_urls(sitemap_url)
+        while True:
+            batch = dict(itertools.islice(it, 500))
+            if not batch:
+                return
+            for url in self.frontier.add(batch):
+                yield url, batch[url]
+
+    async def _dedup_record(self, url: str, title: str, content: str, fetched_at: Optional[str]) -> dict:
+        """
+        Yazıcıya gidecek kaydı oluşturur, dedup açıksa yakın kopyaları atar ya da işaretler.
+        """
+        if self.dedup is None:
+            return make_record(url, content, title, fetched_at)
+        start = time.perf_counter()
+        match = await asyncio.to_thread(self.dedup.check, url, content)
+        self.metrics.observe('dedup_seconds', time.perf_counter() - start)
+        if match is None:
+            return make_record(url, content, title, fetched_at)
+        self.metrics.inc('duplicates_total', action=self.dedup_action)
+        duplicate_of, similarity = match
+        self.logger.debug(f"Yakın kopya ({similarity:.2f}) {url} -> {duplicate_of}")
+        if self.dedup_action == 'drop':
+            return make_record(url, None, title, fetched_at, duplicate_of=duplicate_of)
+        return make_record(url, content, title, fetched_at, duplicate_of=duplicate_of,
+                           similarity=round(similarity, 4))
+
+    async def _crawl_async(self, source: Iterable[Tuple[str, Optional[str]]],
+                           writer: OutputWriter) -> Tuple[int, int]:
+        """
+        URL'leri ortak bağlantı havuzu üzerinden eşzamanlı çeker.
+        URL'ler sitemap ayrıştırılırken kuyruğa alınır, son sitemap inmeden çekim başlar.
+        Her URL için sitemap sıra numarasıyla birlikte yazıcıya bir kayıt gönderilir.
+        Returns: (bulunan, işlenen) URL sayıları
+        """
+        # Sınırlı kuyruk: sitemap ayrıştırma çekimden çok öndeyse bekler
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency * 4)
+
+        discovered_urls = 0
+        processed_urls = 0
+
+        async def producer() -> None:
+            nonlocal discovered_urls
+            it = iter(source)
+            try:
+                while True:
+                    # Sitemap okuma bloklayan I/O, parça parça thread'de ilerletilir
+                    batch = await asyncio.to_thread(lambda: list(itertools.islice(it, 100)))
+                    if not batch:
+                        break
+                    for url, lastmod in batch:
+                        await queue.put((discovered_urls, url, lastmod))
+                        discovered_urls += 1
+            finally:
+                for _ in range(self.max_concurrency):
+                    await queue.put(None)
+
+        async def worker(fetcher: AsyncFetcher) -> None:
+            nonlocal processed_urls
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                index, url, lastmod = item
+
+                self.logger.debug(f"İşleniyor [{index + 1}/{discovered_urls}]: {url}")
+                self.metrics.gauge('queue_depth', queue.qsize(), queue='urls')
+                title, extracted_content, fetched_at = await self._fetch_and_extract(fetcher, url, lastmod)
+                if title and extracted_content:
+                    self.frontier.mark(url, EXTRACTED)
+                    writer.put(index, await self._dedup_record(url, title, extracted_content, fetched_at))
+                else:
+                    writer.put(index, make_record(url, None))
+                processed_urls += 1
+                self.logger.debug(f"İlerleme: {processed_urls}/{discovered_urls} (bulunan)")
+                if processed_urls % 100 == 0:
+                    self.logger.info(f"İlerleme: {processed_urls}/{discovered_urls} (bulunan)")
+                    self._report_seen()
+
+        # Worker sayısı üst sınır kadardır; o anda kaç isteğin uçuşta olacağını fetcher'ın AIMD kapısı belirler
+        async with AsyncFetcher(concurrency=self.concurrency, rate_per_host=self.rate_per_host,
+                                burst=self.burst, logger=self.logger, metrics=self.metrics,
+                                max_concurrency=self.max_concurrency,
+                                retry_policy=self.retry_policy,
+                                keep_raw=self.archive is not None) as fetcher:
+            await asyncio.gather(producer(), *(worker(fetcher) for _ in range(self.max_concurrency)))
+
+        self._report_seen()
+        return discovered_urls, processed_urls
+
+    async def _crawl_lease(self, shared: SharedFrontier, lease: dict, fetcher: AsyncFetcher,
+                           lease_seconds: float, claim_size: int) -> int:
+        """
+        Kiralanan shard'daki URL'leri claim_size'lık parçalarla çeker ve sonuçları ortak frontier'a yazar.
+        Kira arka planda yenilenir; kira kaybedilirse ya da yenilenemezse LeaseLost verir ve sonuçlar yazılmaz.
+        Returns: işlenen URL sayısı
+        """
+        async def heartbeat() -> None:
+            while True:
+                await asyncio.sleep(lease_seconds / 3)
+                try:
+                    await asyncio.to_thread(shared.renew, lease, lease_seconds)
+                except LeaseLost:
+                    raise
+                except Exception as e:
+                    # Yenilenemeyen kiranın süresi dolmuş olabilir; shard başka düğüme geçmiş sayılır
+                    raise LeaseLost(f"Shard {lease['shard']} kirası yenilenemedi: {str(e)}") from e
+
+        async def process(url: str, lastmod: Optional[str]) -> dict:
+            title, extracted_content, fetched_at = await self._fetch_and_extract(fetcher, url, lastmod,
+                                                                               mark_frontier=False)
+            if title and extracted_content:
+                self.metrics.inc('pages_total', state=WRITTEN)
+                return make_record(url, extracted_content, title, fetched_at)
+            self.metrics.inc('pages_total', state=FAILED)
+            return make_record(url, None, error="içerik alınamadı")
+
+        renewer = asyncio.create_task(heartbeat())
+        processed = 0
+        try:
+            while True:
+                batch = await asyncio.to_thread(shared.claim, lease, claim_size)
+                if not batch:
+                    break
+                records = await asyncio.gather(*(process(url, lastmod) for url, lastmod in batch))
+                if renewer.done():
+                    # Yenileme başarısız oldu (LeaseLost): shard artık başka düğümde
+                    renewer.result()
+                await asyncio.to_thread(shared.complete, lease, records)
+                processed += len(records)
+                self.logger.info(f"Shard {lease['shard']}: {len(records)} URL tamamlandı")
+        finally:
+            renewer.cancel()
+            try:
+                await asyncio.to_thread(shared.release, lease)
+            except Exception as e:
+                # Bırakılamayan kiranın süresi dolunca shard başka bir düğüme geçer
+                self.logger.warning(f"Shard {lease['shard']} kirası bırakılamadı: {str(e)}")
+        return processed
+
+    async def _crawl_shared_async(self, shared: SharedFrontier, worker_id: str, shards: int,
+                                  lease_seconds: float, claim_size: int) -> int:
+        """
+        Aynı anda en fazla `shards` shard kiralayıp işler. Kiralanabilir shard kalmadığında, başka
+        düğümlerdeki shard'lar bitene (ya da kiraları dolup devralınana) kadar bekler.
+        Returns: bu düğümün işlediği URL sayısı
+        """
+        processed = 0
+
+        async def shard_worker(fetcher: AsyncFetcher) -> None:
+            nonlocal processed
+            while True:
+                lease = await asyncio.to_thread(shared.acquire, worker_id, lease_seconds)
+                if lease is None:
+                    if not await asyncio.to_thread(shared.unfinished):
+                        return
+                    await asyncio.sleep(min(lease_seconds / 4, 5))
+                    continue
+                self.metrics.inc('leases_total')
+                self.logger.info(f"Shard {lease['shard']} kiralandı (token {lease['token']})")
+                try:
+                    processed += await self._crawl_lease(shared, lease, fetcher, lease_seconds, claim_size)
+                except LeaseLost as e:
+                    self.metrics.inc('leases_lost_total')
+                    self.logger.warning(f"Kira kaybedildi, sonuçlar atıldı: {str(e)}")
+
+        async with AsyncFetcher(concurrency=self.concurrency, rate_per_host=self.rate_per_host,
+                                burst=self.burst, logger=self.logger, metrics=self.metrics,
+                                max_concurrency=self.max_concurrency,
+                                retry_policy=self.retry_policy,
+                                keep_raw=self.archive is not None) as fetcher:
+            await asyncio.gather(*(shard_worker(fetcher) for _ in range(max(1, shards))))
+        return processed
+
+    def crawl_shared(self, shared: SharedFrontier, worker_id: str, sitemap_urls: Iterable[str] = (),
+                     shards: int = 4, lease_seconds: float = 60, claim_size: int = 10) -> None:
+        """
+        Dağıtık mod: verilen sitemap'leri ortak frontier'a ekler (zaten ekliyse atlanır) ve frontier'daki
+        tüm URL'ler bitene kadar shard kiralayarak tarar. Düğümler taramanın ortasında katılıp ayrılabilir.
+        Sonuçlar ortak frontier'da birikir, çıktı `shared_frontier.py export` ile yazılır.
+        claim_size'lık bir parça lease_seconds içinde bitebilecek kadar küçük olmalıdır.
+        """
+        self.logger.info(f"Dağıtık tarama başlatılıyor (düğüm: {worker_id})")
+        for sitemap_url in sitemap_urls:
+            it = self.iter_sitemap_urls(sitemap_url)
+            added = 0
+            while True:
+                batch = list(itertools.islice(it, 500))
+                if not batch:
+                    break
+                added += shared.add(batch)
+            self.logger.info(f"Sitemap frontier'a eklendi: {sitemap_url} ({added} yeni URL)")
+
+        with MetricsReporter(self.metrics, self.metrics_path, self.metrics_interval):
+            try:
+                processed = asyncio.run(self._crawl_shared_async(shared, worker_id, shards, lease_seconds,
+                                                                 claim_size))
+            finally:
+                if self.archive is not None:
+                    self.archive.close()
+
+        self.logger.info("="*50)
+        self.logger.info(f"DAĞITIK TARAMA TAMAMLANDI - ÖZET (düğüm: {worker_id})")
+        self.logger.info(f"Bu düğümde işlenen URL sayısı: {processed}")
+        self.logger.info(f"Frontier: {shared.counts()}")
+        for line in self.metrics.summary():
+            self.logger.info(line)
+        self.logger.info("="*50)
+
+    def crawl_and_save(self, sitemap_url: str, resume: bool = False) -> None:
         """
         Sitemap'i crawl eder ve içerikleri bir dosyada birleştirir.
+        resume=True ise önceki çalışmanın frontier'ından devam edilir ve çıktı dosyasına ekleme yapılır.
         """
         self.logger.info(f"Crawling başlatılıyor: {sitemap_url}")
         
         try:
             os.makedirs(self.output_path, exist_ok=True)
-            output_file = os.path.join(self.output_path, "blog_contents.txt")
+            extension = 'jsonl' if self.output_format == 'jsonl' else 'txt'
+            output_file = os.path.join(self.output_path, f"blog_contents.{extension}")
             self.logger.info(f"Çıktı dosyası: {output_file}")
             
-            urls = self.parse_sitemap(sitemap_url)
-            total_urls = len(urls)
-            self.logger.info(f"İşlenecek toplam URL sayısı: {total_urls}")
+            if resume and self.frontier.get_meta('sitemap_url') not in (None, sitemap_url):
+                self.logger.warning("Frontier farklı bir sitemap'e ait, tarama baştan başlatılıyor")
+                resume = False
+            if not resume:
+                self.frontier.reset()
+                self.frontier.set_meta('sitemap_url', sitemap_url)
+            else:
+                # Son checkpoint'ten sonra yazılmış yarım kayıtları at
+                offset = self.frontier.output_offset()
+                if offset is not None and os.path.exists(output_file):
+                    os.truncate(output_file, offset)
+                self.logger.info("Önceki çalışmadan devam ediliyor")
             
-            processed_urls = 0
-            successful_urls = 0
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                for index, url in enumerate(urls, 1):
-                    if url in self.visited_urls:
-                        continue
-                        
-                    self.logger.info(f"İşleniyor [{index}/{total_urls}]: {url}")
-                    
-                    html_content = self.fetch_url(url)
-                    if html_content:
-                        title, extracted_content = self.extract_content(html_content, url)
-                        if title and extracted_content:
-                            f.write("\n" + "-"*100 + "\n")
-                            f.write(f"BAŞLIK: {title}\n")
-                            f.write(f"URL: {url}\n")
-                            f.write("-"*100 + "\n\n")
-                            f.write(extracted_content)
-                            f.write("\n\n")
-                            successful_urls += 1
-                            self.logger.info(f"İçerik başarıyla kaydedildi: {url}")
-                    
-                    processed_urls += 1
-                    self.visited_urls.add(url)
-                    
-                    # İlerleme durumunu göster
-                    progress = (processed_urls / total_urls) * 100
-                    self.logger.info(f"İlerleme: %{progress:.2f} ({processed_urls}/{total_urls})")
-                    
-                    time.sleep(1)
+            writer = OutputWriter(
+                output_file,
+                formatter=format_jsonl if self.output_format == 'jsonl' else self.format_record,
+                mode='a' if resume else 'w',
+                ordered=self.ordered,
+                on_written=self._on_written,
+                on_checkpoint=lambda offset: self.frontier.checkpoint(output_offset=offset),
+                logger=self.logger,
+                metrics=self.metrics,
+            )
+            with MetricsReporter(self.metrics, self.metrics_path, self.metrics_interval), writer:
+                total_urls, processed_urls = asyncio.run(
+                    self._crawl_async(self._url_source(sitemap_url, resume), writer))
+            successful_urls = writer.written
             
             # Final özeti
             self.logger.info("="*50)
@@ -183,23 +554,111 @@ class SitemapCrawler:
             self.logger.info(f"Toplam URL sayısı: {total_urls}")
             self.logger.info(f"İşlenen URL sayısı: {processed_urls}")
             self.logger.info(f"Başarılı URL sayısı: {successful_urls}")
-            self.logger.info(f"Başarı oranı: %{(successful_urls/total_urls*100):.2f}")
+            self.logger.info(f"Başarı oranı: %{(successful_urls/max(total_urls, 1)*100):.2f}")
             self.logger.info(f"Çıktı dosyası: {output_file}")
+            self.logger.info(f"Görülen URL kümesi: {self.visited_urls.stats()}")
+            for line in self.metrics.summary():
+                self.logger.info(line)
+            if self.metrics_path:
+                self.logger.info(f"Metrikler: {self.metrics_path}")
+            if self.archive is not None:
+                self.logger.info(f"Ham sayfa arşivi ({self.archive.path}): {self.archive.stats()}")
             self.logger.info("="*50)
             
+            if self.index_path:
+                with SearchIndex(self.index_path) as index:
+                    counts = index.sync(BLOG, iter_blog_file(output_file))
+                self.logger.info(f"Arama indeksi güncellendi ({self.index_path}): {counts}")
+            
+            if self.chunks_path:
+                with ChunkWriter(self.chunks_path, changed_only=self.chunks_changed_only) as chunks:
+                    chunk_blog_file(output_file, chunks)
+                self.logger.info(f"Yazı parçaları yazıldı ({self.chunks_path}): {chunks.counts}")
+            
         except Exception as e:
             self.logger.error(f"Crawling sırasında beklenmeyen hata: {str(e)}", exc_info=True)
             raise
+        finally:
+            # Hata ya da kesinti olsa da arşiv kapatılır; bekleyen arşiv kayıtları indekse işlenir
+            if self.archive is not None:
+                self.archive.close()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sarar blog sitemap crawler")
+    parser.add_argument("sitemap_urls", nargs="*",
+                        help="Sitemap URL'si (verilmezse sorulur); dağıtık modda birden çok verilebilir")
+    parser.add_argument("--resume", action="store_true",
+                        help="Yarıda kalan taramaya devam et, çıktıyı silmeden ekle")
+    parser.add_argument("--extractor", choices=BACKENDS, default='soup',
+                        help="İçerik çıkarma backend'i (lxml daha hızlıdır)")
+    parser.add_argument("--format", choices=FORMATS, default='text', dest='output_format',
+                        help="Çıktı biçimi: metin ya da JSONL (url, title, content, fetched_at, content_hash)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="Kayıtları sitemap sırası yerine tamamlanma sırasıyla yaz")
+    parser.add_argument("--dedup", choices=DEDUP_ACTIONS, default=None,
+                        help="Yakın kopyaları at (drop) ya da işaretle (tag)")
+    parser.add_argument("--dedup-threshold", type=float, default=0.95,
+                        help="Yakın kopya benzerlik eşiği (0-1, varsayılan 0.95)")
+    parser.add_argument("--max-concurrency", type=int, default=None,
+                        help="Sunucu sağlıklı yanıt verdikçe eşzamanlılığın çıkabileceği üst sınır (AIMD)")
+    parser.add_argument("--retries", type=int, default=3,
+                        help="429/5xx ve ağ hatalarında en fazla yeniden deneme sayısı")
+    parser.add_argument("--log-urls", action="store_true",
+                        help="URL başına log satırlarını (DEBUG) aç")
+    parser.add_argument("--metrics", dest="metrics_path", default=None,
+                        help="Metriklerin yazılacağı dosya (.prom: Prometheus metin biçimi, diğerleri: JSON)")
+    parser.add_argument("--metrics-interval", type=float, default=None,
+                        help="Metrik dosyasını tarama sırasında kaç saniyede bir güncelleyeceği")
+    parser.add_argument("--index", dest="index_path", default=None,
+                        help="Tarama sonunda yazıların eklendiği arama indeksi dizini (bkz. search_index.py)")
+    parser.add_argument("--chunks", dest="chunks_path", default=None,
+                        help="Tarama sonunda yazıların token sınırlı parçalarının yazılacağı JSONL (bkz. chunker.py)")
+    parser.add_argument("--chunks-changed-only", action="store_true",
+                        help="Parça dosyasına yalnızca eklenen/değişen yazıları ve silinenleri yaz")
+    parser.add_argument("--archive", dest="archive_path", default=None,
+                        help="Ham yanıtların sıkıştırılmış arşivi; yeniden çıkarma için (bkz. page_archive.py)")
+    parser.add_argument("--shared-frontier", default=None,
+                        help="Dağıtık mod: ortak frontier adresi (ör. sqlite://ortak/frontier.db, bkz. shared_frontier.py)")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Dağıtık modda düğüm adı (varsayılan: host-pid)")
+    parser.add_argument("--shards", type=int, default=4,
+                        help="Dağıtık modda aynı anda kiralanacak shard sayısı")
+    parser.add_argument("--lease-seconds", type=float, default=60,
+                        help="Dağıtık modda shard kira süresi; düğüm ölürse shard bu sürenin sonunda devredilir")
+    parser.add_argument("--expected-urls", type=int, default=100_000,
+                        help="Görülen URL kümesinin başlangıç boyutu (Bloom filtresi bu sayıya göre boyutlanır)")
+    parser.add_argument("--bloom-fp", type=float, default=None,
+                        help="Görülen URL kümesinin önüne bu yanlış pozitif oranıyla Bloom filtresi koy (ör. 0.01)")
+    parser.add_argument("--bloom-only", action="store_true",
+                        help="Yalnızca Bloom filtresi kullan: bellek sabit, yanlış pozitif URL'ler atlanır")
+    args = parser.parse_args()
+
     try:
-        sitemap_url = input("Sitemap URL'sini girin: ")
+        sitemap_urls = args.sitemap_urls
+        if not sitemap_urls and not args.shared_frontier:
+            sitemap_urls = [input("Sitemap URL'sini girin: ")]
+        if len(sitemap_urls) > 1 and not args.shared_frontier:
+            raise ValueError("Birden çok sitemap yalnızca dağıtık modda (--shared-frontier) verilebilir.")
         
-        if not sitemap_url.startswith(('http://', 'https://')):
-            raise ValueError("Geçersiz URL! URL 'http://' veya 'https://' ile başlamalıdır.")
+        for sitemap_url in sitemap_urls:
+            if not sitemap_url.startswith(('http://', 'https://')):
+                raise ValueError("Geçersiz URL! URL 'http://' veya 'https://' ile başlamalıdır.")
         
-        crawler = SitemapCrawler()
-        crawler.crawl_and_save(sitemap_url)
+        crawler = SitemapCrawler(extractor=args.extractor, output_format=args.output_format,
+                                 ordered=not args.unordered, dedup=args.dedup,
+                                 dedup_threshold=args.dedup_threshold, log_urls=args.log_urls,
+                                 metrics_path=args.metrics_path, metrics_interval=args.metrics_interval,
+                                 max_concurrency=args.max_concurrency, max_retries=args.retries,
+                                 index_path=args.index_path, archive_path=args.archive_path,
+                                 expected_urls=args.expected_urls, bloom_fp=args.bloom_fp,
+                                 bloom_only=args.bloom_only, chunks_path=args.chunks_path,
+                                 chunks_changed_only=args.chunks_changed_only)
+        if args.shared_frontier:
+            with open_shared_frontier(args.shared_frontier) as shared:
+                crawler.crawl_shared(shared, args.worker_id, sitemap_urls, shards=args.shards,
+                                     lease_seconds=args.lease_seconds)
+        else:
+            crawler.crawl_and_save(sitemap_urls[0], resume=args.resume)
         
     except KeyboardInterrupt:
         print("\nProgram kullanıcı tarafından durduruldu!")
@@ -0,0 +1,175 @@
+"""
+SimHash tabanlı yakın kopya tespiti.
+
+Her içeriğin 64 bitlik SimHash parmak izi çıkarılır. Parmak izi bantlara bölünerek SQLite'ta
+indekslenir: Hamming mesafesi en fazla k olan iki parmak izi, k+1 banttan en az birinde birebir
+aynıdır. Bu yüzden arama tüm derlemi taramaz, yalnızca ortak bandı olan adaylara bakar.
+İndeks diskte kalır, artımlı taramalar da önceki çalışmalarda görülen içeriklerden yararlanır.
+"""
+import re
+import sqlite3
+import hashlib
+import threading
+from typing import List, Optional, Tuple
+
+ACTIONS = ('drop', 'tag')
+
+BITS = 64
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def _signed(value: int) -> int:
+    """SQLite INTEGER işaretli 64 bit olduğu için dönüşüm"""
+    return value - (1 << BITS) if value >= 1 << (BITS - 1) else value
+
+
+def _unsigned(value: int) -> int:
+    return value + (1 << BITS) if value < 0 else value
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """Metnin kelime shingle'larından 64 bitlik SimHash parmak izini hesaplar"""
+    words = _WORD.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = [' '.join(words)]
+    else:
+        shingles = [' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+
+    # Her shingle özetinin bitleri sütun sütun sayılır; string üzerinde sayım Python döngüsünden hızlıdır
+    digests = [format(int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'big'), '064b')
+               for s in shingles]
+    half = len(digests) / 2
+    fingerprint = 0
+    for column in zip(*digests):
+        fingerprint = (fingerprint << 1) | (column.count('1') > half)
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class Deduplicator:
+    """
+    Kalıcı, bantlı SimHash indeksi.
+    threshold benzerlik eşiğidir (1 - hamming/64); eşik ve üstündeki içerikler yakın kopya sayılır.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.95):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold 0 ile 1 arasında olmalıdır")
+        self.path = path
+        self.threshold = threshold
+        self.max_distance = int((1 - threshold) * BITS)
+        self._bands = self._band_masks(self.max_distance + 1)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints (id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL, fp INTEGER NOT NULL)"
+        )
+        # URL yerine tamsayı id tutulan, (band, key) sıralı kompakt indeks
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bands (band INTEGER, key INTEGER, id INTEGER, "
+            "PRIMARY KEY (band, key, id)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'bands'").fetchone()
+        if row is None:
+            self._conn.execute("INSERT INTO meta VALUES ('bands', ?)", (str(len(self._bands)),))
+        elif int(row[0]) != len(self._bands):
+            # Eşik değişince bant düzeni de değişir; indeks mevcut parmak izlerinden yeniden kurulur
+            self._rebuild()
+        self._conn.commit()
+
+    @staticmethod
+    def _band_masks(count: int) -> List[Tuple[int, int]]:
+        """64 biti `count` banda böler. Returns: (kaydırma, maske) listesi"""
+        count = max(1, min(count, BITS))
+        bands = []
+        start = 0
+        for i in range(count):
+            width = BITS // count + (1 if i < BITS % count else 0)
+            bands.append((start, (1 << width) - 1))
+            start += width
+        return bands
+
+    def _keys(self, fingerprint: int) -> List[int]:
+        # Eşik 63/64'ün üstündeyse tek bant 64 bit genişliğindedir; anahtar da parmak izi gibi işaretli saklanır
+        return [_signed((fingerprint >> shift) & mask) for shift, mask in self._bands]
+
+    def _rebuild(self) -> None:
+        self._conn.execute("DELETE FROM bands")
+        rows = self._conn.execute("SELECT id, fp FROM fingerprints").fetchall()
+        self._conn.executemany(
+            "INSERT INTO bands VALUES (?, ?, ?)",
+            ((band, key, row_id) for row_id, fp in rows
+             for band, key in enumerate(self._keys(_unsigned(fp)))),
+        )
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('bands', ?)", (str(len(self._bands)),))
+
+    def find(self, url: str, fingerprint: int) -> Optional[Tuple[str, float]]:
+        """Başka bir URL'ye ait yakın kopyayı arar. Returns: (url, benzerlik) ya da None"""
+        with self._lock:
+            return self._find(url, fingerprint)
+
+    def add(self, url: str, fingerprint: int) -> None:
+        """URL'nin parmak izini indekse ekler ya da günceller"""
+        with self._lock:
+            self._add(url, fingerprint)
+
+    def _find(self, url: str, fingerprint: int) -> Optional[Tuple[str, float]]:
+        best = None
+        for band, key in enumerate(self._keys(fingerprint)):
+            rows = self._conn.execute(
+                "SELECT f.url, f.fp FROM bands b JOIN fingerprints f ON f.id = b.id "
+                "WHERE b.band = ? AND b.key = ?",
+                (band, key),
+            ).fetchall()
+            for other_url, other_fp in rows:
+                if other_url == url:
+                    continue
+                distance = hamming(fingerprint, _unsigned(other_fp))
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (other_url, distance)
+        if best is None:
+            return None
+        return best[0], 1 - best[1] / BITS
+
+    def _add(self, url: str, fingerprint: int) -> None:
+        with self._conn:
+            row = self._conn.execute("SELECT id, fp FROM fingerprints WHERE url = ?", (url,)).fetchone()
+            if row is not None:
+                row_id, old_fp = row
+                self._conn.executemany(
+                    "DELETE FROM bands WHERE band = ? AND key = ? AND id = ?",
+                    ((band, key, row_id) for band, key in enumerate(self._keys(_unsigned(old_fp)))),
+                )
+                self._conn.execute("UPDATE fingerprints SET fp = ? WHERE id = ?", (_signed(fingerprint), row_id))
+            else:
+                row_id = self._conn.execute(
+                    "INSERT INTO fingerprints (url, fp) VALUES (?, ?)", (url, _signed(fingerprint))
+                ).lastrowid
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO bands VALUES (?, ?, ?)",
+                ((band, key, row_id) for band, key in enumerate(self._keys(fingerprint))),
+            )
+
+    def check(self, url: str, text: str) -> Optional[Tuple[str, float]]:
+        """
+        İçeriğin yakın kopyasını arar. Kopya değilse parmak izi indekse eklenir.
+        Returns: (benzer URL, benzerlik) ya da None
+        """
+        fingerprint = simhash(text)
+        # Arama ve ekleme tek kilit altında: aynı anda gelen iki kopya birbirini kaçırmaz
+        with self._lock:
+            match = self._find(url, fingerprint)
+            if match is None:
+                self._add(url, fingerprint)
+        return match
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
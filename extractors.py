@@ -0,0 +1,289 @@
+"""
+Blog sayfalarından içerik çıkaran backend'ler.
+
+'soup' : BeautifulSoup + html.parser ile tüm sayfa ağacını kurar (varsayılan, mevcut davranış).
+'lxml' : Aynı html.parser belirteçlerinden, BeautifulSoup nesneleri yerine lxml'in C tarafındaki
+         TreeBuilder'ı ile ağaç kurar ve hedef div ile başlık elemanlarını XPath ile dolaşır.
+         Ağaç html.parser'ın iç içe yapısını birebir korur (lxml'in kendi HTML parser'ı <p> içindeki
+         <div>'i ya da kapatılmamış <p>'yi farklı yerleştirir), bu yüzden çıktı her sayfada 'soup' ile
+         aynıdır; tests/test_extractors.py ve bench/extract_compare.py ile doğrulanır.
+         Yalnızca hedef div'i ayrıştırmak yerine tüm sayfa bilerek belirteçlere ayrılır: div içindeki bir
+         kapanış etiketi div'den önce açılmış bir elemanı (ve onunla div'i) kapatabilir, bu yüzden div'in
+         nerede bittiği ancak sayfanın başından beri açık elemanlar izlenerek 'soup' ile aynı bulunur.
+         Kazanç BeautifulSoup nesnelerinin kurulmamasından gelir (~1.7-1.8x); darboğaz html.parser'ın
+         belirteçlere ayırmasıdır.
+"""
+import html as html_lib
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, UnicodeDammit
+from bs4.dammit import EntitySubstitution
+
+BACKENDS = ('soup', 'lxml')
+
+NO_TITLE = 'Başlık bulunamadı'
+
+# bs4'ün class_='x' eşleşmesiyle aynı: class listesindeki herhangi bir token
+_CLASS_XPATH = '//div[contains(concat(" ", normalize-space(@class), " "), " {} ")]'
+
+_HEADINGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# bs4 html.parser builder'ının kapanış etiketi beklemediği elemanlar
+_VOID_ELEMENTS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem', 'meta',
+    'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex',
+    'nextid', 'spacer',
+))
+# İçindeki metinleri bs4'ün get_text()/.text'e katmadığı elemanlar
+_HIDDEN_TEXT_ELEMENTS = frozenset(('script', 'style', 'template', 'rt', 'rp'))
+# bs4'ün yalnız boşluktan oluşan metinleri olduğu gibi bıraktığı elemanlar
+_PRESERVE_WHITESPACE = frozenset(('pre', 'textarea'))
+_ASCII_SPACES = ' \n\t\x0c\r'
+# lxml'in kabul ettiği eleman adları; diğerleri (ör. "x:y", "a\"b") yer tutucu adla eklenir
+_SAFE_TAG = re.compile(r'[a-z][a-z0-9_.-]*\Z')
+
+
+def _check_backend(backend: str) -> None:
+    if backend not in BACKENDS:
+        raise ValueError(f"Bilinmeyen extractor backend: {backend} (seçenekler: {', '.join(BACKENDS)})")
+
+
+class _SoupShapedTreeBuilder(HTMLParser):
+    """
+    html.parser belirteçlerinden BeautifulSoup(html, 'html.parser') ile aynı biçimde bir lxml ağacı kurar:
+    örtük kapanış yoktur (<p>a<div>b</div>c</p> tek paragraftır), kapanış etiketi açık olan en yakın
+    aynı adlı elemana kadar her şeyi kapatır, eşi olmayan kapanış etiketi yok sayılır. Metinler de bs4
+    gibi her etiket, yorum ya da bildirimde ayrı parçaya bölünür ve yalnız boşluktan oluşan parçalar
+    tek boşluğa indirilir; get_text(strip=True) karşılığı bu yüzden aynı sonucu verir. Yorumlar,
+    bildirimler ve bs4'ün metne katmadığı script/style içerikleri ağaca hiç eklenmez; XPath yalnızca
+    class niteliğine baktığı için diğer nitelikler de atlanır.
+    """
+
+    def __init__(self):
+        # Karakter referansları bs4 ile aynı şekilde handle_charref/handle_entityref'te çözülür
+        super().__init__(convert_charrefs=False)
+        from lxml import etree
+
+        self._builder = etree.TreeBuilder()
+        self._open: List[Tuple[str, str]] = []
+        self._data: List[str] = []
+        self._hidden = 0
+        self._preserve = 0
+        # Son eklenen düğüm metinse, yeni metin parçası araya boş işaret elemanı konarak ayrılır
+        self._after_text = False
+        self._builder.start('document', {})
+
+    def build(self, markup: str):
+        self.feed(markup)
+        self.close()
+        self._flush()
+        while self._open:
+            self._pop()
+        self._builder.end('document')
+        return self._builder.close()
+
+    def _flush(self) -> None:
+        """bs4 endData karşılığı: biriken metni tek parça olarak ağaca ekler"""
+        if not self._data:
+            return
+        data = ''.join(self._data)
+        self._data = []
+        if self._hidden:
+            return
+        if not self._preserve and not data.strip(_ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        if self._after_text:
+            self._builder.start('_', {})
+            self._builder.end('_')
+        self._builder.data(data)
+        self._after_text = True
+
+    def _pop(self) -> None:
+        tag, name = self._open.pop()
+        self._builder.end(name)
+        self._after_text = False
+        if tag in _HIDDEN_TEXT_ELEMENTS:
+            self._hidden -= 1
+        elif tag in _PRESERVE_WHITESPACE:
+            self._preserve -= 1
+
+    def _start(self, tag, attrs, void: bool) -> None:
+        self._flush()
+        name = tag if _SAFE_TAG.match(tag) else 'unknown'
+        classes = [value for key, value in attrs if key == 'class']
+        self._builder.start(name, {'class': classes[-1] or ''} if classes else {})
+        self._after_text = False
+        if void:
+            self._builder.end(name)
+            return
+        self._open.append((tag, name))
+        if tag in _HIDDEN_TEXT_ELEMENTS:
+            self._hidden += 1
+        elif tag in _PRESERVE_WHITESPACE:
+            self._preserve += 1
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, tag in _VOID_ELEMENTS)
+
+    def handle_startendtag(self, tag, attrs):
+        # <div/> gibi kendiliğinden kapanan yazım her eleman için boş eleman olarak kabul edilir
+        self._start(tag, attrs, True)
+
+    def handle_endtag(self, tag):
+        self._flush()
+        for depth in range(len(self._open) - 1, -1, -1):
+            if self._open[depth][0] == tag:
+                break
+        else:
+            return
+        while len(self._open) > depth:
+            self._pop()
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_charref(self, name):
+        self._data.append(html_lib.unescape(f'&#{name};'))
+
+    def handle_entityref(self, name):
+        self._data.append(EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name, f'&{name}'))
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        # bs4 CDATA bölümlerini ayrı bir metin parçası olarak sayar
+        if data.upper().startswith('CDATA['):
+            self._data.append(data[len('CDATA['):])
+            self._flush()
+
+
+def _lxml_tree(html: Union[str, bytes]):
+    """HTML'i lxml ağacına çevirir. Byte girdiler bs4 ile aynı kodlama tespitinden geçer."""
+    if not html:
+        return None
+    if isinstance(html, bytes):
+        html = UnicodeDammit(html, is_html=True).unicode_markup
+    if not html or not html.strip():
+        return None
+    return _SoupShapedTreeBuilder().build(html)
+
+
+def _first_div(tree, class_name: str):
+    found = tree.xpath(_CLASS_XPATH.format(class_name) + '[1]') if tree is not None else []
+    # [1] her ebeveyn için ilk eşleşmeyi verir, belge sırasındaki ilki listenin başıdır
+    return found[0] if found else None
+
+
+def _text(element) -> str:
+    """bs4 .text karşılığı: elemanın altındaki tüm metinler"""
+    return ''.join(element.itertext())
+
+
+def _stripped_text(element) -> str:
+    """bs4 get_text(strip=True) karşılığı: her metin parçası kırpılıp boşluksuz birleştirilir."""
+    return ''.join(part.strip() for part in element.xpath('.//text()') if part.strip())
+
+
+def extract_blog_post(html: Union[str, bytes], backend: str = 'soup') -> Optional[Tuple[str, str]]:
+    """
+    crawler.py biçimi: blog-single-content div'indeki ilk h2 başlık, h2'ler '### ... ###' olarak,
+    paragraflar boş satırlarla ayrılmış içerik.
+    Returns: (başlık, içerik) tuple'ı, div bulunamazsa None
+    """
+    _check_backend(backend)
+    content_text: List[str] = []
+
+    if backend == 'lxml':
+        content_div = _first_div(_lxml_tree(html), 'blog-single-content')
+        if content_div is None:
+            return None
+        title = content_div.xpath('.//h2[1]')
+        title = _text(title[0]).strip() if title else NO_TITLE
+        for element in content_div.xpath('.//p | .//h2'):
+            text = _text(element).strip()
+            if element.tag == 'h2':
+                content_text.append(f"\n### {text} ###\n")
+            elif text:
+                content_text.append(text)
+        return title, '\n\n'.join(content_text)
+
+    soup = BeautifulSoup(html, 'html.parser')
+    content_div = soup.find('div', class_='blog-single-content')
+    if not content_div:
+        return None
+    title = content_div.find('h2')
+    title = title.text.strip() if title else NO_TITLE
+    for element in content_div.find_all(['p', 'h2']):
+        if element.name == 'h2':
+            # Başlıkları belirgin yap
+            content_text.append(f"\n### {element.text.strip()} ###\n")
+        else:
+            text = element.text.strip()
+            if text:  # Boş paragrafları atlama
+                content_text.append(text)
+    return title, '\n\n'.join(content_text)
+
+
+def extract_page(html: Union[str, bytes], backend: str = 'soup') -> Optional[Tuple[Optional[str], str]]:
+    """
+    webcrawl.py biçimi: sayfadaki ilk h1 ve blog-single-content (yoksa content) div'indeki
+    p/h1-h6 metinleri boş satırlarla birleştirilir.
+    Returns: (başlık, metin) tuple'ı, içerik div'i bulunamazsa None. Başlık ilk h1'in metnidir
+             (yoksa ya da boşsa None) ve metnin ilk paragrafı olarak da yer alır.
+    """
+    _check_backend(backend)
+    text_elements: List[str] = []
+    title_text: Optional[str] = None
+
+    if backend == 'lxml':
+        tree = _lxml_tree(html)
+        content = _first_div(tree, 'blog-single-content')
+        if content is None:
+            content = _first_div(tree, 'content')
+        if content is None:
+            return None
+        title = tree.xpath('//h1[1]')
+        if title:
+            title_text = _stripped_text(title[0])
+            text_elements.append(title_text)
+        xpath = ' | '.join(f'.//{name}' for name in ('p',) + _HEADINGS)
+        for element in content.xpath(xpath):
+            text = _stripped_text(element)
+            if text:
+                text_elements.append(text)
+        return title_text or None, '\n\n'.join(text_elements)
+
+    soup = BeautifulSoup(html, 'html.parser')
+    content = soup.find('div', class_='blog-single-content')
+    if not content:
+        content = soup.find('div', class_='content')
+    if not content:
+        return None
+    title = soup.find('h1')
+    if title:
+        title_text = title.get_text(strip=True)
+        text_elements.append(title_text)
+    for element in content.find_all(['p', *_HEADINGS]):
+        text = element.get_text(strip=True)
+        if text:  # Boş olmayan metinleri ekle
+            text_elements.append(text)
+    return title_text or None, '\n\n'.join(text_elements)
+
+
+def extract_page_text(html: Union[str, bytes], backend: str = 'soup') -> Optional[str]:
+    """
+    extract_page'in yalnızca metni.
+    Returns: metin, içerik div'i bulunamazsa None
+    """
+    page = extract_page(html, backend)
+    return page[1] if page is not None else None
@@ -0,0 +1,51 @@
+import sqlite3
+import hashlib
+from typing import Dict, Iterable, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+def product_key(link: str) -> str:
+    """
+    Ürün linkini kalıcı anahtara çevirir: currency parametresi ve fragment atılır,
+    şema ve host küçük harfe çevrilir, sondaki '/' kaldırılır.
+    """
+    parts = urlsplit(link.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != 'currency'])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), query, ''))
+
+
+def product_hash(product_data) -> bytes:
+    """(başlık, fiyat, açıklama, cinsiyet) alanlarının 8 baytlık özeti"""
+    gender, title, _, price, description = product_data
+    data = '\x1f'.join((title, price, description, gender)).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+class FeedState:
+    """
+    Önceki çalışmada görülen ürünlerin anahtar -> (özet, CSV grubu) durumunu saklayan kalıcı depo.
+    Satır başına yalnızca anahtar, 8 baytlık özet ve grup tutulur.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS products (key TEXT PRIMARY KEY, hash BLOB NOT NULL, "
+            "grp TEXT NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def load(self) -> Dict[str, Tuple[bytes, str]]:
+        """Tüm durumu {anahtar: (özet, grup)} olarak döndürür"""
+        return {key: (digest, group) for key, digest, group in
+                self._conn.execute("SELECT key, hash, grp FROM products")}
+
+    def apply(self, upserts: Iterable[Tuple[str, bytes, str]], deletes: Iterable[str]) -> None:
+        """Eklenen/değişen ürünleri ve silinenleri tek transaction'da yazar"""
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO products (key, hash, grp) VALUES (?, ?, ?)", upserts)
+            self._conn.executemany("DELETE FROM products WHERE key = ?", ((key,) for key in deletes))
+
+    def close(self) -> None:
+        self._conn.close()
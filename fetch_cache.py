@@ -0,0 +1,100 @@
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+
+def content_hash(data: bytes) -> str:
+    """Ham yanıt gövdesinin SHA-1 özetini döndürür."""
+    return hashlib.sha1(data).hexdigest()
+
+
+class FetchCache:
+    """
+    URL başına sitemap lastmod, ETag, Last-Modified, içerik özeti ve son çıkarımı saklayan kalıcı önbellek.
+    Bir sonraki çalışmada değişmeyen URL'ler atlanır ya da koşullu GET ile doğrulanır.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # Thread havuzundan erişildiği için bağlantı tek bir kilitle paylaşılır
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                lastmod TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                title TEXT,
+                content TEXT,
+                fetched_at TEXT
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict[str, str]]:
+        """URL'nin önbellek kaydını döndürür, yoksa None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lastmod, etag, last_modified, content_hash, title, content, fetched_at "
+                "FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ('lastmod', 'etag', 'last_modified', 'content_hash', 'title', 'content', 'fetched_at')
+        return dict(zip(keys, row))
+
+    def put(self, url: str, lastmod: Optional[str] = None, etag: Optional[str] = None,
+            last_modified: Optional[str] = None, content_hash: Optional[str] = None,
+            title: Optional[str] = None, content: Optional[str] = None, fetched_at: Optional[str] = None) -> None:
+        """URL'nin önbellek kaydını ekler ya da günceller. fetched_at verilmezse şimdiki zaman yazılır."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, lastmod, etag, last_modified, content_hash, title, content, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, lastmod, etag, last_modified, content_hash, title, content,
+                 fetched_at or datetime.now().isoformat(timespec='seconds')),
+            )
+            self._conn.commit()
+
+    def touch(self, url: str, lastmod: Optional[str]) -> None:
+        """304 yanıtından sonra kaydın lastmod ve zaman bilgisini günceller."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET lastmod = ?, fetched_at = ? WHERE url = ?",
+                (lastmod, datetime.now().isoformat(timespec='seconds'), url),
+            )
+            self._conn.commit()
+
+    def is_fresh(self, url: str, lastmod: Optional[str]) -> Optional[Dict[str, str]]:
+        """
+        Sitemap lastmod değeri önbellektekiyle aynıysa kaydı döndürür, istek atmaya gerek yoktur.
+        """
+        if not lastmod:
+            return None
+        entry = self.get(url)
+        if entry and entry['lastmod'] == lastmod and entry['content'] is not None:
+            return entry
+        return None
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """Önbellek kaydından If-None-Match / If-Modified-Since başlıklarını üretir."""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
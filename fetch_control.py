@@ -0,0 +1,207 @@
+"""
+Çekim denetimi: yeniden deneme politikası ve AIMD eşzamanlılık sınırı.
+
+RetryPolicy geçici hatalarda (429, 5xx, zaman aşımı, bağlantı hatası) üstel bekleme + jitter ile
+yeniden dener ve Retry-After başlığına uyar.
+
+AIMDController eşzamanlı istek sınırını sunucunun durumuna göre ayarlar: gecikme ve hata oranı
+sağlıklı kaldıkça sınır her pencerede bir artar (additive increase), 429/5xx, zaman aşımı ya da
+p95 gecikmenin taban değerin belirgin üstüne çıkması durumunda yarıya iner (multiplicative decrease).
+Retry-After gelirse tüm istekler o süre boyunca bekletilir.
+ThreadGate (thread'ler) ve AsyncGate (asyncio) sınırı uygulayan kapılardır.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from metrics import Metrics
+
+# Yeniden denenen ve sunucunun zorlandığını gösteren durum kodları
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After başlığını saniyeye çevirir (saniye ya da HTTP tarihi). Geçersizse None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """
+    max_retries: ilk denemeden sonraki en fazla deneme sayısı.
+    Bekleme "full jitter" ile seçilir: [0, min(max_delay, base_delay * 2^deneme)] aralığında rastgele.
+    Retry-After verilmişse en az o kadar beklenir (max_delay ile sınırlı).
+    """
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 60.0,
+                 rng: Optional[random.Random] = None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._random = rng or random.Random()
+
+    def should_retry(self, attempt: int, status: Optional[int] = None) -> bool:
+        """attempt 0'dan başlayan deneme numarasıdır; status None ise ağ hatası kabul edilir"""
+        return attempt < self.max_retries and (status is None or status in RETRY_STATUSES)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        backoff = self._random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            return min(self.max_delay, max(retry_after, backoff))
+        return backoff
+
+
+class AIMDController:
+    """
+    AIMD eşzamanlılık sınırı. Sınır [min_limit, max_limit] aralığında kalır.
+    Her pencere (en az `window` ya da güncel sınır kadar başarılı yanıt) sonunda p95 gecikme,
+    görülen en iyi p95'in `latency_tolerance` katını aşıyorsa sınır düşürülür, aşmıyorsa bir artırılır.
+    Aynı anda dönen hatalar sınırı çöktürmesin diye düşürme en fazla pencere başına bir kez yapılır.
+    """
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 32,
+                 decrease_factor: float = 0.5, window: int = 10, latency_tolerance: float = 2.0,
+                 metrics: Optional[Metrics] = None):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_factor = decrease_factor
+        self.window = window
+        self.latency_tolerance = latency_tolerance
+        self.metrics = metrics
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial)))
+        self._lock = threading.Lock()
+        self._samples: deque = deque()
+        self._baseline: Optional[float] = None
+        self._completed = 0
+        self._last_decrease = -self.max_limit
+        self._paused_until = 0.0
+        self._report()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def adaptive(self) -> bool:
+        return self.min_limit < self.max_limit
+
+    def pause_remaining(self) -> float:
+        """Retry-After nedeniyle kalan bekleme süresi"""
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def pause(self, seconds: float) -> None:
+        """Tüm yeni istekleri `seconds` saniye bekletir"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def record(self, latency: float, throttled: bool = False) -> None:
+        """Tamamlanan bir isteğin sonucunu bildirir. throttled: 429/5xx ya da ağ hatası"""
+        with self._lock:
+            self._completed += 1
+            if throttled:
+                self._decrease('throttled')
+                return
+            self._samples.append(latency)
+            if len(self._samples) < max(self.window, self.limit):
+                return
+            samples = sorted(self._samples)
+            self._samples.clear()
+            p95 = samples[int(0.95 * (len(samples) - 1))]
+            if self._baseline is None or p95 < self._baseline:
+                self._baseline = p95
+            if p95 > self._baseline * self.latency_tolerance:
+                self._decrease('latency')
+                # Taban, kalıcı olarak yavaşlayan bir sunucuya yavaşça uyum sağlar
+                self._baseline += (p95 - self._baseline) * 0.1
+            elif self._limit < self.max_limit:
+                self._limit = min(self.max_limit, self._limit + 1)
+                self._report()
+
+    def _decrease(self, reason: str) -> None:
+        if not self.adaptive:
+            return
+        if self._completed - self._last_decrease < max(self.window, self.limit):
+            return
+        self._last_decrease = self._completed
+        self._samples.clear()
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        if self.metrics is not None:
+            self.metrics.inc('concurrency_decreases_total', reason=reason)
+        self._report()
+
+    def _report(self) -> None:
+        if self.metrics is not None:
+            self.metrics.gauge('concurrency_limit', self.limit)
+
+
+class ThreadGate:
+    """Thread'ler için kapı: aynı anda en fazla controller.limit istek geçer"""
+
+    def __init__(self, controller: AIMDController):
+        self.controller = controller
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self) -> "ThreadGate":
+        while True:
+            pause = self.controller.pause_remaining()
+            if pause > 0:
+                time.sleep(pause)
+                continue
+            with self._cond:
+                if self.in_flight < self.controller.limit:
+                    self.in_flight += 1
+                    return self
+                # Sınır düşmüşse yeni slot açılana kadar bekle; sınır artışı da zaman aşımıyla fark edilir
+                self._cond.wait(0.1)
+
+    def __exit__(self, *exc) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+
+class AsyncGate:
+    """asyncio için kapı: aynı anda en fazla controller.limit istek geçer"""
+
+    def __init__(self, controller: AIMDController):
+        self.controller = controller
+        self.in_flight = 0
+        self._cond: Optional[asyncio.Condition] = None
+
+    async def __aenter__(self) -> "AsyncGate":
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        while True:
+            pause = self.controller.pause_remaining()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            async with self._cond:
+                if self.in_flight < self.controller.limit:
+                    self.in_flight += 1
+                    return self
+                try:
+                    await asyncio.wait_for(self._cond.wait(), 0.1)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def __aexit__(self, *exc) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
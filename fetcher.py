@@ -0,0 +1,230 @@
+import asyncio
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from fetch_control import RETRY_STATUSES, AIMDController, AsyncGate, RetryPolicy, parse_retry_after
+from metrics import Metrics
+from page_archive import ACCEPT_ENCODING, decode_body
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class TokenBucket:
+    """
+    Tek bir host için istek hızını sınırlayan token bucket.
+    rate saniyede verilen token sayısıdır, burst aynı anda harcanabilecek en fazla token'dır.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Bir token alınana kadar bekler. rate <= 0 ise sınırlama yapılmaz."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncFetcher:
+    """
+    Ortak keep-alive bağlantı havuzu üzerinden asenkron sayfa çeker.
+    Aynı anda en fazla `concurrency` istek yapılır, her host kendi token bucket'ı ile sınırlanır.
+    metrics verilirse DNS, bağlantı, ilk bayt (TTFB) ve indirme süreleri, durum kodları ve
+    aktarılan bayt sayısı kaydedilir.
+
+    max_concurrency `concurrency`'den büyükse eşzamanlılık AIMD ile ayarlanır: `concurrency` ile
+    başlar, sunucu sağlıklı yanıt verdikçe max_concurrency'ye kadar artar, 429/5xx'te düşer.
+
+    keep_raw=True ise sıkıştırılmış yanıt (Accept-Encoding: gzip, br) istenir, gövde alındığı gibi
+    'raw_body' olarak da döndürülür (arşiv için); 'body' her durumda açılmış gövdedir.
+    """
+
+    def __init__(self, concurrency: int = 5, rate_per_host: float = 1.0, burst: int = 1,
+                 timeout: float = 30, headers: Optional[Dict[str, str]] = None,
+                 logger: Optional[logging.Logger] = None, metrics: Optional[Metrics] = None,
+                 max_concurrency: Optional[int] = None, retry_policy: Optional[RetryPolicy] = None,
+                 keep_raw: bool = False):
+        self.concurrency = max(1, concurrency)
+        self.max_concurrency = max(self.concurrency, max_concurrency or self.concurrency)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.timeout = timeout
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.keep_raw = keep_raw
+        if keep_raw:
+            self.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        self.logger = logger or logging.getLogger(__name__)
+        self.metrics = metrics
+        self.controller = AIMDController(
+            initial=self.concurrency,
+            min_limit=1 if self.max_concurrency > self.concurrency else self.concurrency,
+            max_limit=self.max_concurrency,
+            metrics=metrics,
+        )
+        self._gate = AsyncGate(self.controller)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.max_concurrency,
+            ttl_dns_cache=300,
+            keepalive_timeout=30,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            # Ham modda gövde kendimiz açarız; sıkıştırılmış bayt arşive olduğu gibi gider
+            auto_decompress=not self.keep_raw,
+            trace_configs=[self._trace_config()] if self.metrics is not None else None,
+        )
+        return self
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """DNS çözümleme ve bağlantı kurma sürelerini aiohttp izleme kancalarıyla ölçer"""
+        metrics = self.metrics
+        trace = aiohttp.TraceConfig()
+
+        async def dns_start(session, ctx, params):
+            ctx.dns_start = time.perf_counter()
+
+        async def dns_end(session, ctx, params):
+            metrics.observe('fetch_dns_seconds', time.perf_counter() - ctx.dns_start)
+
+        async def connect_start(session, ctx, params):
+            ctx.connect_start = time.perf_counter()
+
+        async def connect_end(session, ctx, params):
+            metrics.observe('fetch_connect_seconds', time.perf_counter() - ctx.connect_start)
+
+        async def connection_reused(session, ctx, params):
+            metrics.inc('connections_reused_total')
+
+        trace.on_dns_resolvehost_start.append(dns_start)
+        trace.on_dns_resolvehost_end.append(dns_end)
+        trace.on_connection_create_start.append(connect_start)
+        trace.on_connection_create_end.append(connect_end)
+        trace.on_connection_reuseconn.append(connection_reused)
+        return trace
+
+    async def __aexit__(self, *exc) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(self.rate_per_host, self.burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    async def _fetch_once(self, url: str, headers: Optional[Dict[str, str]]) -> dict:
+        """
+        Tek bir istek atar.
+        Returns: {'url', 'status', 'reason', 'headers', 'body', 'encoding', 'fetched_at'}
+        (keep_raw ise 'raw_body' de); ağ hatasında status None ve 'error' dolu
+        """
+        metrics = self.metrics
+        try:
+            start = time.perf_counter()
+            async with self._session.get(url, headers=headers) as response:
+                # Yanıt başlıkları geldi: bağlantı havuzunda bekleme ve bağlantı kurma dahil
+                headers_at = time.perf_counter()
+                body = raw_body = await response.read()
+                if self.keep_raw:
+                    body = decode_body(raw_body, response.headers.get('Content-Encoding'))
+                if metrics is not None:
+                    metrics.observe('fetch_ttfb_seconds', headers_at - start)
+                    metrics.observe('fetch_download_seconds', time.perf_counter() - headers_at)
+                    metrics.inc('http_responses_total', status=response.status)
+                    metrics.inc('bytes_received_total', len(raw_body))
+                result = {
+                    'url': url,
+                    'status': response.status,
+                    'reason': response.reason,
+                    'headers': response.headers.copy(),
+                    'body': body,
+                    'encoding': response.charset or 'utf-8',
+                    'fetched_at': datetime.now().isoformat(timespec='seconds'),
+                }
+                if self.keep_raw:
+                    result['raw_body'] = raw_body
+                return result
+        # ValueError: ham modda bozuk ya da desteklenmeyen sıkıştırma (decode_body)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            if metrics is not None:
+                metrics.inc('fetch_errors_total', error=type(e).__name__)
+            return {'url': url, 'status': None, 'error': str(e) or type(e).__name__}
+
+    async def fetch_response(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[dict]:
+        """
+        URL'yi çeker ve yanıtı sözlük olarak döndürür.
+        429, 5xx ve ağ hatalarında retry politikasına göre yeniden dener; sonuçlar AIMD sınırını besler.
+        Returns: {'url', 'status', 'headers', 'body', 'encoding'} ya da hata durumunda None
+        """
+        if self._session is None:
+            raise RuntimeError("AsyncFetcher 'async with' bloğu dışında kullanılamaz")
+
+        attempt = 0
+        while True:
+            await self._bucket(url).acquire()
+            self.logger.debug(f"URL getiriliyor: {url}")
+            async with self._gate:
+                start = time.perf_counter()
+                result = await self._fetch_once(url, headers)
+                latency = time.perf_counter() - start
+
+            status = result['status']
+            throttled = status is None or status in RETRY_STATUSES
+            self.controller.record(latency, throttled)
+            if not throttled and status < 400:
+                self.logger.debug(f"URL başarıyla getirildi: {url} (Status: {status})")
+                return result
+
+            reason = result['error'] if status is None else f"HTTP {status}"
+            if not self.retry_policy.should_retry(attempt, status):
+                self.logger.error(f"URL'ye erişilirken hata oluştu {url}: {reason}")
+                return None
+
+            retry_after = parse_retry_after(result['headers'].get('Retry-After')) if status else None
+            if retry_after is not None:
+                # Sunucu bekleme süresi bildirdi: bu host'a giden tüm istekler durur
+                self.controller.pause(min(retry_after, self.retry_policy.max_delay))
+            delay = self.retry_policy.delay(attempt, retry_after)
+            if self.metrics is not None:
+                self.metrics.inc('retries_total', reason=status or 'error')
+            self.logger.warning(f"{url}: {reason}, {delay:.1f} sn sonra yeniden denenecek "
+                                f"({attempt + 1}/{self.retry_policy.max_retries})")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def fetch(self, url: str) -> str:
+        """URL'nin metin içeriğini döndürür, hata durumunda boş string döner."""
+        response = await self.fetch_response(url)
+        if response is None:
+            return ""
+        return response['body'].decode(response['encoding'], errors='replace')
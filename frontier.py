@@ -0,0 +1,155 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+# URL durumları
+PENDING = 'pending'
+FETCHED = 'fetched'
+EXTRACTED = 'extracted'
+WRITTEN = 'written'
+FAILED = 'failed'
+# Yazılmadan tamamlanan URL'ler (ör. yakın kopya olarak atlananlar)
+SKIPPED = 'skipped'
+
+
+class Frontier:
+    """
+    Tarama sırasındaki her URL'nin durumunu SQLite üzerinde saklayan kalıcı frontier.
+    Durum güncellemeleri bellekte biriktirilir ve toplu checkpoint'lerle diske yazılır,
+    böylece URL başına fsync maliyeti oluşmaz.
+    """
+
+    def __init__(self, path: str, batch_size: int = 50, interval: float = 5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending_updates: Dict[str, tuple] = {}
+        self._last_checkpoint = time.monotonic()
+        # Sitemap üreticisi ve tarama döngüsü farklı thread'lerden erişebilir
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL + NORMAL: commit başına fsync yerine checkpoint'lerde senkronizasyon
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS urls (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT UNIQUE NOT NULL,
+                state TEXT NOT NULL,
+                error TEXT,
+                updated_at REAL,
+                lastmod TEXT
+            )
+            """
+        )
+        # lastmod sütunu sonradan eklendi; eski frontier dosyaları yerinde güncellenir
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(urls)")}
+        if 'lastmod' not in columns:
+            self._conn.execute("ALTER TABLE urls ADD COLUMN lastmod TEXT")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+
+    def reset(self) -> None:
+        """Önceki çalışmanın tüm durumunu siler."""
+        with self._lock:
+            self._pending_updates.clear()
+            self._conn.execute("DELETE FROM urls")
+            self._conn.execute("DELETE FROM meta")
+            self._conn.commit()
+
+    def add(self, urls: Union[Iterable[str], Mapping[str, Optional[str]]]) -> List[str]:
+        """
+        Yeni URL'leri pending olarak ekler, var olanlara dokunmaz. urls {url: lastmod} sözlüğü ise
+        sitemap lastmod değerleri de saklanır; devam modunda remaining() bunları geri verir.
+        Returns: frontier'da daha önce bulunmayan URL'ler, geliş sırasıyla
+        """
+        lastmods = urls if isinstance(urls, Mapping) else {}
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return []
+        now = time.time()
+        with self._lock:
+            existing = set()
+            # SQLite parametre limitine takılmamak için parçalar halinde sorgula
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT url FROM urls WHERE url IN ({placeholders})", chunk
+                ).fetchall()
+                existing.update(row[0] for row in rows)
+            new_urls = [url for url in urls if url not in existing]
+            self._conn.executemany(
+                "INSERT INTO urls (url, state, updated_at, lastmod) VALUES (?, ?, ?, ?)",
+                ((url, PENDING, now, lastmods.get(url)) for url in new_urls),
+            )
+            self._conn.commit()
+        return new_urls
+
+    def urls(self) -> List[str]:
+        """Frontier'daki tüm URL'leri durumlarından bağımsız olarak eklenme sırasıyla döndürür."""
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM urls ORDER BY seq").fetchall()
+        return [url for url, in rows]
+
+    def remaining(self) -> List[Tuple[str, Optional[str]]]:
+        """Henüz tamamlanmamış (yazılmamış ya da atlanmamış) (url, lastmod) çiftlerini eklenme sırasıyla döndürür."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, lastmod FROM urls WHERE state NOT IN (?, ?) ORDER BY seq", (WRITTEN, SKIPPED)
+            ).fetchall()
+        return [(url, lastmod) for url, lastmod in rows]
+
+    def mark(self, url: str, state: str, error: Optional[str] = None) -> bool:
+        """
+        URL'nin durumunu bellekte günceller.
+        Returns: checkpoint zamanı geldiyse True
+        """
+        with self._lock:
+            self._pending_updates[url] = (state, error, time.time())
+            return (len(self._pending_updates) >= self.batch_size
+                    or time.monotonic() - self._last_checkpoint >= self.interval)
+
+    def checkpoint(self, output_offset: Optional[int] = None) -> None:
+        """
+        Biriken durum güncellemelerini ve çıktı dosyasının geçerli uzunluğunu tek transaction'da yazar.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE urls SET state = ?, error = ?, updated_at = ? WHERE url = ?",
+                ((state, error, ts, url) for url, (state, error, ts) in self._pending_updates.items()),
+            )
+            if output_offset is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('output_offset', ?)",
+                    (str(output_offset),),
+                )
+            self._pending_updates.clear()
+            self._last_checkpoint = time.monotonic()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+            self._conn.commit()
+
+    def output_offset(self) -> Optional[int]:
+        """Son checkpoint'te kaydedilen çıktı dosyası uzunluğu."""
+        value = self.get_meta('output_offset')
+        return int(value) if value is not None else None
+
+    def counts(self) -> Dict[str, int]:
+        """Durum başına URL sayılarını döndürür (checkpoint edilmiş haliyle)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM urls GROUP BY state").fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
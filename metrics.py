@@ -0,0 +1,231 @@
+"""
+Tarama metrikleri: sayaçlar, gauge'lar ve gecikme histogramları.
+
+Ölçümler URL başına log satırı yerine bellekte sabit maliyetle toplanır. Tarama sonunda ya da
+MetricsReporter ile belirli aralıklarla JSON snapshot veya Prometheus metin biçiminde dosyaya yazılır.
+Dosya uzantısı .prom ise Prometheus biçimi, diğer durumlarda JSON kullanılır.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Saniye cinsinden histogram üst sınırları (Prometheus 'le' değerleri)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, object]) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ()
+
+
+def _series(name: str, labels: Tuple[Tuple[str, str], ...], extra: str = '') -> str:
+    """name{a="b"} biçimindeki seri adı"""
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return f"{name}{{{','.join(parts)}}}" if parts else name
+
+
+class Histogram:
+    """Sabit kovalı gecikme histogramı"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Yüzdeliğin düştüğü kovanın üst sınırı (son kova için +Inf yerine en büyük sınır)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return self.buckets[min(i, len(self.buckets) - 1)]
+        return self.buckets[-1]
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Prometheus 'le' kovaları, birikimli sayılarla"""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((repr(bound), total))
+        result.append(('+Inf', self.count))
+        return result
+
+
+class Metrics:
+    """
+    Thread'ler arası paylaşılan metrik kaydı.
+    Sayaçlar (inc), anlık değer ve tepe değeri tutan gauge'lar (gauge) ve histogramlar (observe/time).
+    Etiketler anahtar kelime argümanı olarak verilir: metrics.inc('http_responses_total', status=200)
+    """
+
+    def __init__(self, prefix: str = 'sarar', buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._counters: Dict[_Key, float] = {}
+        self._gauges: Dict[_Key, List[float]] = {}
+        self._histograms: Dict[_Key, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def gauge(self, name: str, value: float, **labels) -> None:
+        """Anlık değeri kaydeder, çalışma boyunca görülen en büyük değer de tutulur"""
+        key = _key(name, labels)
+        with self._lock:
+            current = self._gauges.get(key)
+            if current is None:
+                self._gauges[key] = [value, value]
+            else:
+                current[0] = value
+                if value > current[1]:
+                    current[1] = value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, name: str, **labels) -> Iterator[None]:
+        """Bloğun süresini histograma ekler"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict:
+        """JSON'a çevrilebilir anlık görüntü; histogramlarda p50/p99 kova üst sınırıdır"""
+        with self._lock:
+            return {
+                'started_at': self.started,
+                'elapsed_seconds': round(time.time() - self.started, 3),
+                'counters': {_series(name, labels): value for (name, labels), value in self._counters.items()},
+                'gauges': {_series(name, labels): {'value': value, 'max': peak}
+                           for (name, labels), (value, peak) in self._gauges.items()},
+                'histograms': {
+                    _series(name, labels): {
+                        'count': h.count,
+                        'sum': round(h.sum, 6),
+                        'p50': h.quantile(0.50),
+                        'p99': h.quantile(0.99),
+                    }
+                    for (name, labels), h in self._histograms.items()
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """Prometheus metin biçimi (exposition format 0.0.4)"""
+        lines = []
+        with self._lock:
+            for kind, items in (('counter', self._counters), ('gauge', self._gauges)):
+                typed = set()
+                for (name, labels), value in sorted(items.items()):
+                    full = f'{self.prefix}_{name}'
+                    if full not in typed:
+                        lines.append(f'# TYPE {full} {kind}')
+                        typed.add(full)
+                    if kind == 'gauge':
+                        lines.append(f'{_series(full, labels)} {value[0]}')
+                    else:
+                        lines.append(f'{_series(full, labels)} {value}')
+                if kind == 'gauge':
+                    # Çalışma boyunca görülen tepe değerler ayrı gauge olarak
+                    for (name, labels), (_, peak) in sorted(items.items()):
+                        full = f'{self.prefix}_{name}_max'
+                        if full not in typed:
+                            lines.append(f'# TYPE {full} gauge')
+                            typed.add(full)
+                        lines.append(f'{_series(full, labels)} {peak}')
+            typed = set()
+            for (name, labels), h in sorted(self._histograms.items()):
+                full = f'{self.prefix}_{name}'
+                if full not in typed:
+                    lines.append(f'# TYPE {full} histogram')
+                    typed.add(full)
+                for bound, count in h.cumulative():
+                    le = f'le="{bound}"'
+                    lines.append(f'{_series(full + "_bucket", labels, le)} {count}')
+                lines.append(f'{_series(full + "_sum", labels)} {h.sum}')
+                lines.append(f'{_series(full + "_count", labels)} {h.count}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> List[str]:
+        """Log için kısa özet: histogram başına sayı ve yaklaşık p50/p99"""
+        lines = []
+        for series, h in sorted(self.snapshot()['histograms'].items()):
+            lines.append(f"{series}: n={h['count']} p50<={h['p50'] * 1000:g}ms p99<={h['p99'] * 1000:g}ms")
+        return lines
+
+    def dump(self, path: str) -> None:
+        """Metrikleri dosyaya yazar (.prom: Prometheus, diğerleri: JSON). Yazım atomiktir."""
+        if path.endswith('.prom'):
+            data = self.to_prometheus()
+        else:
+            data = json.dumps(self.snapshot(), indent=2, ensure_ascii=False) + '\n'
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class MetricsReporter:
+    """
+    Metrikleri arka plan thread'inde `interval` saniyede bir dosyaya yazar.
+    interval verilmezse yalnızca durdurulduğunda (tarama sonunda) bir kez yazılır.
+    """
+
+    def __init__(self, metrics: Metrics, path: Optional[str], interval: Optional[float] = None):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "MetricsReporter":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        if self.path and self.interval:
+            self._thread = threading.Thread(target=self._run, name='metrics-reporter', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.path:
+            self.metrics.dump(self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.metrics.dump(self.path)
@@ -0,0 +1,170 @@
+"""
+Feed alanları için metin normalizasyonu.
+
+urunayiklama.clean_cdata ve parse_description her alan için html.unescape ardından onlarca zincirleme
+str.replace çağırır. Buradaki karşılıkları gereksiz adımları hiç çalıştırmaz ('&', '<' ya da CDATA
+içermeyen metinler yalnızca kırpılır) ve Türkçe entity düzeltmelerini önceden derlenmiş tek bir
+regex ve sözlük aramasıyla yapar.
+
+Çıktı eski fonksiyonlarla birebir aynıdır. Entity çözümü için html.unescape kullanılmaya devam
+edilir, çünkü HTML5 tablosu ve noktalı virgülsüz eski entity'ler davranışın parçasıdır. Tek açıklamada
+C'deki replace zinciri regex çağrısından ucuz olduğundan zincir korunur.
+
+Sütun API'leri (clean_texts, clean_descriptions) tekrarlayan değerleri bir kez işler, farklı değerleri
+ayırıcıyla birleştirip entity çözümü ve etiket temizliğini tek geçişte yapar. Sıralı replace'lerin
+silme sonrası yeni etiket oluşturabildiği girdiler (ör. '<</ul>li>') tespit edilip eski zincirden
+geçirilir. bench/normalize_bench.py eşitliği doğrular ve hızı ölçer.
+"""
+import html
+import re
+from typing import Iterable, List, Optional, Set
+
+# Çift kodlanmış (&amp;uuml; gibi) Türkçe karakter entity'leri, html.unescape sonrasında kalanlar
+TURKISH_ENTITIES = {
+    '&uuml;': 'ü', '&Uuml;': 'Ü',
+    '&ouml;': 'ö', '&Ouml;': 'Ö',
+    '&ccedil;': 'ç', '&Ccedil;': 'Ç',
+    '&yacute;': 'ı', '&Yacute;': 'İ',
+    '&sect;': 'ş', '&Sect;': 'Ş',
+    '&gbreve;': 'ğ', '&Gbreve;': 'Ğ',
+}
+
+# Açıklamadaki HTML etiketleri ve yerlerine konan metin (parse_description sırasıyla)
+DESCRIPTION_TAGS = {
+    '<ul>': '', '</ul>': '',
+    '<li>': '', '</li>': '-',
+    '<br />': ' ', '<p>': '', '</p>': ' ',
+    '<strong>': '', '</strong>': '',
+    '<span>': '', '</span>': '',
+}
+
+_TURKISH_RE = re.compile('|'.join(map(re.escape, TURKISH_ENTITIES)))
+# Boş metinle değiştirilen etiketler
+_TAG_DELETE_RE = re.compile('</?(?:ul|li|strong|span)>|<p>')
+# '<' ardından bir etiketin yarım başı ve yeni bir '<' (ör. '<</ul>li>'): yalnızca bu durumda sıralı
+# replace'ler silme sonrası yeni etiket oluşturabilir. Desen bilerek geniştir (etiket başlarındaki
+# tüm karakterler); yakalanan değerler eski sıralı yoldan geçer, yanlış pozitif yalnızca hızı etkiler
+_NESTED_TAG_RE = re.compile('<[/ a-z]{0,7}<')
+
+# Sütun işlemede değerleri ayıran karakter; hiçbir desende geçmez, html.unescape de üretmez
+_SEP = '\x00'
+
+
+def _turkish(match) -> str:
+    return TURKISH_ENTITIES[match.group()]
+
+
+def _decode(text: str) -> str:
+    """CDATA işaretlerini atar, entity'leri ve Türkçe karakterleri çözer (strip hariç)"""
+    if '<![CDATA[' in text or ']]>' in text:
+        text = text.replace('<![CDATA[', '').replace(']]>', '')
+    if '&' in text:
+        text = html.unescape(text)
+        if '&' in text:
+            text = _TURKISH_RE.sub(_turkish, text)
+    return text
+
+
+def _replace_tags(desc: str) -> str:
+    """parse_description'daki sıralı replace zinciri (DESCRIPTION_TAGS sırasıyla)"""
+    return (desc.replace('<ul>', '').replace('</ul>', '').replace('<li>', '').replace('</li>', '-')
+            .replace('<br />', ' ').replace('<p>', '').replace('</p>', ' ').replace('<strong>', '')
+            .replace('</strong>', '').replace('<span>', '').replace('</span>', ''))
+
+
+def _strip_tags(desc: str) -> str:
+    """
+    Silinen etiketleri tek regex geçişiyle temizler; uzun metinlerde (birleştirilmiş sütunlar) replace
+    zincirinden hızlıdır. İç içe '<' içeren metinlerde sonuç _replace_tags'ten farklı olabilir,
+    çağıran bunları ayırmalıdır.
+    """
+    desc = desc.replace('</li>', '-').replace('<br />', ' ').replace('</p>', ' ')
+    return _TAG_DELETE_RE.sub('', desc)
+
+
+def _join_parts(desc: str) -> str:
+    """'-' ile ayrılmış parçaları kırpar, boşları atar ve ' - ' ile birleştirir"""
+    return ' - '.join([part for part in map(str.strip, desc.split('-')) if part])
+
+
+def clean_text(text: Optional[str]) -> str:
+    """urunayiklama.clean_cdata ile aynı çıktı"""
+    if text is None:
+        return ""
+    return _decode(text).strip()
+
+
+def clean_description(desc: Optional[str]) -> str:
+    """urunayiklama.parse_description ile aynı çıktı (girdi clean_cdata'dan geçmiş açıklamadır)"""
+    if desc is None:
+        return ""
+    if '&' in desc:
+        desc = html.unescape(desc)
+    # Kısa metinlerde C'deki replace zinciri regex çağrısından ucuzdur
+    if '<' in desc:
+        desc = _replace_tags(desc)
+    return _join_parts(desc)
+
+
+def _nested_indices(joined: str) -> Set[int]:
+    """Birleştirilmiş sütunda iç içe '<' içeren değerlerin sıra numaraları"""
+    indices = set()
+    index = position = 0
+    for match in _NESTED_TAG_RE.finditer(joined):
+        index += joined.count(_SEP, position, match.start())
+        position = match.start()
+        indices.add(index)
+    return indices
+
+
+def _unique(values: List[Optional[str]]) -> List[str]:
+    """Sütundaki farklı değerler, ilk görülme sırasıyla (None hariç)"""
+    return [value for value in dict.fromkeys(values) if value is not None]
+
+
+def _joinable(values: List[str]) -> bool:
+    return not any(_SEP in value for value in values)
+
+
+def clean_texts(values: Iterable[Optional[str]]) -> List[str]:
+    """
+    Bir sütundaki tüm değerleri clean_text ile aynı şekilde normalize eder.
+    Tekrarlayan değerler (cinsiyet, fiyat, varyantların başlıkları) bir kez işlenir; farklı değerler
+    ayırıcıyla birleştirilip tek geçişte çözülür.
+    """
+    values = list(values)
+    unique = _unique(values)
+    if _joinable(unique):
+        cleaned = [value.strip() for value in _decode(_SEP.join(unique)).split(_SEP)]
+    else:
+        cleaned = [clean_text(value) for value in unique]
+    mapping = dict(zip(unique, cleaned))
+    mapping[None] = ""
+    return [mapping[value] for value in values]
+
+
+def clean_descriptions(values: Iterable[Optional[str]]) -> List[str]:
+    """
+    Bir sütundaki tüm açıklamaları clean_description ile aynı şekilde normalize eder.
+    Tekrarlayan açıklamalar bir kez işlenir; farklı değerler birleştirilip entity çözümü ve etiket
+    temizliği tek geçişte yapılır.
+    """
+    values = list(values)
+    unique = _unique(values)
+    if not _joinable(unique):
+        return [clean_description(value) for value in values]
+    joined = _SEP.join(unique)
+    if '&' in joined:
+        joined = html.unescape(joined)
+    if '<' in joined:
+        nested = _nested_indices(joined)
+        # Sorunlu değerler eski zincirle, kalanlar birleştirilmiş metinde tek geçişte temizlenir
+        originals = joined.split(_SEP) if nested else None
+        pieces = _strip_tags(joined).split(_SEP)
+        for i in nested:
+            pieces[i] = _replace_tags(originals[i])
+    else:
+        pieces = joined.split(_SEP)
+    mapping = dict(zip(unique, map(_join_parts, pieces)))
+    mapping[None] = ""
+    return [mapping[value] for value in values]
@@ -0,0 +1,348 @@
+"""
+Çekilen ham sayfalar için sıkıştırılmış arşiv; çıkarma kuralları değiştiğinde siteyi yeniden
+taramadan içerik yeniden çıkarılabilir.
+
+Arşiv bir dizindir:
+    pages.warc.gz : WARC/1.0 'response' kayıtları; her kayıt ayrı bir gzip üyesi olduğundan dosya
+                    standart WARC araçlarıyla da okunabilir ve kayıtlar tek başına açılabilir
+    index.db      : SQLite ofset indeksi; URL -> (ofset, uzunluk, durum kodu, zaman)
+
+Kayıt bloğu sunucunun gönderdiği HTTP yanıtıdır (durum satırı, başlıklar, gövde). Gövde alındığı gibi,
+yani Content-Encoding ile sıkıştırılmış haliyle saklanır; zaten sıkıştırılmış gövdeli kayıtlar gzip
+üyesine sıkıştırmadan (seviye 0) konur. Okurken gövde decode_body ile açılır.
+
+Yazımda veri, indeksten önce diske boşaltılır; yarıda kesilen bir çalışmadan sonra indekste olmayan
+yarım kayıtlar arşiv açılırken kırpılır. Aynı URL birden çok kez arşivlenebilir, okumada en yenisi
+kullanılır.
+
+br (brotli) yalnızca brotli paketi kuruluysa istenir ve açılır.
+
+Kullanım:
+    python crawler.py https://site/sitemap.xml --archive sarar_archive
+    python page_archive.py --archive sarar_archive reextract --output blog_contents.jsonl --format jsonl --extractor lxml
+    python page_archive.py --archive sarar_archive stats
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import uuid
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+WARC_FILE = 'pages.warc.gz'
+INDEX_FILE = 'index.db'
+
+# Sunucudan istenen sıkıştırma biçimleri
+ACCEPT_ENCODING = 'gzip, br' if brotli is not None else 'gzip'
+
+_CHARSET_RE = re.compile(r'charset\s*=\s*"?([\w.:-]+)', re.I)
+
+
+def decode_body(body: bytes, content_encoding: Optional[str]) -> bytes:
+    """
+    Content-Encoding ile sıkıştırılmış gövdeyi açar (gzip, deflate, br; birden çok kodlama sondan başa).
+    Bilinmeyen ya da bozuk kodlamada ValueError verir.
+    """
+    if not content_encoding:
+        return body
+    for coding in reversed([c.strip().lower() for c in content_encoding.split(',')]):
+        try:
+            if coding in ('gzip', 'x-gzip'):
+                body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+            elif coding == 'deflate':
+                # Standart zlib sarmalı; bazı sunucular ham deflate gönderir
+                try:
+                    body = zlib.decompress(body)
+                except zlib.error:
+                    body = zlib.decompress(body, -zlib.MAX_WBITS)
+            elif coding == 'br' and brotli is not None:
+                body = brotli.decompress(body)
+            elif coding not in ('identity', ''):
+                raise ValueError(f"Desteklenmeyen Content-Encoding: {coding}")
+        except (zlib.error, getattr(brotli, 'error', zlib.error)) as e:
+            raise ValueError(f"Gövde açılamadı ({coding}): {str(e)}") from e
+    return body
+
+
+def _header(headers: List[Tuple[str, str]], name: str) -> Optional[str]:
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _charset(headers: List[Tuple[str, str]]) -> str:
+    match = _CHARSET_RE.search(_header(headers, 'Content-Type') or '')
+    return match.group(1) if match else 'utf-8'
+
+
+def build_record(url: str, status: int, headers: Iterable[Tuple[str, str]], body: bytes,
+                 reason: Optional[str] = None, date: Optional[str] = None) -> bytes:
+    """Yanıtı sıkıştırılmamış bir WARC/1.0 response kaydına çevirir"""
+    head = [f"HTTP/1.1 {status} {reason or ''}".rstrip()]
+    head.extend(f"{name}: {value}" for name, value in headers)
+    block = ('\r\n'.join(head) + '\r\n\r\n').encode('utf-8', 'surrogateescape') + body
+    digest = base64.b32encode(hashlib.sha1(body).digest()).decode('ascii')
+    warc_headers = (
+        "WARC/1.0\r\n"
+        "WARC-Type: response\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Date: {date}\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        f"WARC-Payload-Digest: sha1:{digest}\r\n"
+        "Content-Type: application/http; msgtype=response\r\n"
+        f"Content-Length: {len(block)}\r\n"
+        "\r\n"
+    )
+    return warc_headers.encode('utf-8') + block + b'\r\n\r\n'
+
+
+def parse_record(data: bytes) -> dict:
+    """
+    Sıkıştırılmamış WARC response kaydını ayrıştırır.
+    Returns: {'url', 'date', 'status', 'reason', 'headers', 'body', 'encoding'}; body alındığı gibidir
+    """
+    warc_head, _, rest = data.partition(b'\r\n\r\n')
+    warc = {}
+    for line in warc_head.decode('utf-8').split('\r\n')[1:]:
+        name, _, value = line.partition(':')
+        warc[name.strip().lower()] = value.strip()
+    block = rest[:int(warc['content-length'])]
+    http_head, _, body = block.partition(b'\r\n\r\n')
+    lines = http_head.decode('utf-8', 'surrogateescape').split('\r\n')
+    _, status, *reason = lines[0].split(' ', 2)
+    headers = []
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers.append((name.strip(), value.strip()))
+    return {
+        'url': warc['warc-target-uri'],
+        'date': warc.get('warc-date'),
+        'status': int(status),
+        'reason': reason[0] if reason else '',
+        'headers': headers,
+        'body': body,
+        'encoding': _charset(headers),
+    }
+
+
+def read_record(file, offset: int, length: int) -> dict:
+    """Açık arşiv dosyasından tek bir kaydı okur; gövde Content-Encoding'e göre açılmış olarak döner"""
+    file.seek(offset)
+    record = parse_record(gzip.decompress(file.read(length)))
+    record['raw_body'] = record['body']
+    record['body'] = decode_body(record['body'], _header(record['headers'], 'Content-Encoding'))
+    return record
+
+
+class PageArchive:
+    """
+    Ham yanıtların eklendiği WARC benzeri arşiv. Tüm metotlar thread-safe'tir, okumalar tarama sürerken
+    başka thread'lerden yapılabilir; indeks batch_size kayıtta bir (ve flush/close'da) kaydedilir.
+    """
+
+    def __init__(self, path: str, batch_size: int = 50):
+        self.path = path
+        self.batch_size = batch_size
+        os.makedirs(path, exist_ok=True)
+        self.warc_path = os.path.join(path, WARC_FILE)
+        self._conn = sqlite3.connect(os.path.join(path, INDEX_FILE), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records (id INTEGER PRIMARY KEY, url TEXT NOT NULL, "
+            "offset INTEGER NOT NULL, length INTEGER NOT NULL, status INTEGER NOT NULL, date TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS records_url ON records (url)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._file = None
+
+    def __enter__(self) -> "PageArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _open_for_append(self):
+        end = self._conn.execute("SELECT COALESCE(MAX(offset + length), 0) FROM records").fetchone()[0]
+        file = open(self.warc_path, 'ab')
+        if file.tell() > end:
+            # İndekse girmeden kesilmiş yarım kayıtlar
+            file.truncate(end)
+            file.seek(end)
+        return file
+
+    def add(self, url: str, status: int, headers: Iterable[Tuple[str, str]], body: bytes,
+            reason: Optional[str] = None) -> None:
+        """Yanıtı arşive ekler; body sunucudan alındığı gibi (sıkıştırılmış olabilir) verilmelidir"""
+        headers = list(headers)
+        date = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        record = build_record(url, status, headers, body, reason, date)
+        # Sıkıştırılmış gövdeyi yeniden sıkıştırmak yer kazandırmaz, yalnızca CPU harcar
+        level = 0 if _header(headers, 'Content-Encoding') else 6
+        data = gzip.compress(record, compresslevel=level, mtime=0)
+        with self._lock:
+            if self._file is None:
+                self._file = self._open_for_append()
+            offset = self._file.tell()
+            self._file.write(data)
+            self._conn.execute("INSERT INTO records (url, offset, length, status, date) VALUES (?, ?, ?, ?, ?)",
+                               (url, offset, len(data), status, date))
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self._commit()
+
+    def _commit(self) -> None:
+        # Veri indeksten önce diske gitmeli: indeks hiçbir zaman yazılmamış bir ofseti göstermez
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._conn.commit()
+        self._pending = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            self._commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._commit()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self._conn.close()
+
+    def locations(self) -> List[Tuple[str, int, int]]:
+        """Her URL'nin en son arşivlenen kaydının (url, ofset, uzunluk) değerleri, arşiv sırasıyla"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT url, offset, length FROM records WHERE id IN (SELECT MAX(id) FROM records GROUP BY url) "
+                "ORDER BY id"
+            ).fetchall()
+
+    def has(self, url: str) -> bool:
+        """URL'nin arşivde en az bir kaydı varsa True"""
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM records WHERE url = ? LIMIT 1", (url,)).fetchone()
+        return row is not None
+
+    def get(self, url: str) -> Optional[dict]:
+        """URL'nin en son kaydını (gövdesi açılmış) döndürür, yoksa None"""
+        with self._lock:
+            row = self._conn.execute("SELECT offset, length FROM records WHERE url = ? ORDER BY id DESC LIMIT 1",
+                                     (url,)).fetchone()
+            if row is None:
+                return None
+            if self._file is not None:
+                self._file.flush()
+        with open(self.warc_path, 'rb') as file:
+            return read_record(file, *row)
+
+    def __iter__(self) -> Iterator[dict]:
+        """Her URL'nin en son kaydı, arşiv sırasıyla"""
+        with open(self.warc_path, 'rb') as file:
+            for _, offset, length in self.locations():
+                yield read_record(file, offset, length)
+
+    def stats(self) -> dict:
+        with self._lock:
+            records, urls = self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT url) FROM records").fetchone()
+        size = os.path.getsize(self.warc_path) if os.path.exists(self.warc_path) else 0
+        return {'records': records, 'urls': urls, 'bytes': size}
+
+
+def _extract_chunk(warc_path: str, locations: List[Tuple[str, int, int]], backend: str) -> List[tuple]:
+    """
+    Süreç havuzunda çalışır: kayıtları dosyadan kendisi okur, böylece gövdeler süreçler arasında taşınmaz.
+    Returns: kayıt başına (url, tarih, başlık, içerik, hata); içerik yoksa None
+    """
+    from extractors import extract_blog_post
+
+    results = []
+    with open(warc_path, 'rb') as file:
+        for url, offset, length in locations:
+            try:
+                record = read_record(file, offset, length)
+                html = record['body'].decode(record['encoding'], errors='replace')
+                extracted = extract_blog_post(html, backend=backend)
+            except Exception as e:
+                results.append((url, None, None, None, str(e)))
+                continue
+            if extracted is None:
+                results.append((url, record['date'], None, None, "blog-single-content div'i bulunamadı"))
+            elif not extracted[1]:
+                results.append((url, record['date'], None, None, "İçerik boş"))
+            else:
+                results.append((url, record['date'], extracted[0], extracted[1], None))
+    return results
+
+
+def reextract(archive: PageArchive, output_file: str, output_format: str = 'text', backend: str = 'soup',
+              workers: Optional[int] = None, chunk_size: int = 64) -> dict:
+    """
+    Arşivdeki her URL'nin son yanıtından içeriği ağa çıkmadan, çok süreçli olarak yeniden çıkarır ve
+    crawler.py çıktı biçiminde yazar. Kayıtlar arşiv sırasıyla yazılır.
+    Returns: {'records', 'written', 'failed'}
+    """
+    from sink import OutputWriter, format_jsonl, format_text, make_record
+
+    archive.flush()
+    locations = archive.locations()
+    chunks = [locations[i:i + chunk_size] for i in range(0, len(locations), chunk_size)]
+    failed = 0
+    writer = OutputWriter(output_file, formatter=format_jsonl if output_format == 'jsonl' else format_text)
+    with writer, ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_extract_chunk, [archive.warc_path] * len(chunks), chunks,
+                           [backend] * len(chunks))
+        for chunk in results:
+            for url, date, title, content, error in chunk:
+                if content is None:
+                    failed += 1
+                    print(f"İçerik çıkarılamadı {url}: {error}")
+                    continue
+                writer.put(0, make_record(url, content, title, fetched_at=date))
+    return {'records': len(locations), 'written': writer.written, 'failed': failed}
+
+
+def main():
+    from extractors import BACKENDS
+    from sink import FORMATS
+
+    parser = argparse.ArgumentParser(description="Ham sayfa arşivi")
+    parser.add_argument('--archive', default='sarar_archive', help="Arşiv dizini (varsayılan: sarar_archive)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    extract = commands.add_parser('reextract', help="Arşivdeki sayfalardan içeriği ağa çıkmadan yeniden çıkar")
+    extract.add_argument('--output', required=True, help="Çıktı dosyası (crawler.py biçiminde)")
+    extract.add_argument('--format', choices=FORMATS, default='text', dest='output_format')
+    extract.add_argument('--extractor', choices=BACKENDS, default='soup', help="İçerik çıkarma backend'i")
+    extract.add_argument('--workers', type=int, default=None, help="Süreç sayısı (varsayılan: CPU sayısı)")
+    commands.add_parser('stats', help="Kayıt, URL ve bayt sayıları")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.archive, INDEX_FILE)):
+        parser.error(f"Arşiv bulunamadı: {args.archive}")
+    with PageArchive(args.archive) as archive:
+        if args.command == 'stats':
+            print(f"Arşiv: {archive.stats()}")
+        else:
+            counts = reextract(archive, args.output, output_format=args.output_format,
+                               backend=args.extractor, workers=args.workers)
+            print(f"Yeniden çıkarma tamamlandı: {counts}")
+            print(f"Çıktı dosyası: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
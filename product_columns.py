@@ -0,0 +1,249 @@
+"""
+Ürün feed'i için tipli, sütunlu (Parquet) çıktı.
+
+CSV'lerde fiyat "2699.99 TRY" gibi bir dizedir ve her analiz dört UTF-8-BOM CSV'yi yeniden ayrıştırır.
+Bu modül aynı ürünleri tek bir Parquet dosyasına tipli sütunlarla yazar:
+    group       : CSV grubu (erkek, kadın, üniseks, belirsiz); sözlük kodlu
+    gender      : feed'deki cinsiyet değeri; sözlük kodlu
+    title, link, description : dize
+    price       : decimal(12, 2); çözülemeyen fiyat boş (null)
+    currency    : para birimi (TRY ...); sözlük kodlu
+
+Yazım akış halindedir: ürünler row_group_size'lık satır gruplarıyla diske gider, tüm feed belleğe
+alınmaz. Dosya geçici adla yazılır ve tamamlanınca yerine taşınır; yarıda kalan çalışma önceki dosyayı
+bozmaz. Okurken yalnızca istenen sütunlar diskten okunur (read_products), fiyat ve kategori özetleri
+Arrow'un group_by'ı ile hesaplanır.
+
+pyarrow isteğe bağlıdır; kurulu değilse CSV çıktısı etkilenmez, yalnızca bu modülün yazma/okuma
+işlevleri RuntimeError verir.
+
+Kullanım:
+    python urunayiklama.py --output-dir sarar_urun --parquet
+    python product_columns.py --file sarar_urun/sarar_urunler.parquet convert --csv-dir sarar_urun
+    python product_columns.py --file sarar_urun/sarar_urunler.parquet summary --by group
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+AVAILABLE = pa is not None
+# Parquet yazımında oluşabilecek Arrow hataları; pyarrow yoksa hiçbir şey yakalanmaz
+ARROW_ERRORS = (pa.ArrowException,) if AVAILABLE else ()
+
+PARQUET_FILE = 'sarar_urunler.parquet'
+ROW_GROUP_SIZE = 50_000
+
+PRICE_PRECISION, PRICE_SCALE = 12, 2
+_CENT = Decimal(1).scaleb(-PRICE_SCALE)
+
+# "2699.99 TRY", "2699,99 TRY", "2699.99"; para birimi ISO 4217 kodu
+_PRICE_RE = re.compile(r'^\s*(\d+(?:[.,]\d+)?)\s*([A-Za-z]{3})?\s*$')
+
+COLUMNS = ('group', 'gender', 'title', 'link', 'price', 'currency', 'description')
+CATEGORY_COLUMNS = ('group', 'gender', 'currency')
+
+
+def _require_pyarrow() -> None:
+    if not AVAILABLE:
+        raise RuntimeError("Sütunlu çıktı için pyarrow gerekli: pip install pyarrow")
+
+
+def schema():
+    """Parquet dosyasının Arrow şeması"""
+    _require_pyarrow()
+    # Feed'deki cinsiyet değerleri serbest metindir; int8 indeks 128 farklı değerde taşar
+    category = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('group', category),
+        ('gender', category),
+        ('title', pa.string()),
+        ('link', pa.string()),
+        ('price', pa.decimal128(PRICE_PRECISION, PRICE_SCALE)),
+        ('currency', category),
+        ('description', pa.string()),
+    ])
+
+
+def parse_price(text: str) -> Tuple[Optional[Decimal], Optional[str]]:
+    """
+    CSV fiyat dizesini ayırır: "2699.99 TRY" -> (Decimal('2699.99'), 'TRY').
+    Tutar iki ondalığa yuvarlanır; çözülemeyen fiyat için (None, None), para birimi yoksa (tutar, None).
+    """
+    match = _PRICE_RE.match(text or '')
+    if not match:
+        return None, None
+    amount, currency = match.groups()
+    try:
+        value = Decimal(amount.replace(',', '.')).quantize(_CENT, rounding=ROUND_HALF_EVEN)
+    except InvalidOperation:
+        return None, None
+    if value.adjusted() >= PRICE_PRECISION - PRICE_SCALE:
+        return None, None
+    return value, currency.upper() if currency else None
+
+
+class ParquetSink:
+    """
+    Ürünleri satır grupları halinde Parquet dosyasına yazar. CsvSinks ile aynı write(grup, satır)
+    arayüzünü kullanır; satır CSV_HEADERS sırasındadır (cinsiyet, başlık, link, fiyat, açıklama).
+    Hata ile çıkılan `with` bloğunda yarım dosya silinir, önceki dosya korunur.
+    """
+
+    def __init__(self, path: str, row_group_size: int = ROW_GROUP_SIZE):
+        _require_pyarrow()
+        self.path = path
+        self.row_group_size = row_group_size
+        self.schema = schema()
+        self.count = 0
+        self.unparsed_prices = 0
+        self._tmp_path = f'{path}.tmp'
+        self._writer = None
+        self._columns: Dict[str, list] = {name: [] for name in COLUMNS}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, group: str, product_data: List[str]) -> None:
+        gender, title, link, price, description = product_data[:5]
+        amount, currency = parse_price(price)
+        if amount is None and price:
+            self.unparsed_prices += 1
+        columns = self._columns
+        columns['group'].append(group)
+        columns['gender'].append(gender)
+        columns['title'].append(title)
+        columns['link'].append(link)
+        columns['price'].append(amount)
+        columns['currency'].append(currency)
+        columns['description'].append(description)
+        self.count += 1
+        if len(columns['link']) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._columns['link']:
+            return
+        if self._writer is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._writer = pq.ParquetWriter(self._tmp_path, self.schema, compression='zstd')
+        table = pa.Table.from_pydict(self._columns, schema=self.schema)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self._columns = {name: [] for name in COLUMNS}
+
+    def close(self) -> None:
+        if self._writer is None and not self._columns['link']:
+            # Ürün yoksa da okunabilir, boş bir dosya bırakılır
+            self._writer = pq.ParquetWriter(self._tmp_path, self.schema, compression='zstd')
+        self._flush()
+        self._writer.close()
+        self._writer = None
+        os.replace(self._tmp_path, self.path)
+        print(f"Sütunlu ürün dosyası oluşturuldu: {self.path} ({self.count} ürün)")
+        if self.unparsed_prices:
+            print(f"Uyarı: {self.unparsed_prices} ürünün fiyatı çözülemedi, boş bırakıldı.")
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def iter_csv_products(directory: str) -> Iterable[Tuple[str, List[str]]]:
+    """sarar_<grup>_urunler.csv dosyalarındaki ürünleri (grup, satır) olarak üretir"""
+    for path in sorted(glob.glob(os.path.join(directory, 'sarar_*_urunler.csv'))):
+        group = os.path.basename(path)[len('sarar_'):-len('_urunler.csv')]
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) >= 5:
+                    yield group, row
+
+
+def write_from_csvs(csv_dir: str, path: str, row_group_size: int = ROW_GROUP_SIZE) -> int:
+    """
+    Mevcut tam CSV'lerden Parquet dosyasını yeniden üretir (ör. artımlı modda güncellenen CSV'lerden).
+    Returns: yazılan ürün sayısı
+    """
+    with ParquetSink(path, row_group_size) as sink:
+        for group, row in iter_csv_products(csv_dir):
+            sink.write(group, row)
+    return sink.count
+
+
+def read_products(path: str, columns: Optional[Iterable[str]] = None, filters=None):
+    """
+    Parquet dosyasını yalnızca istenen sütunlarla okur; diğer sütunlar diskten hiç okunmaz.
+    filters pyarrow biçimindedir, ör. [('group', '=', 'kadın'), ('price', '<', Decimal('1000'))];
+    satır grubu istatistikleriyle eşleşmeyen gruplar atlanır.
+    Returns: pyarrow.Table
+    """
+    _require_pyarrow()
+    return pq.read_table(path, columns=list(columns) if columns is not None else None, filters=filters)
+
+
+def price_summary(path: str, by: str = 'group') -> List[Dict[str, object]]:
+    """
+    Kategori başına ürün sayısı ve fiyat özeti; yalnızca `by` ve fiyat sütunları okunur.
+    Returns: [{by, products, priced, min_price, max_price, mean_price}] ürün sayısına göre azalan, eşitlikte kategoriye göre
+             (boş kategori en sonda)
+    """
+    if by not in CATEGORY_COLUMNS:
+        raise ValueError(f"Özet yalnızca kategori sütunlarıyla alınabilir: {', '.join(CATEGORY_COLUMNS)}")
+    # Her satır grubu kendi sözlüğüyle okunur; gruplamadan önce tek sözlükte birleştirilir
+    table = read_products(path, columns=[by, 'price']).unify_dictionaries()
+    grouped = table.group_by(by).aggregate([
+        ([], 'count_all'), ('price', 'count'), ('price', 'min'), ('price', 'max'), ('price', 'mean'),
+    ])
+    summary = [{
+        by: row[by],
+        'products': row['count_all'],
+        'priced': row['price_count'],
+        'min_price': row['price_min'],
+        'max_price': row['price_max'],
+        'mean_price': row['price_mean'].quantize(_CENT) if row['price_mean'] is not None else None,
+    } for row in grouped.to_pylist()]
+    # Fiyatı çözülemeyen ürünün para birimi boştur; None dizelerle karşılaştırılamaz
+    summary.sort(key=lambda row: (-row['products'], row[by] is None, row[by] or ''))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sütunlu (Parquet) ürün dosyası araçları")
+    parser.add_argument('--file', default=PARQUET_FILE, help="Parquet dosyası")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    convert = subparsers.add_parser('convert', help="Tam CSV dosyalarından Parquet üret")
+    convert.add_argument('--csv-dir', default='.', help="sarar_*_urunler.csv dosyalarının dizini")
+    convert.add_argument('--row-group-size', type=int, default=ROW_GROUP_SIZE)
+    summary = subparsers.add_parser('summary', help="Kategori başına fiyat özeti")
+    summary.add_argument('--by', default='group', choices=CATEGORY_COLUMNS)
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        write_from_csvs(args.csv_dir, args.file, args.row_group_size)
+    elif args.command == 'summary':
+        for row in price_summary(args.file, args.by):
+            print(json.dumps(row, ensure_ascii=False, default=str))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,549 @@
+"""
+Blog yazıları ve ürünler için kalıcı tam metin arama indeksi.
+
+Metin Türkçe kurallarıyla küçük harfe çevrilir (I -> ı, İ -> i), aksanlar atılır (ş -> s, ğ -> g,
+ı -> i ...) ve hafif bir kök bulucu çekim eklerini kırpar; böylece "gömleği", "GÖMLEKLER" ve
+"gomlek" aynı terime düşer. Sorgular da aynı işlemden geçer.
+
+İndeks bir dizindir:
+    index.db      : SQLite katalog; canlı kayıtlar (tür, anahtar, başlık, uzunluk, içerik özeti)
+    seg_*.idx     : değişmez segment dosyaları; sıralı terim tablosu ve terim başına posting listesi
+
+Posting listeleri doküman numarası farkı, terim frekansı ve konum farkları olarak varint ile
+kodlanır. Segmentler mmap ile açılır, terimler ikili aramayla bulunur; indeksi açmak dosyayı
+okumayı gerektirmez. Güncellemede yalnızca eklenen/değişen kayıtlar yeni bir segmente yazılır,
+silinen/değişen kayıtların eski numaraları katalogdan kalkar ve sorguda elenir. Segment sayısı
+MAX_SEGMENTS'i aşınca segmentler canlı kayıtlarla tek segmentte birleştirilir.
+
+Sıralama BM25 ile yapılır; sorgu kelimelerini ardışık içeren (öbek eşleşmesi) kayıtların
+puanı PHRASE_BOOST ile çarpılır.
+
+Kullanım:
+    python search_index.py build --blogs blog_contents.txt --products .
+    python search_index.py query "el boyama koleksiyonu" --limit 5
+    python search_index.py query "lacivert gömlek" --kind product
+"""
+import argparse
+import bisect
+import csv
+import glob
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from feed_state import product_key
+
+BLOG, PRODUCT = 'blog', 'product'
+KINDS = (BLOG, PRODUCT)
+
+MAX_SEGMENTS = 8
+PHRASE_BOOST = 2.0
+# BM25 parametreleri
+K1 = 1.2
+B = 0.75
+
+MAGIC = b'SRX1'
+_HEADER = struct.Struct('<4sI')
+# Terim tablosu girdisi: terim ofseti, terim uzunluğu, posting ofseti, posting uzunluğu
+_ENTRY = struct.Struct('<QIQI')
+
+_TURKISH_UPPER = str.maketrans({'I': 'ı', 'İ': 'i'})
+_DOTLESS = str.maketrans({'ı': 'i'})
+_COMBINING = re.compile('[̀-ͯ]')
+_TOKEN = re.compile(r'[^\W_]+')
+
+# Aksansız yazılmış çekim ekleri, uzundan kısaya; kök en az MIN_STEM harf kalır.
+# -ta/-te gibi ekler kelime sonlarıyla (çanta) çok karıştığı için alınmadı
+SUFFIXES = (
+    'larindan', 'lerinden', 'larinda', 'lerinde', 'larini', 'lerini', 'lariyla', 'leriyle',
+    'lari', 'leri', 'lar', 'ler',
+    'sinda', 'sinde', 'indan', 'inden', 'inda', 'inde', 'nda', 'nde',
+    'yla', 'yle', 'dan', 'den', 'nin', 'nun', 'sini', 'sina', 'sine',
+    'in', 'un', 'da', 'de', 'ya', 'ye', 'yi', 'yu', 'si', 'su',
+    'i', 'u', 'a', 'e',
+)
+MIN_STEM = 3
+# Ünlüyle başlayan ek kırpıldığında yumuşamış ünsüz geri sertleştirilir: gömleği -> gomleg -> gomlek
+_HARDEN = {'g': 'k', 'b': 'p'}
+
+
+def fold(text: str) -> str:
+    """Türkçe büyük/küçük harf katlama ve aksan temizliği: 'İPEK Şal' -> 'ipek sal'"""
+    text = text.translate(_TURKISH_UPPER).lower().translate(_DOTLESS)
+    return _COMBINING.sub('', unicodedata.normalize('NFD', text))
+
+
+def stem(token: str) -> str:
+    """Hafif kök bulma: en fazla iki çekim eki kırpılır, kısa kelimeler ve sayılar olduğu gibi kalır"""
+    if len(token) < 5 or token.isdigit():
+        return token
+    for _ in range(2):
+        for suffix in SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+                token = token[:-len(suffix)]
+                if suffix[0] in 'aeiou' and token[-1] in _HARDEN:
+                    token = token[:-1] + _HARDEN[token[-1]]
+                break
+        else:
+            break
+    return token
+
+
+def analyze(text: str) -> List[str]:
+    """Metni sıralı terim listesine çevirir (konumlar liste sırasıdır)"""
+    return [stem(token) for token in _TOKEN.findall(fold(text))]
+
+
+def _put_varint(value: int, out: bytearray) -> None:
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(buf, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_postings(postings: List[Tuple[int, List[int]]]) -> bytes:
+    """[(doküman no, konumlar)] listesini (artan doküman sırasıyla) fark + varint olarak kodlar"""
+    out = bytearray()
+    _put_varint(len(postings), out)
+    previous_doc = 0
+    for doc_id, positions in postings:
+        _put_varint(doc_id - previous_doc, out)
+        previous_doc = doc_id
+        _put_varint(len(positions), out)
+        previous_position = 0
+        for position in positions:
+            _put_varint(position - previous_position, out)
+            previous_position = position
+    return bytes(out)
+
+
+def decode_postings(buf, pos: int = 0) -> Iterator[Tuple[int, List[int]]]:
+    count, pos = _get_varint(buf, pos)
+    doc_id = 0
+    for _ in range(count):
+        delta, pos = _get_varint(buf, pos)
+        doc_id += delta
+        tf, pos = _get_varint(buf, pos)
+        positions = []
+        position = 0
+        for _ in range(tf):
+            delta, pos = _get_varint(buf, pos)
+            position += delta
+            positions.append(position)
+        yield doc_id, positions
+
+
+def write_segment(path: str, postings: Dict[str, List[Tuple[int, List[int]]]]) -> None:
+    """Terim -> posting listesi sözlüğünü segment dosyasına yazar (geçici dosya + os.replace)"""
+    terms = sorted((term.encode('utf-8'), term) for term in postings)
+    table = bytearray()
+    term_blob = bytearray()
+    posting_blob = bytearray()
+    base = _HEADER.size + _ENTRY.size * len(terms)
+    encoded_terms = [encoded for encoded, _ in terms]
+    postings_base = base + sum(map(len, encoded_terms))
+    for encoded, term in terms:
+        data = encode_postings(postings[term])
+        table += _ENTRY.pack(base + len(term_blob), len(encoded), postings_base + len(posting_blob), len(data))
+        term_blob += encoded
+        posting_blob += data
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, len(terms)))
+        f.write(table)
+        f.write(term_blob)
+        f.write(posting_blob)
+    os.replace(tmp_path, path)
+
+
+class Segment:
+    """mmap ile açılmış değişmez segment; terimler ikili aramayla bulunur"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.term_count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"Geçersiz segment dosyası: {path}")
+
+    def _entry(self, index: int) -> Tuple[int, int, int, int]:
+        return _ENTRY.unpack_from(self._mm, _HEADER.size + _ENTRY.size * index)
+
+    def _term(self, index: int) -> bytes:
+        offset, length, _, _ = self._entry(index)
+        return self._mm[offset:offset + length]
+
+    def postings(self, term: str) -> Iterator[Tuple[int, List[int]]]:
+        encoded = term.encode('utf-8')
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.term_count or self._term(low) != encoded:
+            return iter(())
+        _, _, offset, _ = self._entry(low)
+        return decode_postings(self._mm, offset)
+
+    def items(self) -> Iterator[Tuple[str, Iterator[Tuple[int, List[int]]]]]:
+        """Tüm (terim, posting) çiftleri, terim sırasıyla"""
+        for index in range(self.term_count):
+            offset, length, postings_offset, _ = self._entry(index)
+            yield self._mm[offset:offset + length].decode('utf-8'), decode_postings(self._mm, postings_offset)
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def record_hash(title: str, text: str) -> bytes:
+    return hashlib.blake2b(f'{title}\x1f{text}'.encode('utf-8'), digest_size=8).digest()
+
+
+class SearchIndex:
+    """
+    Dizin tabanlı arama indeksi. sync() bir türün (blog/ürün) tüm kayıtlarını alır ve yalnızca
+    farkı yazar; search() sorguyu BM25 ile sıralanmış sonuç sözlükleri olarak döndürür.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(path, 'index.db'))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, kind TEXT NOT NULL, key TEXT NOT NULL, "
+            "title TEXT, length INTEGER NOT NULL, hash BLOB NOT NULL, UNIQUE (kind, key))"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+        self._segments = [Segment(os.path.join(path, name)) for name in self._segment_names()]
+
+    def __enter__(self) -> "SearchIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for segment in self._segments:
+            segment.close()
+        self._segments = []
+        self._conn.close()
+
+    def _get_meta(self, key: str, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, key: str, value) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _segment_names(self) -> List[str]:
+        return self._get_meta('segments', [])
+
+    def _new_segment_name(self) -> str:
+        number = self._get_meta('next_segment', 1)
+        self._set_meta('next_segment', number + 1)
+        return f'seg_{number:06d}.idx'
+
+    def sync(self, kind: str, records: Iterable[Tuple[str, str, str]]) -> Dict[str, int]:
+        """
+        Bir türün güncel kayıtlarının tamamını (anahtar, başlık, metin) indeksle eşitler.
+        Aynı özetli kayıtlara dokunulmaz, listede olmayan eski kayıtlar silinir.
+        Returns: {'added', 'changed', 'removed', 'unchanged'} sayıları
+        """
+        return self._apply(kind, records, full=True)
+
+    def update(self, kind: str, records: Iterable[Tuple[str, str, str]],
+               removed: Iterable[str] = ()) -> Dict[str, int]:
+        """
+        Yalnızca verilen kayıtları ekler/günceller ve `removed` anahtarlarını siler (ör. feed delta'sı).
+        Returns: sync ile aynı sayılar
+        """
+        return self._apply(kind, records, full=False, removed=removed)
+
+    def _apply(self, kind: str, records: Iterable[Tuple[str, str, str]], full: bool,
+               removed: Iterable[str] = ()) -> Dict[str, int]:
+        if kind not in KINDS:
+            raise ValueError(f"Bilinmeyen kayıt türü: {kind} (seçenekler: {', '.join(KINDS)})")
+        existing = {key: (doc_id, digest) for doc_id, key, digest in
+                    self._conn.execute("SELECT id, key, hash FROM docs WHERE kind = ?", (kind,))}
+        next_id = self._get_meta('next_id', 1)
+        postings: Dict[str, List[Tuple[int, List[int]]]] = defaultdict(list)
+        rows = []
+        stale = []
+        seen = set()
+        counts = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+        for key, title, text in records:
+            if key in seen:
+                continue
+            seen.add(key)
+            digest = record_hash(title, text)
+            old = existing.get(key)
+            if old is not None and old[1] == digest:
+                counts['unchanged'] += 1
+                continue
+            if old is not None:
+                stale.append(old[0])
+            counts['changed' if old is not None else 'added'] += 1
+            # Başlık ve metin arasında bir konum boşluk bırakılır, öbek eşleşmesi sınırı aşmasın
+            terms = analyze(title) + [None] + analyze(text)
+            positions = defaultdict(list)
+            for position, term in enumerate(terms):
+                if term is not None:
+                    positions[term].append(position)
+            for term, term_positions in positions.items():
+                postings[term].append((next_id, term_positions))
+            rows.append((next_id, kind, key, title, len(terms) - 1, digest))
+            next_id += 1
+        removed_keys = existing.keys() - seen if full else set(removed) & (existing.keys() - seen)
+        removed = [existing[key][0] for key in removed_keys]
+        counts['removed'] = len(removed)
+
+        names = self._segment_names()
+        if postings:
+            name = self._new_segment_name()
+            write_segment(os.path.join(self.path, name), postings)
+            names = names + [name]
+            self._segments.append(Segment(os.path.join(self.path, name)))
+        with self._conn:
+            self._conn.executemany("DELETE FROM docs WHERE id = ?", ((doc_id,) for doc_id in stale + removed))
+            self._conn.executemany("INSERT INTO docs (id, kind, key, title, length, hash) VALUES (?, ?, ?, ?, ?, ?)",
+                                   rows)
+            self._set_meta('next_id', next_id)
+            self._set_meta('segments', names)
+        if len(self._segments) > MAX_SEGMENTS:
+            self.compact()
+        return counts
+
+    def compact(self) -> None:
+        """Tüm segmentleri yalnızca canlı kayıtları içeren tek segmentte birleştirir"""
+        live = {doc_id for doc_id, in self._conn.execute("SELECT id FROM docs")}
+        merged: Dict[str, List[Tuple[int, List[int]]]] = defaultdict(list)
+        # Segmentler artan doküman numaralarıyla yazıldığı için sırayla eklemek listeyi sıralı tutar
+        for segment in self._segments:
+            for term, postings in segment.items():
+                merged[term].extend(item for item in postings if item[0] in live)
+        merged = {term: postings for term, postings in merged.items() if postings}
+        old_segments = self._segments
+        names = []
+        if merged:
+            name = self._new_segment_name()
+            write_segment(os.path.join(self.path, name), merged)
+            names = [name]
+        with self._conn:
+            self._set_meta('segments', names)
+        for segment in old_segments:
+            segment.close()
+            os.remove(segment.path)
+        self._segments = [Segment(os.path.join(self.path, name)) for name in names]
+
+    def stats(self) -> Dict[str, int]:
+        counts = dict(self._conn.execute("SELECT kind, COUNT(*) FROM docs GROUP BY kind"))
+        return {**{kind: counts.get(kind, 0) for kind in KINDS}, 'segments': len(self._segments)}
+
+    def _docs(self, doc_ids: List[int]) -> Dict[int, Tuple[str, str, str, int]]:
+        docs = {}
+        for start in range(0, len(doc_ids), 500):
+            chunk = doc_ids[start:start + 500]
+            docs.update((row[0], row[1:]) for row in self._conn.execute(
+                f"SELECT id, kind, key, title, length FROM docs WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+        return docs
+
+    def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[dict]:
+        """
+        Sorgu kelimelerini içeren kayıtları BM25 puanına göre sıralar.
+        Returns: [{'kind', 'key', 'title', 'score', 'phrase'}] (phrase: kelimeler ardışık geçiyor mu)
+        """
+        terms = analyze(query)
+        if not terms:
+            return []
+        unique_terms = list(dict.fromkeys(terms))
+        matches: Dict[str, Dict[int, List[int]]] = {}
+        for term in unique_terms:
+            matches[term] = {doc_id: positions for segment in self._segments
+                             for doc_id, positions in segment.postings(term)}
+        docs = self._docs(sorted({doc_id for found in matches.values() for doc_id in found}))
+        if not docs:
+            return []
+        total, average_length = self._conn.execute("SELECT COUNT(*), AVG(length) FROM docs").fetchone()
+        scores: Dict[int, float] = defaultdict(float)
+        for term in unique_terms:
+            live = [doc_id for doc_id in matches[term] if doc_id in docs]
+            idf = math.log(1 + (total - len(live) + 0.5) / (len(live) + 0.5))
+            for doc_id in live:
+                tf = len(matches[term][doc_id])
+                length = docs[doc_id][3]
+                scores[doc_id] += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / average_length))
+        results = []
+        for doc_id, score in scores.items():
+            doc_kind, key, title, _ = docs[doc_id]
+            if kind is not None and doc_kind != kind:
+                continue
+            phrase = len(terms) > 1 and self._has_phrase(terms, matches, doc_id)
+            results.append({'kind': doc_kind, 'key': key, 'title': title,
+                            'score': round(score * (PHRASE_BOOST if phrase else 1.0), 4), 'phrase': phrase})
+        results.sort(key=lambda result: -result['score'])
+        return results[:limit]
+
+    @staticmethod
+    def _has_phrase(terms: List[str], matches: Dict[str, Dict[int, List[int]]], doc_id: int) -> bool:
+        """Sorgu terimleri dokümanda ardışık konumlarda geçiyor mu"""
+        position_lists = [matches[term].get(doc_id) for term in terms]
+        if any(positions is None for positions in position_lists):
+            return False
+        for start in position_lists[0]:
+            if all(_contains(positions, start + offset) for offset, positions in enumerate(position_lists[1:], 1)):
+                return True
+        return False
+
+
+def _contains(sorted_values: List[int], value: int) -> bool:
+    index = bisect.bisect_left(sorted_values, value)
+    return index < len(sorted_values) and sorted_values[index] == value
+
+
+SEPARATOR = '-' * 100
+
+
+def iter_blog_file(path: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    crawler.py çıktısındaki (blog_contents.txt ya da .jsonl) kayıtları (url, başlık, içerik) olarak üretir.
+    Metin dosyası satır satır okunur, tamamı belleğe alınmaz.
+    """
+    if path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if record.get('content') is not None:
+                        yield record['url'], record.get('title') or '', record['content']
+        return
+    url = title = None
+    content: List[str] = []
+    with open(path, encoding='utf-8') as f:
+        lines = iter(f)
+        for line in lines:
+            if line.rstrip('\n') != SEPARATOR:
+                content.append(line)
+                continue
+            header = next(lines, '')
+            if not header.startswith('BAŞLIK: '):
+                content.extend((line, header))
+                continue
+            # Yeni kaydın başlığı: BAŞLIK, URL, ayraç ve boş satır
+            if url is not None:
+                yield url, title, ''.join(content).strip()
+            title = header[len('BAŞLIK: '):].rstrip('\n')
+            url = next(lines, '')[len('URL: '):].strip()
+            next(lines, None)
+            content = []
+    if url is not None:
+        yield url, title, ''.join(content).strip()
+
+
+def _product_record(row: List[str]) -> Tuple[str, str, str]:
+    gender, title, link, _, description = row[:5]
+    return product_key(link), title, f'{description}\n{gender}'
+
+
+def iter_product_csvs(directory: str) -> Iterator[Tuple[str, str, str]]:
+    """sarar_*_urunler.csv dosyalarındaki ürünleri (anahtar, başlık, açıklama ve cinsiyet) olarak üretir"""
+    for path in sorted(glob.glob(os.path.join(directory, 'sarar_*_urunler.csv'))):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) >= 5:
+                    yield _product_record(row)
+
+
+# urunayiklama.REMOVED; delta dosyasında silinen ürünlerin işareti
+DELTA_REMOVED = 'silindi'
+
+
+def read_product_deltas(directory: str) -> Tuple[List[Tuple[str, str, str]], List[str]]:
+    """
+    urunayiklama'nın sarar_*_urunler_delta.csv dosyalarını okur.
+    Returns: (eklenen/değişen ürün kayıtları, silinen anahtarlar). Grup değiştiren ürün bir grupta
+    silindi, diğerinde eklendi olarak görünür; bu anahtarlar silinmez.
+    """
+    upserts, removed = [], []
+    for path in sorted(glob.glob(os.path.join(directory, 'sarar_*_urunler_delta.csv'))):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) < 6:
+                    continue
+                record = _product_record(row[1:])
+                if row[0] == DELTA_REMOVED:
+                    removed.append(record[0])
+                else:
+                    upserts.append(record)
+    upserted = {key for key, _, _ in upserts}
+    return upserts, [key for key in removed if key not in upserted]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blog ve ürün arama indeksi")
+    parser.add_argument('--index', default='sarar_index', help="İndeks dizini (varsayılan: sarar_index)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="İndeksi blog çıktısı ve ürün CSV'leriyle eşitle")
+    build.add_argument('--blogs', help="crawler.py çıktısı (blog_contents.txt ya da .jsonl)")
+    build.add_argument('--products', help="sarar_*_urunler.csv dosyalarının bulunduğu dizin")
+    query = commands.add_parser('query', help="İndekste arama yap")
+    query.add_argument('text', help="Aranacak kelime ya da öbek")
+    query.add_argument('--limit', type=int, default=10)
+    query.add_argument('--kind', choices=KINDS, default=None, help="Yalnızca blog ya da ürün sonuçları")
+    query.add_argument('--json', action='store_true', help="Sonuçları JSON olarak yazdır")
+    commands.add_parser('compact', help="Segmentleri tek segmentte birleştir")
+    args = parser.parse_args()
+
+    with SearchIndex(args.index) as index:
+        if args.command == 'build':
+            if not args.blogs and not args.products:
+                parser.error("--blogs ya da --products verilmeli")
+            if args.blogs:
+                print(f"Blog kayıtları: {index.sync(BLOG, iter_blog_file(args.blogs))}")
+            if args.products:
+                print(f"Ürün kayıtları: {index.sync(PRODUCT, iter_product_csvs(args.products))}")
+            print(f"İndeks: {index.stats()}")
+        elif args.command == 'compact':
+            index.compact()
+            print(f"İndeks: {index.stats()}")
+        else:
+            results = index.search(args.text, limit=args.limit, kind=args.kind)
+            if args.json:
+                print(json.dumps(results, ensure_ascii=False, indent=2))
+                return
+            if not results:
+                print("Sonuç bulunamadı.")
+            for result in results:
+                marker = '*' if result['phrase'] else ' '
+                print(f"{result['score']:8.3f}{marker} [{result['kind']}] {result['title']}\n          {result['key']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+"""
+Birden çok düğümün aynı taramayı paylaşması için ortak frontier ve kiralamalı (lease) iş kuyruğu.
+
+URL'ler host'un özetine göre sabit sayıda shard'a bölünür; bir host'un tüm URL'leri aynı shard'dadır.
+Düğümler URL değil shard kiralar ve bir shard'ı aynı anda yalnızca bir düğüm tutar. Böylece bir host'a
+giden tüm istekler tek düğümün token bucket'ından geçer, host başına nezaket tek yerde uygulanır.
+
+Kiralama süre sınırlıdır; düğüm çalıştıkça kirayı yeniler (renew). Düğüm kapanır ya da ölürse kira
+süresi dolar ve shard başka bir düğüme geçer; önceki düğümün aldığı ama tamamlamadığı URL'ler yeniden
+bekleyen duruma döner (URL kaybolmaz). Her kiralamada shard'ın token'ı artar; tamamlanan URL'ler ve
+çıkarılan kayıtlar ancak token hâlâ geçerliyse yazılır (fencing). Kirası elinden alınmış bir düğüm
+geç kalan sonuçlarını yazamaz, bu yüzden bir URL en fazla bir kez sonuçlanır. Aynı URL iki kez
+çekilebilir (en az bir kez çekim), ama çıktıya bir kez girer. Çıktı tüm düğümler bittikten sonra
+ortak depodan `export` ile yazılır.
+
+Arka uç değiştirilebilir: SharedFrontier arayüzünü uygulayan bir sınıf BACKENDS'e eklenir ve
+'şema://adres' ile seçilir. Varsayılan SQLite arka ucu tek makinede çok süreçli ya da ortak dosya
+sistemi üzerinden çalışan düğümler için bir yer tutucudur. Kira süreleri duvar saatiyle tutulur,
+düğüm saatleri kira süresine göre küçük sapmalarla senkron olmalıdır.
+
+Kullanım:
+    python crawler.py https://site-a/sitemap.xml --shared-frontier sqlite://ortak/frontier.db --worker-id node1
+    python crawler.py --shared-frontier sqlite://ortak/frontier.db --worker-id node2
+    python shared_frontier.py --frontier sqlite://ortak/frontier.db status
+    python shared_frontier.py --frontier sqlite://ortak/frontier.db export --output blog_contents.jsonl --format jsonl
+"""
+import abc
+import argparse
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from sink import FORMATS, OutputWriter, format_jsonl, format_text, make_record
+
+# URL durumları
+PENDING = 'pending'
+# Bir kiralama tarafından alınmış, sonucu henüz yazılmamış
+CLAIMED = 'claimed'
+DONE = 'done'
+FAILED = 'failed'
+
+DEFAULT_SHARDS = 64
+
+
+class LeaseLost(RuntimeError):
+    """Kiralamanın süresi dolmuş ve shard başka bir düğüme geçmiş"""
+
+
+def host_shard(url: str, shards: int) -> int:
+    """URL'nin host'una göre shard numarası; aynı host her zaman aynı shard'a düşer"""
+    host = urlsplit(url).netloc.lower().encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(host, digest_size=8).digest(), 'big') % shards
+
+
+class SharedFrontier(abc.ABC):
+    """
+    Ortak frontier arayüzü. Kiralamalar {'shard', 'token', 'owner', 'expires'} sözlükleridir;
+    token'ı geçersizleşmiş bir kiralamayla yapılan claim/complete/renew çağrıları LeaseLost verir.
+    """
+
+    @abc.abstractmethod
+    def add(self, items: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """(url, lastmod) çiftlerini bekleyen olarak ekler, var olanlara dokunmaz. Returns: eklenen sayısı"""
+
+    @abc.abstractmethod
+    def acquire(self, owner: str, lease_seconds: float) -> Optional[dict]:
+        """Bekleyen URL'si olan boş ya da süresi dolmuş bir shard'ı kiralar; yoksa None"""
+
+    @abc.abstractmethod
+    def renew(self, lease: dict, lease_seconds: float) -> None:
+        """Kiralamanın süresini lease_seconds uzatır"""
+
+    @abc.abstractmethod
+    def claim(self, lease: dict, limit: int) -> List[Tuple[str, Optional[str]]]:
+        """Kiralanan shard'dan en fazla limit bekleyen (url, lastmod) alır"""
+
+    @abc.abstractmethod
+    def complete(self, lease: dict, records: Iterable[dict]) -> None:
+        """
+        Sonuçları yazar. İçeriği olan kayıtlar tamamlanır, content None olanlar başarısız sayılır
+        ('error' alanı varsa saklanır).
+        """
+
+    @abc.abstractmethod
+    def release(self, lease: dict) -> None:
+        """Kiralamayı bırakır; tamamlanmamış URL'ler bekleyen duruma döner"""
+
+    @abc.abstractmethod
+    def unfinished(self) -> int:
+        """Bekleyen ya da alınmış (henüz sonuçlanmamış) URL sayısı"""
+
+    @abc.abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Durum başına URL sayıları"""
+
+    @abc.abstractmethod
+    def leases(self) -> List[dict]:
+        """Süresi dolmamış kiralamalar ({'shard', 'token', 'owner', 'expires'})"""
+
+    @abc.abstractmethod
+    def records(self) -> Iterator[dict]:
+        """Tamamlanan kayıtlar, eklenme sırasıyla"""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "SharedFrontier":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SQLiteSharedFrontier(SharedFrontier):
+    """
+    Tek SQLite dosyasında ortak frontier. Kiralama ve sonuç yazımı BEGIN IMMEDIATE ile yazma kilidi
+    alınarak yapılır, böylece süreçler arası yarış olmaz. shards ilk oluşturmada sabitlenir.
+    """
+
+    def __init__(self, path: str, shards: int = DEFAULT_SHARDS, timeout: float = 30):
+        self.path = path
+        # Düğüm içinde birden çok thread aynı bağlantıyı kullanır
+        self._lock = threading.RLock()
+        # Transaction'lar elle yönetilir
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._transaction():
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS urls (id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL, "
+                "shard INTEGER NOT NULL, lastmod TEXT, state TEXT NOT NULL, token INTEGER, "
+                "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, updated_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS urls_shard_state ON urls (shard, state)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS shards (shard INTEGER PRIMARY KEY, owner TEXT, "
+                "token INTEGER NOT NULL DEFAULT 0, expires REAL NOT NULL DEFAULT 0)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS records (url TEXT PRIMARY KEY, title TEXT, content TEXT, "
+                "fetched_at TEXT, content_hash TEXT, worker TEXT)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'shards'").fetchone()
+            if row is None:
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('shards', ?)", (str(shards),))
+                self._conn.executemany("INSERT INTO shards (shard) VALUES (?)", ((i,) for i in range(shards)))
+            self.shards = int(row[0]) if row else shards
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Yazma kilidini baştan alan transaction; diğer süreçler busy timeout kadar bekler"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _check(self, lease: dict) -> None:
+        row = self._conn.execute("SELECT token FROM shards WHERE shard = ?", (lease['shard'],)).fetchone()
+        if row[0] != lease['token']:
+            raise LeaseLost(f"Shard {lease['shard']} kiralaması geçersiz (token {lease['token']} != {row[0]})")
+
+    def add(self, items: Iterable[Tuple[str, Optional[str]]]) -> int:
+        now = time.time()
+        rows = [(url, host_shard(url, self.shards), lastmod, PENDING, now) for url, lastmod in items]
+        with self._transaction():
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO urls (url, shard, lastmod, state, updated_at) VALUES (?, ?, ?, ?, ?)", rows)
+            return self._conn.total_changes - before
+
+    def acquire(self, owner: str, lease_seconds: float) -> Optional[dict]:
+        now = time.time()
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT s.shard, s.token FROM shards s WHERE (s.owner IS NULL OR s.expires < ?) AND EXISTS "
+                "(SELECT 1 FROM urls u WHERE u.shard = s.shard AND u.state IN (?, ?)) ORDER BY s.expires LIMIT 1",
+                (now, PENDING, CLAIMED),
+            ).fetchone()
+            if row is None:
+                return None
+            shard, token = row[0], row[1] + 1
+            expires = now + lease_seconds
+            self._conn.execute("UPDATE shards SET owner = ?, token = ?, expires = ? WHERE shard = ?",
+                               (owner, token, expires, shard))
+            # Önceki sahibin yarım bıraktıkları yeniden kuyruğa
+            self._conn.execute("UPDATE urls SET state = ?, token = NULL WHERE shard = ? AND state = ?",
+                               (PENDING, shard, CLAIMED))
+        return {'shard': shard, 'token': token, 'owner': owner, 'expires': expires}
+
+    def renew(self, lease: dict, lease_seconds: float) -> None:
+        with self._transaction():
+            self._check(lease)
+            lease['expires'] = time.time() + lease_seconds
+            self._conn.execute("UPDATE shards SET expires = ? WHERE shard = ?", (lease['expires'], lease['shard']))
+
+    def claim(self, lease: dict, limit: int) -> List[Tuple[str, Optional[str]]]:
+        with self._transaction():
+            self._check(lease)
+            rows = self._conn.execute("SELECT id, url, lastmod FROM urls WHERE shard = ? AND state = ? "
+                                      "ORDER BY id LIMIT ?", (lease['shard'], PENDING, limit)).fetchall()
+            self._conn.executemany(
+                "UPDATE urls SET state = ?, token = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                ((CLAIMED, lease['token'], time.time(), row[0]) for row in rows))
+        return [(url, lastmod) for _, url, lastmod in rows]
+
+    def complete(self, lease: dict, records: Iterable[dict]) -> None:
+        records = list(records)
+        now = time.time()
+        with self._transaction():
+            self._check(lease)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO records (url, title, content, fetched_at, content_hash, worker) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((r['url'], r['title'], r['content'], r['fetched_at'], r['content_hash'], lease['owner'])
+                 for r in records if r['content'] is not None))
+            self._conn.executemany(
+                "UPDATE urls SET state = ?, error = ?, updated_at = ? WHERE url = ? AND token = ?",
+                ((DONE if r['content'] is not None else FAILED, r.get('error'), now, r['url'], lease['token'])
+                 for r in records))
+
+    def release(self, lease: dict) -> None:
+        with self._transaction():
+            row = self._conn.execute("SELECT token FROM shards WHERE shard = ?", (lease['shard'],)).fetchone()
+            if row[0] != lease['token']:
+                return
+            self._conn.execute("UPDATE shards SET owner = NULL, expires = 0 WHERE shard = ?", (lease['shard'],))
+            self._conn.execute("UPDATE urls SET state = ?, token = NULL WHERE shard = ? AND state = ?",
+                               (PENDING, lease['shard'], CLAIMED))
+
+    def unfinished(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM urls WHERE state IN (?, ?)",
+                                      (PENDING, CLAIMED)).fetchone()[0]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT state, COUNT(*) FROM urls GROUP BY state").fetchall())
+            counts['leased_shards'] = self._conn.execute(
+                "SELECT COUNT(*) FROM shards WHERE owner IS NOT NULL AND expires >= ?", (time.time(),)).fetchone()[0]
+        return counts
+
+    def leases(self) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT shard, token, owner, expires FROM shards WHERE owner IS NOT NULL "
+                                      "AND expires >= ? ORDER BY shard", (time.time(),)).fetchall()
+        return [{'shard': shard, 'token': token, 'owner': owner, 'expires': expires}
+                for shard, token, owner, expires in rows]
+
+    def records(self) -> Iterator[dict]:
+        rows = self._conn.execute(
+            "SELECT r.url, r.title, r.content, r.fetched_at, r.worker FROM records r "
+            "JOIN urls u ON u.url = r.url ORDER BY u.id")
+        for url, title, content, fetched_at, worker in rows:
+            yield make_record(url, content, title, fetched_at=fetched_at, worker=worker)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Şema -> arka uç sınıfı; sınıf adres (şemasız kısım) ile oluşturulur
+BACKENDS: Dict[str, Callable[[str], SharedFrontier]] = {
+    'sqlite': SQLiteSharedFrontier,
+}
+
+
+def open_shared_frontier(address: str) -> SharedFrontier:
+    """'sqlite://yol/frontier.db' gibi bir adresten arka ucu açar; şema verilmezse SQLite kullanılır"""
+    scheme, sep, rest = address.partition('://')
+    if not sep:
+        scheme, rest = 'sqlite', address
+    if scheme not in BACKENDS:
+        raise ValueError(f"Bilinmeyen frontier arka ucu: {scheme} (seçenekler: {', '.join(BACKENDS)})")
+    return BACKENDS[scheme](rest)
+
+
+def export(frontier: SharedFrontier, output_file: str, output_format: str = 'text') -> int:
+    """Tamamlanan kayıtları crawler.py çıktı biçiminde yazar. Returns: yazılan kayıt sayısı"""
+    formatter = format_jsonl if output_format == 'jsonl' else format_text
+    with OutputWriter(output_file, formatter=formatter) as writer:
+        for record in frontier.records():
+            writer.put(0, record)
+    return writer.written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dağıtık tarama için ortak frontier")
+    parser.add_argument('--frontier', required=True, help="Frontier adresi (ör. sqlite://ortak/frontier.db)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('status', help="Durum başına URL sayıları ve kiralı shard sayısı")
+    out = commands.add_parser('export', help="Tamamlanan kayıtları çıktı dosyasına yaz")
+    out.add_argument('--output', required=True)
+    out.add_argument('--format', choices=FORMATS, default='text', dest='output_format')
+    args = parser.parse_args()
+
+    with open_shared_frontier(args.frontier) as frontier:
+        if args.command == 'status':
+            print(f"Frontier: {frontier.counts()}")
+            for lease in frontier.leases():
+                print(f"  shard {lease['shard']}: {lease['owner']} (token {lease['token']}, "
+                      f"{lease['expires'] - time.time():.0f} sn kaldı)")
+        else:
+            written = export(frontier, args.output, args.output_format)
+            print(f"{written} kayıt yazıldı: {args.output}")
+            unfinished = frontier.unfinished()
+            if unfinished:
+                print(f"Uyarı: {unfinished} URL henüz tamamlanmadı")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+import json
+import queue
+import hashlib
+import threading
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from metrics import Metrics
+
+FORMATS = ('text', 'jsonl')
+
+_STOP = object()
+
+
+def make_record(url: str, content: Optional[str], title: Optional[str] = None, fetched_at: Optional[str] = None,
+                **extra) -> Dict[str, Optional[str]]:
+    """
+    Çıktıya yazılacak yapılandırılmış kaydı oluşturur.
+    content None ise kayıt dosyaya yazılmaz, yalnızca sıra ve durum takibi için kullanılır.
+    fetched_at sayfanın çekildiği zamandır; verilmezse kaydın oluşturulduğu an kullanılır.
+    extra alanlar (ör. duplicate_of) kayda eklenir.
+    """
+    record = {
+        'url': url,
+        'title': title,
+        'content': content,
+        'fetched_at': fetched_at or datetime.now().isoformat(timespec='seconds'),
+        'content_hash': hashlib.sha1(content.encode('utf-8')).hexdigest() if content is not None else None,
+    }
+    record.update(extra)
+    return record
+
+
+def format_jsonl(record: Dict[str, Optional[str]]) -> str:
+    """Kaydı tek satırlık JSON olarak biçimlendirir"""
+    return json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def format_text(record: Dict[str, Optional[str]]) -> str:
+    """Blog kaydını crawler.py'nin metin çıktı biçimine çevirir"""
+    return "".join([
+        "\n" + "-"*100 + "\n",
+        f"BAŞLIK: {record['title']}\n",
+        f"URL: {record['url']}\n",
+        "-"*100 + "\n\n",
+        record['content'],
+        "\n\n",
+    ])
+
+
+class OutputWriter:
+    """
+    Çıktı dosyasına yazan tek thread. Kayıtlar kuyruktan toplu alınır ve tek seferde yazılır,
+    dosya tarama boyunca açık kalır.
+
+    ordered=True ise kayıtlar `seq` sırasına göre (sitemap sırası) yazılır; sırası gelmemiş kayıtlar
+    bellekte bekler. Bu yüzden her seq için, içeriği olmasa bile, bir kayıt gönderilmelidir.
+
+    on_written(kayıtlar) her toplu yazımdan sonra yazıcı thread'inde çağrılır ve checkpoint gerekiyorsa
+    True döner; bu durumda dosya boşaltılır ve on_checkpoint(dosya uzunluğu) çağrılır.
+
+    metrics verilirse toplu yazım süreleri, yazılan kayıt/bayt sayıları ve kuyruk derinliği kaydedilir.
+    """
+
+    def __init__(self, path: str, formatter: Callable[[dict], str], mode: str = 'w', ordered: bool = False,
+                 on_written: Optional[Callable[[List[dict]], bool]] = None,
+                 on_checkpoint: Optional[Callable[[int], None]] = None,
+                 batch_size: int = 256, buffer_size: int = 1024 * 1024, queue_size: int = 1024,
+                 logger: Optional[logging.Logger] = None, metrics: Optional[Metrics] = None):
+        self.path = path
+        self.formatter = formatter
+        self.mode = mode
+        self.ordered = ordered
+        self.on_written = on_written
+        self.on_checkpoint = on_checkpoint
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        self.logger = logger or logging.getLogger(__name__)
+        self.metrics = metrics
+        self.written = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._pending: Dict[int, dict] = {}
+        self._next_seq = 0
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name='output-writer', daemon=True)
+
+    def __enter__(self) -> "OutputWriter":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def start(self) -> None:
+        self._file = open(self.path, self.mode, encoding='utf-8', buffering=self.buffer_size)
+        self._thread.start()
+
+    def put(self, seq: int, record: dict) -> None:
+        """Kaydı yazım kuyruğuna ekler. Kuyruk doluysa bekler."""
+        if self._error is not None:
+            raise RuntimeError("Çıktı yazıcısı durdu") from self._error
+        self._queue.put((seq, record))
+
+    def close(self) -> None:
+        """
+        Kuyruktaki tüm kayıtları yazar, dosyayı kapatır ve son checkpoint'i alır.
+        Yazıcı thread'i hata ile durduysa (close'dan önce de olsa) RuntimeError verir.
+        """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self._error is not None:
+            raise RuntimeError("Çıktı yazıcısı hata ile durdu") from self._error
+
+    def _ready(self, seq: int, record: dict) -> List[dict]:
+        """Yazılmaya hazır kayıtları (sıralı modda ardışık olanları) döndürür"""
+        if not self.ordered:
+            return [record]
+        self._pending[seq] = record
+        ready = []
+        while self._next_seq in self._pending:
+            ready.append(self._pending.pop(self._next_seq))
+            self._next_seq += 1
+        return ready
+
+    def _write(self, records: List[dict]) -> None:
+        start = time.perf_counter()
+        chunk = ''.join(self.formatter(record) for record in records if record['content'] is not None)
+        written = sum(1 for record in records if record['content'] is not None)
+        if chunk:
+            self._file.write(chunk)
+            self.written += written
+        if self.on_written is not None and self.on_written(records):
+            self._checkpoint()
+        if self.metrics is not None:
+            self.metrics.observe('write_seconds', time.perf_counter() - start)
+            self.metrics.inc('records_written_total', written)
+            self.metrics.inc('bytes_written_total', len(chunk.encode('utf-8')))
+            self.metrics.gauge('queue_depth', self._queue.qsize(), queue='writer')
+            if self.ordered:
+                self.metrics.gauge('queue_depth', len(self._pending), queue='reorder')
+
+    def _checkpoint(self) -> None:
+        self._file.flush()
+        if self.on_checkpoint is not None:
+            self.on_checkpoint(self._file.tell())
+
+    def _run(self) -> None:
+        try:
+            stop = False
+            while not stop:
+                items = [self._queue.get()]
+                # Kuyrukta bekleyenleri de alıp tek yazımda birleştir
+                while len(items) < self.batch_size:
+                    try:
+                        items.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                records = []
+                for item in items:
+                    if item is _STOP:
+                        stop = True
+                        continue
+                    records.extend(self._ready(*item))
+                if records:
+                    self._write(records)
+            if self._pending:
+                # Sıra boşlukları kaldıysa (ör. yarıda kesilen tarama) bekleyenleri sırayla yaz
+                self.logger.warning(f"Sırası tamamlanmamış {len(self._pending)} kayıt sona yazılıyor")
+                self._write([self._pending[seq] for seq in sorted(self._pending)])
+                self._pending.clear()
+            self._checkpoint()
+        except BaseException as e:
+            self._error = e
+            self.logger.error(f"Çıktı yazılırken hata: {str(e)}")
+            # Üreticiler kuyrukta takılı kalmasın
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+        finally:
+            self._file.close()
@@ -0,0 +1,117 @@
+import gzip
+import logging
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+import requests
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def _local_name(tag: str) -> str:
+    """'{namespace}url' biçimindeki etiketten namespace'i atar."""
+    return tag.rsplit('}', 1)[-1]
+
+
+class _PrefixedStream:
+    """Önden okunmuş baytları akışın başına geri ekleyen basit okuyucu."""
+
+    def __init__(self, prefix: bytes, raw):
+        self._prefix = prefix
+        self._raw = raw
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._prefix:
+            return self._raw.read(size)
+        if size is None or size < 0:
+            data, self._prefix = self._prefix + self._raw.read(), b''
+            return data
+        data, self._prefix = self._prefix[:size], self._prefix[size:]
+        if len(data) < size:
+            data += self._raw.read(size - len(data))
+        return data
+
+
+def open_sitemap_stream(url: str, headers: Optional[Dict[str, str]] = None,
+                        timeout: float = 30, verify: bool = True):
+    """
+    Sitemap'i akış olarak açar. Gövde gzip ise (.xml.gz) açılmış akış döndürülür.
+    Returns: (yanıt, okunabilir akış) tuple'ı
+    """
+    response = requests.get(url, headers=headers or DEFAULT_HEADERS, timeout=timeout,
+                            stream=True, verify=verify)
+    response.raise_for_status()
+    # Content-Encoding: gzip aktarımını urllib3 çözer
+    response.raw.decode_content = True
+    # .xml.gz dosyaları Content-Encoding olmadan ham gzip olarak gelir
+    head = response.raw.read(2)
+    stream = _PrefixedStream(head, response.raw)
+    if head == GZIP_MAGIC:
+        stream = gzip.GzipFile(fileobj=stream)
+    return response, stream
+
+
+def iter_sitemap(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30,
+                 verify: bool = True, logger: Optional[logging.Logger] = None,
+                 _seen: Optional[Set[str]] = None) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Sitemap'i iterparse ile akış halinde okur ve (loc, lastmod) çiftlerini ayrıştırıldıkça üretir.
+    <sitemapindex> dosyalarında alt sitemap'ler sırayla ve özyinelemeli olarak takip edilir.
+    İşlenen her eleman temizlendiği için bellek kullanımı URL sayısından bağımsızdır.
+    """
+    logger = logger or logging.getLogger(__name__)
+    seen = _seen if _seen is not None else set()
+    if url in seen:
+        logger.warning(f"Sitemap döngüsü atlandı: {url}")
+        return
+    seen.add(url)
+
+    logger.info(f"Sitemap ayrıştırılıyor: {url}")
+    child_sitemaps = []
+    count = 0
+    try:
+        response, stream = open_sitemap_stream(url, headers=headers, timeout=timeout, verify=verify)
+    except requests.RequestException as e:
+        logger.error(f"Sitemap çekilirken hata: {url}: {str(e)}")
+        return
+
+    try:
+        root = None
+        loc = lastmod = None
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if root is None:
+                root = elem
+                continue
+            if event == 'start':
+                continue
+
+            name = _local_name(elem.tag)
+            if name == 'loc':
+                loc = (elem.text or '').strip() or None
+            elif name == 'lastmod':
+                lastmod = (elem.text or '').strip() or None
+            elif name == 'url':
+                if loc:
+                    count += 1
+                    yield loc, lastmod
+                loc = lastmod = None
+                # İşlenen elemanları kökten de kopar, aksi halde ağaç büyümeye devam eder
+                root.clear()
+            elif name == 'sitemap':
+                if loc:
+                    child_sitemaps.append(loc)
+                loc = lastmod = None
+                root.clear()
+    except (ET.ParseError, OSError, requests.RequestException) as e:
+        logger.error(f"Sitemap ayrıştırılırken hata oluştu: {url}: {str(e)}")
+    finally:
+        response.close()
+
+    logger.info(f"Sitemap tamamlandı: {url} ({count} URL, {len(child_sitemaps)} alt sitemap)")
+    for child in child_sitemaps:
+        yield from iter_sitemap(child, headers=headers, timeout=timeout, verify=verify,
+                                logger=logger, _seen=seen)
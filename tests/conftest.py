@@ -0,0 +1,7 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Testler yerel sahte siteyi (bench/mock_site.py) kullanır
+sys.path.insert(0, os.path.join(ROOT, 'bench'))
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from chunker import ChunkWriter, chunk_text, count_tokens
+from sample_pages import iter_blog_records
+
+SENTENCES = [f'Cümle {i} keten gömlek ve yaz kombinleri hakkında kısa bir not içerir.' for i in range(40)]
+
+
+def read_chunks(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def words(text):
+    return text.replace('###', ' ').split()
+
+
+def test_chunks_stay_within_token_limit():
+    for _, _, content in list(iter_blog_records())[:20]:
+        chunks = chunk_text(content, max_tokens=100, overlap_tokens=20)
+        assert chunks
+        assert all(chunk['tokens'] == count_tokens(chunk['text']) <= 100 for chunk in chunks)
+        # Metin kaybolmaz
+        assert set(words(content)) <= {word for chunk in chunks for word in words(chunk['text'])}
+
+
+def test_sentence_overlap():
+    chunks = chunk_text(' '.join(SENTENCES), max_tokens=80, overlap_tokens=30)
+    assert len(chunks) > 2
+    for previous, chunk in zip(chunks, chunks[1:]):
+        # Sonraki parça önceki parçanın son tam cümlesiyle başlar
+        last_sentence = previous['text'].rsplit('. ', 1)[-1]
+        assert last_sentence in SENTENCES and count_tokens(last_sentence) <= 30
+        assert chunk['text'].startswith(last_sentence + ' ')
+
+
+def test_no_overlap_keeps_every_sentence_once():
+    chunks = chunk_text(' '.join(SENTENCES), max_tokens=80, overlap_tokens=0)
+    assert ' '.join(chunk['text'] for chunk in chunks) == ' '.join(SENTENCES)
+    assert all(chunk['tokens'] <= 80 for chunk in chunks)
+
+
+def test_headings_start_new_chunks():
+    intro = ' '.join(SENTENCES[:3])
+    content = f'{intro}\n\n### Keten ###\n\n{SENTENCES[3]}\n\n### Pamuk ###\n\n{SENTENCES[4]}'
+    chunks = chunk_text(content, max_tokens=200, overlap_tokens=10)
+    # Başlık max_tokens/4'ü geçmiş parçayı keser; küçük bölüm sonraki başlıkla aynı parçada kalır
+    assert [chunk['section'] for chunk in chunks] == [None, 'Keten']
+    assert chunks[0]['text'] == intro
+    assert chunks[1]['text'] == f'### Keten ###\n\n{SENTENCES[3]}\n\n### Pamuk ###\n\n{SENTENCES[4]}'
+
+
+def test_oversize_word_is_split():
+    chunks = chunk_text('kısa giriş ' + 'x' * 1000, max_tokens=20, overlap_tokens=0)
+    assert all(chunk['tokens'] <= 20 for chunk in chunks)
+    assert ''.join(chunk['text'] for chunk in chunks).replace(' ', '') == 'kısagiriş' + 'x' * 1000
+
+
+def test_overlap_must_fit():
+    with pytest.raises(ValueError):
+        chunk_text('metin', max_tokens=100, overlap_tokens=60)
+
+
+def write_blogs(path, records, **options):
+    with ChunkWriter(str(path), cache_path=str(path.parent / 'cache.db'), **options) as writer:
+        for url, title, content in records:
+            writer.add('blog', url, title, content)
+    return writer
+
+
+RECORDS = [(f'https://sarar.com/{i}', f'Yazı {i}', '\n\n'.join(SENTENCES[i:i + 15])) for i in range(3)]
+
+
+def chunk_ids(path):
+    ids = {}
+    for chunk in read_chunks(path):
+        ids.setdefault(chunk['key'], []).append(chunk['id'])
+    return ids
+
+
+def test_chunk_ids_are_stable_across_runs(tmp_path):
+    output = tmp_path / 'chunks.jsonl'
+    first = write_blogs(output, RECORDS, max_tokens=100, overlap_tokens=10)
+    assert first.counts['added'] == 3 and first.counts['chunked'] == 3
+    before = chunk_ids(output)
+
+    url, title, content = RECORDS[2]
+    second = write_blogs(output, RECORDS[:2] + [(url, title, content + '\n\nYeni paragraf.')],
+                         max_tokens=100, overlap_tokens=10)
+    # Değişmeyen kayıtlar yeniden parçalanmadan önbellekten yazılır ve aynı id'leri taşır
+    assert second.counts['unchanged'] == 2 and second.counts['changed'] == 1 and second.counts['chunked'] == 1
+    after = chunk_ids(output)
+    assert all(after[key] == before[key] for key, _, _ in RECORDS[:2])
+    assert not set(after[url]) & set(before[url])
+
+
+def test_cache_invalidated_when_parameters_change(tmp_path):
+    output = tmp_path / 'chunks.jsonl'
+    write_blogs(output, RECORDS, max_tokens=100, overlap_tokens=10)
+    same = write_blogs(output, RECORDS, max_tokens=100, overlap_tokens=10)
+    assert not same.cache.invalidated and same.counts['chunked'] == 0
+    changed = write_blogs(output, RECORDS, max_tokens=200, overlap_tokens=10)
+    assert changed.cache.invalidated
+    assert changed.counts['added'] == 3 and changed.counts['chunked'] == 3
+    assert all(chunk['tokens'] <= 200 for chunk in read_chunks(output))
+
+
+def test_changed_only_writes_removed_records(tmp_path):
+    output = tmp_path / 'chunks.jsonl'
+    write_blogs(output, RECORDS, max_tokens=100, overlap_tokens=10)
+    writer = write_blogs(output, RECORDS[1:], max_tokens=100, overlap_tokens=10, changed_only=True)
+    assert writer.counts['removed'] == 1 and writer.counts['chunks'] == 0
+    assert read_chunks(output) == [{'kind': 'blog', 'key': RECORDS[0][0], 'removed': True}]
+    # Silinen kayıt önbellekten de çıktı; geri gelirse eklendi sayılır
+    writer = write_blogs(output, RECORDS, max_tokens=100, overlap_tokens=10, changed_only=True)
+    assert writer.counts['added'] == 1 and {chunk['key'] for chunk in read_chunks(output)} == {RECORDS[0][0]}
@@ -0,0 +1,65 @@
+import pytest
+
+from crawler import SitemapCrawler
+from mock_site import MockSite
+from page_archive import PageArchive
+
+PAGES = 8
+
+
+@pytest.fixture
+def site():
+    with MockSite(pages=PAGES, feed_items=0) as site:
+        yield site
+
+
+def crawl(site, output_path, **options):
+    crawler = SitemapCrawler(output_path=str(output_path), rate_per_host=0, concurrency=4, **options)
+    crawler.crawl_and_save(f'{site.base_url}/sitemap.xml')
+    return crawler
+
+
+def test_archive_started_on_existing_crawl_gets_every_page(site, tmp_path):
+    crawl(site, tmp_path)
+    requests = site.requests
+
+    # Önbellek dolu: lastmod değişmediği için normalde hiç istek atılmazdı
+    archive_path = tmp_path / 'archive'
+    crawl(site, tmp_path, archive_path=str(archive_path))
+    with PageArchive(str(archive_path)) as archive:
+        assert archive.stats()['urls'] == PAGES
+        assert all(record['status'] == 200 and record['body'] for record in archive)
+    assert site.requests - requests == PAGES + 1
+
+    # Arşivlenmiş sayfalar için önbellek yeniden devrede
+    requests = site.requests
+    crawl(site, tmp_path, archive_path=str(archive_path))
+    assert site.requests - requests == 1
+    with PageArchive(str(archive_path)) as archive:
+        assert archive.stats()['records'] == PAGES
+
+
+def with_variants(site):
+    """Sitemap'e her sayfanın izleme parametreli ve fragment'lı yazımlarını da ekler"""
+    variants = ''.join(f'<url><loc>{site.base_url}/blog/{i}/?utm_source=feed</loc></url>'
+                       f'<url><loc>{site.base_url}/blog/{i}/#comments</loc></url>' for i in range(PAGES))
+    site.sitemap = site.sitemap.replace(b'</urlset>', variants.encode('utf-8') + b'</urlset>')
+
+
+def test_url_variants_never_enter_frontier(site, tmp_path):
+    with_variants(site)
+    crawler = crawl(site, tmp_path, use_cache=False)
+    # Her kanonik URL için tek satır: varyantlar SKIPPED olarak kalıp yeniden denenmeyi engellemez
+    assert crawler.frontier.counts() == {'written': PAGES}
+    assert site.requests == PAGES + 1
+
+
+def test_parse_sitemap_returns_one_url_per_page(site, tmp_path):
+    with_variants(site)
+    crawler = SitemapCrawler(output_path=str(tmp_path))
+    urls = crawler.parse_sitemap(f'{site.base_url}/sitemap.xml')
+    assert urls == [f'{site.base_url}/blog/{i}/' for i in range(PAGES)]
+    # Ayrıştırma ziyaret edilen kümeyi değiştirmez, ziyaret edilenler ise atlanır
+    assert len(crawler.visited_urls) == 0
+    crawler.visited_urls.add(f'{site.base_url}/blog/0')
+    assert crawler.parse_sitemap(f'{site.base_url}/sitemap.xml') == urls[1:]
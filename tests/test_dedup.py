@@ -0,0 +1,35 @@
+import threading
+
+from dedup import Deduplicator, simhash
+
+
+def test_single_full_width_band_accepts_high_fingerprints(tmp_path):
+    # Eşik 63/64'ün üstünde: tek, 64 bitlik bant; anahtarların yarısı 2^63'ten büyük
+    dedup = Deduplicator(str(tmp_path / 'dedup.db'), threshold=1.0)
+    texts = [f"Sarar blog yazısı {i} kış kombinleri ve palto seçimi" for i in range(40)]
+    assert any(simhash(text) >= 1 << 63 for text in texts)
+    for i, text in enumerate(texts):
+        assert dedup.check(f'https://example.com/{i}', text) is None
+    for i, text in enumerate(texts):
+        assert dedup.check(f'https://example.com/kopya/{i}', text) == (f'https://example.com/{i}', 1.0)
+    dedup.close()
+
+
+def test_concurrent_copies_are_detected_once(tmp_path):
+    dedup = Deduplicator(str(tmp_path / 'dedup.db'))
+    text = "Aynı içerik farklı URL'lerden aynı anda geliyor " * 20
+    barrier = threading.Barrier(8)
+    results = []
+
+    def check(i):
+        barrier.wait()
+        results.append(dedup.check(f'https://example.com/{i}', text))
+
+    threads = [threading.Thread(target=check, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Yalnızca ilk gelen özgün sayılır, diğerleri onun kopyası olarak bulunur
+    assert results.count(None) == 1
+    dedup.close()
@@ -0,0 +1,40 @@
+import json
+import os
+
+import pytest
+
+from extractors import BACKENDS, extract_blog_post, extract_page_text
+
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'pages')
+
+with open(os.path.join(PAGES, 'expected.json'), encoding='utf-8') as f:
+    EXPECTED = json.load(f)
+
+
+def read_page(name):
+    with open(os.path.join(PAGES, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('name', sorted(EXPECTED))
+def test_backend_matches_golden_output(name, backend):
+    page = read_page(name)
+    post = extract_blog_post(page, backend)
+    assert (list(post) if post else None) == EXPECTED[name]['blog_post']
+    assert extract_page_text(page, backend) == EXPECTED[name]['page_text']
+
+
+@pytest.mark.parametrize('name', sorted(EXPECTED))
+def test_backends_agree_on_text_input(name):
+    # Crawler'lar str verir; bozuk kodlamalı sayfada da iki backend aynı çıktıyı üretmeli
+    page = read_page(name).decode('utf-8', errors='replace')
+    assert extract_blog_post(page, 'lxml') == extract_blog_post(page, 'soup')
+    assert extract_page_text(page, 'lxml') == extract_page_text(page, 'soup')
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_end_tag_of_outer_element_closes_target_div(backend):
+    # Yalnızca div'den başlayan bir ayrıştırma </section>'ı yok sayar ve sonraki paragrafı da alırdı
+    page = '<section><div class="blog-single-content"><h2>Başlık</h2><p>içeride</section><p>dışarıda</p>'
+    assert extract_blog_post(page, backend) == ('Başlık', '\n### Başlık ###\n\n\niçeride')
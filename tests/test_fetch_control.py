@@ -0,0 +1,85 @@
+"""Yeniden deneme ve AIMD eşzamanlılık denetimi; birim düzeyinde ve kısıtlı sahte siteye karşı"""
+import asyncio
+import random
+import time
+
+from fetch_control import AIMDController, RetryPolicy
+from fetcher import AsyncFetcher
+from mock_site import MockSite
+
+
+def test_retry_policy_retries_only_transient_failures():
+    policy = RetryPolicy(max_retries=2)
+    assert policy.should_retry(0, None)
+    assert policy.should_retry(0, 429) and policy.should_retry(1, 503)
+    assert not policy.should_retry(2, 503)
+    assert not policy.should_retry(0, 404)
+
+
+def test_retry_policy_honors_retry_after():
+    policy = RetryPolicy(base_delay=0.5, max_delay=10, rng=random.Random(1))
+    assert all(0 <= policy.delay(attempt) <= 0.5 * 2 ** attempt for attempt in range(4))
+    assert policy.delay(0, retry_after=3) == 3
+    assert policy.delay(0, retry_after=60) == 10
+
+
+def test_aimd_grows_when_healthy_and_halves_on_throttling():
+    controller = AIMDController(initial=4, max_limit=8, window=5)
+    for _ in range(20):
+        controller.record(0.01)
+    assert controller.limit > 4
+    grown = controller.limit
+    controller.record(0.01, throttled=True)
+    assert controller.limit == grown // 2
+    # Aynı penceredeki diğer hatalar sınırı bir daha düşürmez
+    controller.record(0.01, throttled=True)
+    assert controller.limit == grown // 2
+
+
+def test_aimd_decreases_on_rising_latency():
+    controller = AIMDController(initial=8, max_limit=8, window=10)
+    for _ in range(10):
+        controller.record(0.01)
+    for _ in range(10):
+        controller.record(0.1)
+    assert controller.limit == 4
+
+
+def fetch_all(site, pages, **options):
+    """Returns: (başarılı yanıt sayısı, süre, son eşzamanlılık sınırı)"""
+    async def run():
+        async with AsyncFetcher(rate_per_host=0, **options) as fetcher:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(fetcher.fetch_response(f'{site.base_url}/blog/{i}/')
+                                               for i in range(pages)))
+            ok = sum(1 for response in responses if response and response['status'] == 200)
+            return ok, time.perf_counter() - start, fetcher.controller.limit
+    return asyncio.run(run())
+
+
+def test_fetcher_backs_off_from_throttling_origin():
+    retry = RetryPolicy(max_retries=10, base_delay=0.02, max_delay=0.2)
+    with MockSite(pages=60, feed_items=0, latency=0.02, capacity=4) as site:
+        ok, _, limit = fetch_all(site, 60, concurrency=12, max_concurrency=16, retry_policy=retry)
+    # 429'lar yeniden denenir, hiçbir sayfa kaybolmaz; sınır origin kapasitesine doğru iner
+    assert ok == 60
+    assert site.throttled > 0
+    assert limit < 12
+
+
+def test_fetcher_retries_server_errors():
+    retry = RetryPolicy(max_retries=10, base_delay=0.01, max_delay=0.05)
+    with MockSite(pages=40, feed_items=0, error_rate=0.3, seed=3) as site:
+        ok, _, _ = fetch_all(site, 40, concurrency=4, retry_policy=retry)
+    assert site.errors > 0
+    assert ok == 40
+
+
+def test_fetcher_pauses_for_retry_after():
+    retry = RetryPolicy(max_retries=10, base_delay=0.01, max_delay=5)
+    with MockSite(pages=12, feed_items=0, latency=0.02, capacity=2, retry_after=1) as site:
+        ok, elapsed, _ = fetch_all(site, 12, concurrency=6, max_concurrency=8, retry_policy=retry)
+    assert ok == 12
+    assert site.throttled > 0
+    # Retry-After: 1 geldiğinde tüm istekler en az bir saniye bekler
+    assert elapsed >= 1.0
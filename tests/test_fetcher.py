@@ -0,0 +1,60 @@
+"""AsyncFetcher'ın eşzamanlılık ve host başına hız sınırı davranışı, yerel sahte siteye karşı"""
+import asyncio
+import time
+
+import pytest
+
+from fetcher import AsyncFetcher
+from mock_site import MockSite
+
+PAGES = 24
+LATENCY = 0.05
+
+
+@pytest.fixture(scope='module')
+def site():
+    with MockSite(pages=PAGES, feed_items=0, latency=LATENCY) as site:
+        yield site
+
+
+def crawl(urls, **options):
+    """URL'leri tek fetcher ile çeker. Returns: (başarılı yanıt sayısı, süre)"""
+    async def run():
+        async with AsyncFetcher(**options) as fetcher:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(fetcher.fetch_response(url) for url in urls))
+            return sum(1 for response in responses if response and response['status'] == 200), \
+                time.perf_counter() - start
+    return asyncio.run(run())
+
+
+def page_urls(site):
+    return [f'{site.base_url}/blog/{i}/' for i in range(PAGES)]
+
+
+def test_throughput_scales_with_concurrency(site):
+    fetched, serial = crawl(page_urls(site), concurrency=1, rate_per_host=0)
+    assert fetched == PAGES
+    fetched, parallel = crawl(page_urls(site), concurrency=8, rate_per_host=0)
+    assert fetched == PAGES
+    # 8 eşzamanlı istekte gecikmeler örtüşür; saniyedeki sayfa en az 3 katına çıkmalı
+    assert PAGES / parallel >= 3 * PAGES / serial
+    assert serial >= PAGES * LATENCY
+
+
+def test_per_host_rate_limit_is_respected(site):
+    rate = 40
+    fetched, elapsed = crawl(page_urls(site), concurrency=8, rate_per_host=rate, burst=1)
+    assert fetched == PAGES
+    # İlk istek token ile hemen, kalanlar 1/rate aralıklarla gider
+    assert elapsed >= (PAGES - 1) / rate * 0.95
+
+
+def test_rate_limit_is_per_host():
+    rate = 40
+    with MockSite(pages=PAGES, feed_items=0) as first, MockSite(pages=PAGES, feed_items=0) as second:
+        _, single = crawl(page_urls(first), concurrency=8, rate_per_host=rate)
+        fetched, both = crawl(page_urls(first) + page_urls(second), concurrency=8, rate_per_host=rate)
+    assert fetched == 2 * PAGES
+    # İki host'un bucket'ları ayrı: iki kat sayfa yaklaşık aynı sürede çekilir
+    assert both < 1.5 * single
@@ -0,0 +1,31 @@
+import sqlite3
+
+from frontier import Frontier, PENDING, WRITTEN
+
+
+def test_remaining_keeps_sitemap_lastmod(tmp_path):
+    frontier = Frontier(str(tmp_path / 'frontier.db'))
+    assert frontier.add({'https://a/1': '2024-11-13', 'https://a/2': None}) == ['https://a/1', 'https://a/2']
+    frontier.mark('https://a/2', WRITTEN)
+    frontier.checkpoint()
+    frontier.close()
+
+    resumed = Frontier(str(tmp_path / 'frontier.db'))
+    assert resumed.remaining() == [('https://a/1', '2024-11-13')]
+    resumed.close()
+
+
+def test_old_frontier_without_lastmod_is_migrated(tmp_path):
+    path = str(tmp_path / 'frontier.db')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE urls (seq INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE NOT NULL, "
+                 "state TEXT NOT NULL, error TEXT, updated_at REAL)")
+    conn.execute("INSERT INTO urls (url, state) VALUES ('https://a/1', ?)", (PENDING,))
+    conn.commit()
+    conn.close()
+
+    frontier = Frontier(path)
+    assert frontier.remaining() == [('https://a/1', None)]
+    frontier.add({'https://a/2': '2024-01-01'})
+    assert frontier.remaining()[-1] == ('https://a/2', '2024-01-01')
+    frontier.close()
@@ -0,0 +1,90 @@
+import json
+import os
+import time
+
+from metrics import Histogram, Metrics, MetricsReporter
+
+
+def test_prometheus_render():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.inc('pages_total', state='written')
+    metrics.inc('pages_total', 2, state='failed')
+    metrics.gauge('queue_depth', 7, queue='urls')
+    metrics.gauge('queue_depth', 3, queue='urls')
+    metrics.observe('fetch_seconds', 0.05, host='sarar.com')
+    metrics.observe('fetch_seconds', 0.5, host='sarar.com')
+    metrics.observe('fetch_seconds', 2.0, host='sarar.com')
+    assert metrics.to_prometheus() == '\n'.join([
+        '# TYPE sarar_pages_total counter',
+        'sarar_pages_total{state="failed"} 2',
+        'sarar_pages_total{state="written"} 1',
+        '# TYPE sarar_queue_depth gauge',
+        'sarar_queue_depth{queue="urls"} 3',
+        '# TYPE sarar_queue_depth_max gauge',
+        'sarar_queue_depth_max{queue="urls"} 7',
+        '# TYPE sarar_fetch_seconds histogram',
+        'sarar_fetch_seconds_bucket{host="sarar.com",le="0.1"} 1',
+        'sarar_fetch_seconds_bucket{host="sarar.com",le="1.0"} 2',
+        'sarar_fetch_seconds_bucket{host="sarar.com",le="+Inf"} 3',
+        'sarar_fetch_seconds_sum{host="sarar.com"} 2.55',
+        'sarar_fetch_seconds_count{host="sarar.com"} 3',
+    ]) + '\n'
+
+
+def test_labels_are_sorted_and_stringified():
+    metrics = Metrics()
+    metrics.inc('http_responses_total', status=200, host='sarar.com')
+    metrics.inc('http_responses_total', host='sarar.com', status='200')
+    metrics.inc('retries_total')
+    assert metrics.snapshot()['counters'] == {
+        'http_responses_total{host="sarar.com",status="200"}': 2,
+        'retries_total': 1,
+    }
+
+
+def test_json_snapshot():
+    metrics = Metrics()
+    metrics.gauge('workers', 4)
+    with metrics.time('extract_seconds'):
+        pass
+    snapshot = json.loads(json.dumps(metrics.snapshot()))
+    assert snapshot['gauges'] == {'workers': {'value': 4, 'max': 4}}
+    histogram = snapshot['histograms']['extract_seconds']
+    assert histogram['count'] == 1 and histogram['p50'] == histogram['p99'] == 0.0005
+    assert snapshot['elapsed_seconds'] >= 0
+
+
+def test_histogram_quantiles():
+    histogram = Histogram((1.0, 2.0, 3.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.5, 1.5, 1.5, 2.5, 10.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 2.0
+    # +Inf kovası en büyük sınırla raporlanır
+    assert histogram.quantile(0.99) == 3.0
+
+
+def test_reporter_writes_periodically(tmp_path):
+    path = str(tmp_path / 'metrics.prom')
+    metrics = Metrics()
+    with MetricsReporter(metrics, path, interval=0.05):
+        metrics.inc('pages_total')
+        deadline = time.monotonic() + 5
+        while not os.path.exists(path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Tarama sürerken yazıldı
+        assert 'sarar_pages_total 1' in open(path).read()
+        metrics.inc('pages_total')
+    # Durdurulunca son değerler yazılır, geçici dosya kalmaz
+    assert 'sarar_pages_total 2' in open(path).read()
+    assert os.listdir(tmp_path) == ['metrics.prom']
+
+
+def test_reporter_without_interval_writes_once_on_stop(tmp_path):
+    path = str(tmp_path / 'metrics.json')
+    metrics = Metrics()
+    with MetricsReporter(metrics, path) as reporter:
+        assert reporter._thread is None
+        metrics.inc('pages_total')
+        assert not os.path.exists(path)
+    assert json.load(open(path))['counters'] == {'pages_total': 1}
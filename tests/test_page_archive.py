@@ -0,0 +1,71 @@
+import gzip
+import json
+import threading
+
+from crawler import SitemapCrawler
+from mock_site import MockSite
+from page_archive import PageArchive, decode_body, reextract
+
+PAGES = 6
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_decode_body():
+    body = '<p>Çanta</p>'.encode('utf-8')
+    assert decode_body(gzip.compress(body), 'gzip') == body
+    assert decode_body(body, None) == body
+
+
+def test_reextract_with_another_extractor(tmp_path):
+    archive_path = str(tmp_path / 'archive')
+    with MockSite(pages=PAGES, feed_items=0, compress=True) as site:
+        crawler = SitemapCrawler(output_path=str(tmp_path / 'crawl'), rate_per_host=0, use_cache=False,
+                                 output_format='jsonl', archive_path=archive_path)
+        crawler.crawl_and_save(f'{site.base_url}/sitemap.xml')
+        requests = site.requests
+    crawled = read_jsonl(tmp_path / 'crawl' / 'blog_contents.jsonl')
+
+    with PageArchive(archive_path) as archive:
+        # Sunucudan gzip'li geldi, alındığı gibi saklandı
+        assert all(('Content-Encoding', 'gzip') in record['headers'] for record in archive)
+        archive.add('https://sarar.com/hakkimizda/', 200, [('Content-Type', 'text/html')], b'<p>Sarar</p>')
+        # Çıkarma 'soup' ile yapıldı, arşivden 'lxml' ile ağa çıkmadan yeniden çıkarılır
+        output = str(tmp_path / 'reextract.jsonl')
+        counts = reextract(archive, output, output_format='jsonl', backend='lxml', workers=2, chunk_size=2)
+    assert site.requests == requests
+    assert counts == {'records': PAGES + 1, 'written': PAGES, 'failed': 1}
+    # Arşiv sırası çekimlerin bitiş sırasıdır, çıktı sitemap sırasındadır
+    assert sorted((r['url'], r['title'], r['content']) for r in read_jsonl(output)) == \
+        sorted((r['url'], r['title'], r['content']) for r in crawled)
+
+
+def test_reads_while_writing(tmp_path):
+    errors = []
+
+    with PageArchive(str(tmp_path / 'archive'), batch_size=5) as archive:
+        def write():
+            for i in range(200):
+                archive.add(f'https://sarar.com/{i % 50}', 200, [], f'<p>{i}</p>'.encode())
+
+        def read():
+            try:
+                for i in range(200):
+                    archive.stats()
+                    archive.locations()
+                    archive.get(f'https://sarar.com/{i % 50}')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert archive.stats()['records'] == 200 and archive.stats()['urls'] == 50
+        # Aynı URL'nin en yeni kaydı okunur
+        assert archive.get('https://sarar.com/0')['body'] == b'<p>150</p>'
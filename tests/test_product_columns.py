@@ -0,0 +1,43 @@
+from decimal import Decimal
+
+import pytest
+
+import product_columns
+from product_columns import ParquetSink, parse_price, price_summary
+
+pytestmark = pytest.mark.skipif(not product_columns.AVAILABLE, reason="pyarrow kurulu değil")
+
+
+def write(path, rows):
+    with ParquetSink(str(path)) as sink:
+        for group, gender, price in rows:
+            sink.write(group, [gender, 'Ürün', f'https://sarar.com/{sink.count}', price, ''])
+
+
+def test_parse_price():
+    assert parse_price('2699.99 TRY') == (Decimal('2699.99'), 'TRY')
+    assert parse_price('2699,995 try') == (Decimal('2700.00'), 'TRY')
+    assert parse_price('100') == (Decimal('100.00'), None)
+    assert parse_price('') == (None, None)
+    assert parse_price('fiyat yok') == (None, None)
+
+
+def test_price_summary_with_null_category(tmp_path):
+    path = tmp_path / 'urunler.parquet'
+    write(path, [('erkek', 'erkek', '100 TRY'), ('erkek', 'erkek', '')])
+    # Ürün sayıları eşit, biri boş para birimi: boş kategori sona sıralanır
+    summary = price_summary(str(path), by='currency')
+    assert [row['currency'] for row in summary] == ['TRY', None]
+    assert summary[0]['min_price'] == Decimal('100.00')
+    assert summary[1]['priced'] == 0 and summary[1]['mean_price'] is None
+
+
+def test_price_summary_orders_by_product_count(tmp_path):
+    path = tmp_path / 'urunler.parquet'
+    write(path, [('kadın', 'kadın', '10 TRY'), ('erkek', 'erkek', '30 TRY'),
+                 ('erkek', 'erkek', '50 TRY'), ('belirsiz', '', '')])
+    summary = price_summary(str(path))
+    assert [row['group'] for row in summary] == ['erkek', 'belirsiz', 'kadın']
+    assert summary[0]['products'] == 2 and summary[0]['mean_price'] == Decimal('40.00')
+    with pytest.raises(ValueError):
+        price_summary(str(path), by='title')
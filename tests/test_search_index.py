@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from search_index import (BLOG, PRODUCT, SearchIndex, _get_varint, _put_varint, analyze, decode_postings,
+                          encode_postings, fold, iter_blog_file, stem)
+from sink import format_text, make_record
+
+
+@pytest.mark.parametrize('value', [0, 1, 127, 128, 129, 16383, 16384, 2 ** 21 - 1, 2 ** 21, 2 ** 63 - 1])
+def test_varint_round_trip(value):
+    out = bytearray()
+    _put_varint(value, out)
+    # 7 bitlik her grup bir bayt
+    assert len(out) == max(1, (value.bit_length() + 6) // 7)
+    assert _get_varint(out + b'\xff', 0) == (value, len(out))
+
+
+def test_postings_round_trip():
+    postings = [(1, [0, 5, 200]), (130, [1]), (20000, list(range(0, 1000, 7)))]
+    data = encode_postings(postings)
+    assert list(decode_postings(b'xx' + data, 2)) == postings
+
+
+def test_turkish_folding():
+    assert fold('İPEK ŞAL') == 'ipek sal'
+    assert fold('ILIK ıhlamur') == 'ilik ihlamur'
+    assert fold('Çağ ÖĞÜN') == 'cag ogun'
+    # Ayrışık yazılmış noktalı İ (I + U+0307) de aynı terime düşer
+    assert fold('İstanbul') == fold('İstanbul') == 'istanbul'
+
+
+def test_stemming():
+    assert stem('gomlegi') == stem('gomlekler') == stem('gomlek') == 'gomlek'
+    assert analyze('GÖMLEKLERİ ve gömleğin') == ['gomlek', 've', 'gomlek']
+    assert stem('cantalarindan') == stem('canta')
+    assert stem('kol') == 'kol'
+    assert stem('2024') == '2024'
+
+
+def search_keys(index, query, **options):
+    return [result['key'] for result in index.search(query, **options)]
+
+
+def test_ranking(tmp_path):
+    with SearchIndex(str(tmp_path / 'index')) as index:
+        index.sync(BLOG, [
+            ('a', 'Keten gömlek rehberi', 'Yaz için keten gömlek seçimi. Keten gömlekler nefes alır.'),
+            ('b', 'Takım elbise', 'Takım elbisenin altına gömlek ve keten mendil.'),
+            ('c', 'Kravat', 'Kravat bağlama yöntemleri.'),
+        ])
+        results = index.search('keten gömlek')
+        assert [result['key'] for result in results] == ['a', 'b']
+        assert results[0]['phrase'] and not results[1]['phrase']
+        assert results[0]['score'] > results[1]['score']
+        assert search_keys(index, 'KRAVATLARI') == ['c']
+        assert search_keys(index, 'ayakkabı') == []
+
+
+def test_sync_update_and_compaction(tmp_path):
+    path = str(tmp_path / 'index')
+    with SearchIndex(path) as index:
+        assert index.sync(PRODUCT, [('1', 'Lacivert gömlek', 'pamuk'), ('2', 'Siyah kazak', 'yün')]) == \
+            {'added': 2, 'changed': 0, 'removed': 0, 'unchanged': 0}
+        assert index.update(PRODUCT, [('1', 'Beyaz gömlek', 'keten'), ('3', 'Gri kazak', 'yün')]) == \
+            {'added': 1, 'changed': 1, 'removed': 0, 'unchanged': 0}
+        # Güncellenen kaydın eski terimleri artık eşleşmez
+        assert search_keys(index, 'lacivert') == []
+        assert search_keys(index, 'beyaz keten') == ['1']
+        assert index.update(PRODUCT, [], removed=['2']) == {'added': 0, 'changed': 0, 'removed': 1, 'unchanged': 0}
+        assert search_keys(index, 'siyah') == []
+        assert index.sync(PRODUCT, [('1', 'Beyaz gömlek', 'keten'), ('3', 'Gri kazak', 'yün')]) == \
+            {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 2}
+        assert index.stats()['segments'] == 2
+
+        index.compact()
+        assert index.stats() == {BLOG: 0, PRODUCT: 2, 'segments': 1}
+        segment = index._segments[0]
+        terms = dict((term, list(postings)) for term, postings in segment.items())
+        # Birleştirilmiş segmentte silinen ve eski sürümün postingleri yok
+        assert 'lacivert' not in terms and 'siyah' not in terms
+        assert [doc_id for doc_id, _ in terms['kazak']] == [4]
+    assert sorted(name for name in os.listdir(path) if name.endswith('.idx')) == [os.path.basename(segment.path)]
+
+    # Segmentler yeniden açılınca (mmap) aynı sonuçlar
+    with SearchIndex(path) as index:
+        assert search_keys(index, 'kazak') == ['3']
+        assert search_keys(index, 'gömlek', kind=BLOG) == []
+
+
+def test_iter_blog_file(tmp_path):
+    path = tmp_path / 'blog_contents.txt'
+    records = [make_record('https://sarar.com/1', 'birinci\n' + '-' * 100 + '\nsatır', 'Bir'),
+               make_record('https://sarar.com/2', 'ikinci', 'İki')]
+    path.write_text(''.join(format_text(record) for record in records), encoding='utf-8')
+    # İçerikteki ayraç satırı, ardından BAŞLIK gelmedikçe kayıt sınırı sayılmaz
+    assert list(iter_blog_file(str(path))) == [(r['url'], r['title'], r['content']) for r in records]
@@ -0,0 +1,164 @@
+import multiprocessing
+import sqlite3
+import time
+
+import pytest
+
+from crawler import SitemapCrawler
+from mock_site import MockSite
+from shared_frontier import CLAIMED, DONE, LeaseLost, SharedFrontier, SQLiteSharedFrontier
+from sink import make_record
+
+# Süreçler ayrı SQLite bağlantısıyla aynı dosyayı paylaşır; fork thread'li test sürecini kopyalamasın
+SPAWN = multiprocessing.get_context('spawn')
+URLS = [(f'https://host{i % 8}.test/{i}', None) for i in range(120)]
+
+
+class FlakyRenewFrontier(SQLiteSharedFrontier):
+    """İlk kira yenilemesi veritabanı hatası veren ortak frontier"""
+
+    def __init__(self, path):
+        super().__init__(path, shards=4)
+        self.renew_failures = 0
+
+    def renew(self, lease, lease_seconds):
+        if self.renew_failures == 0:
+            self.renew_failures += 1
+            raise sqlite3.OperationalError("database is locked")
+        super().renew(lease, lease_seconds)
+
+
+def test_interface_is_abstract():
+    class Partial(SharedFrontier):
+        def add(self, items):
+            return 0
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_renew_failure_is_treated_as_lost_lease(tmp_path):
+    with MockSite(pages=6, feed_items=0, latency=0.1) as site:
+        shared = FlakyRenewFrontier(str(tmp_path / 'shared.db'))
+        crawler = SitemapCrawler(output_path=str(tmp_path), rate_per_host=0, concurrency=2, use_cache=False)
+        # Kira 0.15 sn'de bir yenilenir; 0.1 sn gecikmeli iki sayfalık parça yenilemeden uzun sürer
+        crawler.crawl_shared(shared, 'node1', [f'{site.base_url}/sitemap.xml'], shards=1,
+                             lease_seconds=0.45, claim_size=2)
+    assert shared.renew_failures == 1
+    assert crawler.metrics.snapshot()['counters']['leases_lost_total'] >= 1
+    # Kaybedilen parçanın URL'leri yeniden kuyruğa döndü ve sonunda tamamlandı
+    assert shared.unfinished() == 0
+    assert shared.counts()[DONE] == 6
+    shared.close()
+
+
+def test_shared_frontier_gets_canonical_urls_once(tmp_path):
+    with MockSite(pages=4, feed_items=0) as site:
+        site.sitemap = site.sitemap.replace(
+            b'</urlset>', f'<url><loc>{site.base_url}/blog/0/?utm_source=feed</loc></url></urlset>'.encode())
+        shared = SQLiteSharedFrontier(str(tmp_path / 'shared.db'), shards=2)
+        crawler = SitemapCrawler(output_path=str(tmp_path), rate_per_host=0, concurrency=2, use_cache=False)
+        crawler.crawl_shared(shared, 'node1', [f'{site.base_url}/sitemap.xml'], shards=1)
+    assert shared.counts()[DONE] == 4
+    assert site.requests == 5
+    # Durum ortak frontier'da tutulur; yerel frontier'da checkpoint'lenmeyen güncelleme birikmemeli
+    assert crawler.frontier._pending_updates == {}
+    shared.close()
+
+
+def run_node(path, worker_id, lease_seconds):
+    """Düğüm süreci: frontier bitene kadar shard kiralar, URL'yi içerik olarak yazar"""
+    with SQLiteSharedFrontier(path) as shared:
+        while shared.unfinished():
+            lease = shared.acquire(worker_id, lease_seconds)
+            if lease is None:
+                time.sleep(0.05)
+                continue
+            try:
+                while True:
+                    batch = shared.claim(lease, 5)
+                    if not batch:
+                        break
+                    shared.complete(lease, [make_record(url, url, worker_id) for url, _ in batch])
+            except LeaseLost:
+                continue
+            shared.release(lease)
+
+
+def stall_node(path, lease_seconds, leases, resume):
+    """Shard kiralayıp URL alır, kirayı bildirir ve bekler; resume gelirse geç kalmış sonucu yazmayı dener"""
+    with SQLiteSharedFrontier(path) as shared:
+        lease = shared.acquire('yavaş', lease_seconds)
+        batch = shared.claim(lease, 5)
+        leases.put((lease, batch))
+        resume.wait()
+        try:
+            shared.complete(lease, [make_record(url, url, 'yavaş') for url, _ in batch])
+            leases.put('yazıldı')
+        except LeaseLost:
+            leases.put('reddedildi')
+
+
+def shared_frontier(tmp_path, urls=URLS):
+    path = str(tmp_path / 'shared.db')
+    with SQLiteSharedFrontier(path, shards=4) as shared:
+        shared.add(urls)
+    return path
+
+
+def test_nodes_finish_every_url_once(tmp_path):
+    path = shared_frontier(tmp_path)
+    nodes = [SPAWN.Process(target=run_node, args=(path, f'node{i}', 30)) for i in range(3)]
+    for node in nodes:
+        node.start()
+    for node in nodes:
+        node.join(60)
+        assert node.exitcode == 0
+
+    with SQLiteSharedFrontier(path) as shared:
+        assert shared.counts()[DONE] == len(URLS) and shared.unfinished() == 0
+        records = list(shared.records())
+        # Hiçbir kiralama kaybedilmedi: her URL bir kez alındı ve bir kez yazıldı
+        attempts = shared._conn.execute("SELECT MAX(attempts), MIN(attempts) FROM urls").fetchone()
+    assert sorted(r['url'] for r in records) == sorted(url for url, _ in URLS)
+    assert all(r['content'] == r['url'] for r in records)
+    assert attempts == (1, 1)
+
+
+def test_killed_node_shard_is_released_and_stale_writes_rejected(tmp_path):
+    path = shared_frontier(tmp_path)
+    # Öldürülen süreç ayrı event'te bekler: bekleyeni öldürülmüş bir Event'in set()'i kilitlenir
+    leases, resume, never = SPAWN.Queue(), SPAWN.Event(), SPAWN.Event()
+    killed = SPAWN.Process(target=stall_node, args=(path, 0.5, leases, never))
+    stalled = SPAWN.Process(target=stall_node, args=(path, 0.5, leases, resume))
+    killed.start()
+    killed_lease, killed_batch = leases.get(timeout=30)
+    stalled.start()
+    stalled_lease, stalled_batch = leases.get(timeout=30)
+    killed.kill()
+    killed.join()
+    assert killed_lease['shard'] != stalled_lease['shard']
+
+    # Kiralar dolunca iki shard da yeni token'la başka düğüme geçer, alınmış URL'ler yeniden dağıtılır
+    time.sleep(0.6)
+    node = SPAWN.Process(target=run_node, args=(path, 'node1', 30))
+    node.start()
+    node.join(60)
+    assert node.exitcode == 0
+
+    resume.set()
+    assert leases.get(timeout=30) == 'reddedildi'
+    stalled.join(30)
+
+    with SQLiteSharedFrontier(path) as shared:
+        assert shared.counts()[DONE] == len(URLS) and shared.unfinished() == 0
+        rows = dict(shared._conn.execute("SELECT shard, token FROM shards").fetchall())
+        assert rows[killed_lease['shard']] > killed_lease['token']
+        assert rows[stalled_lease['shard']] > stalled_lease['token']
+        for url, _ in killed_batch + stalled_batch:
+            state, attempts = shared._conn.execute(
+                "SELECT state, attempts FROM urls WHERE url = ?", (url,)).fetchone()
+            assert (state, attempts) == (DONE, 2)
+        # Çıktıdaki kayıtlar geç kalan düğümden değil, kirayı devralan düğümden
+        assert {r['worker'] for r in shared.records()} == {'node1'}
+        assert CLAIMED not in shared.counts()
@@ -0,0 +1,24 @@
+import pytest
+
+from sink import OutputWriter, make_record
+
+
+def test_make_record_keeps_given_fetch_time():
+    record = make_record('https://example.com/a', 'içerik', 'Başlık', '2024-11-13T10:00:00')
+    assert record['fetched_at'] == '2024-11-13T10:00:00'
+    assert make_record('https://example.com/a', 'içerik')['fetched_at']
+
+
+def test_close_reports_error_after_writer_thread_died(tmp_path):
+    def broken(record):
+        raise ValueError("biçimlendirilemedi")
+
+    writer = OutputWriter(str(tmp_path / 'out.txt'), formatter=broken)
+    writer.start()
+    writer.put(0, make_record('https://example.com/a', 'içerik'))
+    # Yazıcı thread'i close çağrılmadan önce hata ile bitmiş olmalı; hata yine de raporlanır
+    writer._thread.join(timeout=5)
+    assert not writer._thread.is_alive()
+    with pytest.raises(RuntimeError) as info:
+        writer.close()
+    assert isinstance(info.value.__cause__, ValueError)
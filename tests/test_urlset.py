@@ -0,0 +1,73 @@
+import pytest
+
+from crawler import SitemapCrawler
+from urlset import SeenSet, canonical_url
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('HTTPS://Sarar.COM/Blog/Yazi', 'https://sarar.com/Blog/Yazi'),
+    ('https://sarar.com:443/blog', 'https://sarar.com/blog'),
+    ('http://sarar.com:80/blog', 'http://sarar.com/blog'),
+    ('https://sarar.com:8443/blog', 'https://sarar.com:8443/blog'),
+    ('http://sarar.com:443/blog', 'http://sarar.com:443/blog'),
+    ('https://sarar.com/blog/#yorumlar', 'https://sarar.com/blog'),
+    ('https://sarar.com/blog/?utm_source=feed&utm_medium=rss&gclid=x&currency=TRY', 'https://sarar.com/blog'),
+    ('https://sarar.com/ara?q=ceket&sayfa=2&fbclid=x', 'https://sarar.com/ara?q=ceket&sayfa=2'),
+    ('https://sarar.com/ara?sayfa=2&q=ceket', 'https://sarar.com/ara?q=ceket&sayfa=2'),
+    ('https://sarar.com/blog/', 'https://sarar.com/blog'),
+    ('https://sarar.com/', 'https://sarar.com/'),
+    ('https://sarar.com', 'https://sarar.com/'),
+    ('  /blog/yazi/?b=&a=1 ', '/blog/yazi?a=1&b='),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_seen_set_uses_canonical_key():
+    seen = SeenSet(16, key=canonical_url)
+    assert seen.add('https://sarar.com/blog/1/')
+    assert not seen.add('HTTPS://SARAR.COM/blog/1?utm_source=x#top')
+    assert 'https://sarar.com:443/blog/1' in seen
+    assert 'https://sarar.com/blog/2' not in seen
+    assert len(seen) == 1
+
+
+def test_seen_set_grows_past_capacity():
+    seen = SeenSet(4)
+    urls = [f'https://sarar.com/{i}' for i in range(1000)]
+    assert all(seen.add(url) for url in urls)
+    assert not any(seen.add(url) for url in urls)
+    assert len(seen) == 1000 and all(url in seen for url in urls)
+
+
+def test_bloom_positives_are_checked_against_table():
+    # Kapasitesi aşılmış %50'lik filtre çok yanlış pozitif verir; tablo yine de kesin cevap vermeli
+    seen = SeenSet(8, bloom_fp=0.5)
+    for i in range(200):
+        assert seen.add(f'https://sarar.com/{i}')
+    unseen = [f'https://sarar.com/yeni/{i}' for i in range(200)]
+    assert not any(url in seen for url in unseen)
+    assert seen.false_positives > 0
+    assert seen.fp_rate() == seen.false_positives / seen.negatives
+    assert seen.stats()['bloom_fp_rate'] == round(seen.fp_rate(), 6)
+
+
+def test_bloom_only_mode():
+    with pytest.raises(ValueError):
+        SeenSet(8, exact=False)
+    seen = SeenSet(1000, bloom_fp=0.01, exact=False)
+    assert seen.add('https://sarar.com/1') and not seen.add('https://sarar.com/1')
+    assert 'https://sarar.com/1' in seen
+    assert 0 < seen.fp_rate() < 0.01
+    assert len(seen._slots) == 0
+
+
+def test_seen_metrics(tmp_path):
+    crawler = SitemapCrawler(output_path=str(tmp_path), expected_urls=8, bloom_fp=0.5)
+    for i in range(100):
+        crawler.visited_urls.add(f'https://sarar.com/{i}')
+    crawler._report_seen()
+    gauges = crawler.metrics.snapshot()['gauges']
+    assert gauges['seen_urls']['value'] == 100
+    assert gauges['seen_set_bytes']['value'] == crawler.visited_urls.nbytes
+    assert gauges['seen_bloom_fp_rate']['value'] == round(crawler.visited_urls.fp_rate(), 6) > 0
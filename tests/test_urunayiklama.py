@@ -0,0 +1,149 @@
+import csv
+import io
+import os
+import re
+
+import pytest
+import urllib3
+
+import product_columns
+import urunayiklama
+from mock_site import FEED_ITEM, render_feed
+
+
+class BrokenStream(io.RawIOBase):
+    """Feed'in ilk `limit` baytını verip bağlantı kopmuş gibi urllib3 hatası fırlatan akış"""
+
+    def __init__(self, data, limit):
+        self.data = io.BytesIO(data[:limit])
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.data.readinto(buffer)
+        if n == 0:
+            raise urllib3.exceptions.ProtocolError("Connection broken: IncompleteRead")
+        return n
+
+
+def read_csvs(directory):
+    return {name: open(os.path.join(directory, name), encoding='utf-8-sig').read()
+            for name in sorted(os.listdir(directory))}
+
+
+def test_failed_stream_keeps_previous_csvs(tmp_path):
+    feed = render_feed(500)
+    assert urunayiklama.stream_to_csv(io.BytesIO(feed), str(tmp_path)) is not None
+    before = read_csvs(tmp_path)
+
+    # Yarım XML ve kopan bağlantı: önceki dosyalar aynen kalmalı, geçici dosya kalmamalı
+    assert urunayiklama.stream_to_csv(io.BytesIO(feed[:len(feed) // 2]), str(tmp_path)) is None
+    assert urunayiklama.stream_to_csv(BrokenStream(feed, len(feed) // 2), str(tmp_path)) is None
+    assert read_csvs(tmp_path) == before
+
+
+def test_connection_error_in_incremental_mode(tmp_path):
+    feed = render_feed(200)
+    assert urunayiklama.stream_to_delta(BrokenStream(feed, len(feed) // 2), str(tmp_path)) is None
+
+
+@pytest.mark.skipif(not product_columns.AVAILABLE, reason="pyarrow kurulu değil")
+def test_parquet_with_many_distinct_genders(tmp_path):
+    # Cinsiyet serbest metin: 128'den fazla farklı değer sözlük indeksini taşırmamalı
+    genders = iter(range(300))
+    feed = re.sub(rb'<g:gender>[^<]*</g:gender>',
+                  lambda m: f'<g:gender>cinsiyet {next(genders)}</g:gender>'.encode(), render_feed(300))
+    parquet_path = str(tmp_path / product_columns.PARQUET_FILE)
+    counts = urunayiklama.stream_to_csv(io.BytesIO(feed), str(tmp_path / 'csv'), parquet_path=parquet_path)
+    assert counts is not None
+    table = product_columns.read_products(parquet_path, columns=['gender'])
+    assert len(set(table.column('gender').to_pylist())) == sum(counts.values())
+
+
+def product_feed(products):
+    """(id, başlık, fiyat, cinsiyet) listesinden feed üretir"""
+    items = ''.join(FEED_ITEM.format(id=i, title=title, description='Açıklama', price=price, gender=gender,
+                                     link=f'https://sarar.com/urun-{i}?currency=TRY')
+                    for i, title, price, gender in products)
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<rss xmlns:g="http://base.google.com/ns/1.0" version="2.0"><channel>\n'
+            f'{items}</channel></rss>\n').encode('utf-8')
+
+
+def read_rows(directory, name):
+    with open(os.path.join(directory, name), newline='', encoding='utf-8-sig') as f:
+        return list(csv.reader(f))[1:]
+
+
+def delta_rows(directory, group):
+    return [(row[0], row[3], row[4]) for row in read_rows(directory, f'sarar_{group}_urunler_delta.csv')]
+
+
+def full_rows(directory, group):
+    return [(row[2], row[3]) for row in read_rows(directory, f'sarar_{group}_urunler.csv')]
+
+
+FIRST = [(1, 'Gömlek', '100 TRY', 'Erkek'), (2, 'Elbise', '200 TRY', 'Kadın'),
+         (3, 'Şapka', '50 TRY', 'Unisex'), (4, 'Kemer', '80 TRY', 'Erkek')]
+# 1 aynı, 2'nin fiyatı değişti, 3 erkek grubuna geçti, 4 silindi, 5 eklendi
+SECOND = [(1, 'Gömlek', '100 TRY', 'Erkek'), (2, 'Elbise', '180 TRY', 'Kadın'),
+          (3, 'Şapka', '50 TRY', 'Erkek'), (5, 'Etek', '150 TRY', 'Kadın')]
+
+
+def link(i):
+    return f'https://sarar.com/urun-{i}?currency=TRY'
+
+
+def key(i):
+    return f'https://sarar.com/urun-{i}'
+
+
+def test_delta_between_two_snapshots(tmp_path):
+    out = str(tmp_path)
+    counts = urunayiklama.stream_to_delta(io.BytesIO(product_feed(FIRST)), out, update_full=True)
+    assert counts == {'eklendi': 4, 'değişti': 0, 'silindi': 0}
+    assert full_rows(out, 'erkek') == [(link(1), '100 TRY'), (link(4), '80 TRY')]
+
+    counts = urunayiklama.stream_to_delta(io.BytesIO(product_feed(SECOND)), out, update_full=True)
+    # Grup değiştiren ürün eski grubunda silindi, yeni grubunda eklendi sayılır
+    assert counts == {'eklendi': 2, 'değişti': 1, 'silindi': 2}
+    assert delta_rows(out, 'erkek') == [('eklendi', link(3), '50 TRY'), ('silindi', key(4), '')]
+    assert delta_rows(out, 'kadın') == [('değişti', link(2), '180 TRY'), ('eklendi', link(5), '150 TRY')]
+    assert delta_rows(out, 'üniseks') == [('silindi', key(3), '')]
+    assert delta_rows(out, 'belirsiz') == []
+    # Tam CSV'ler yerinde güncellenir: değişen satır yerinde kalır, yeni satır sona eklenir
+    assert full_rows(out, 'erkek') == [(link(1), '100 TRY'), (link(3), '50 TRY')]
+    assert full_rows(out, 'kadın') == [(link(2), '180 TRY'), (link(5), '150 TRY')]
+    assert full_rows(out, 'üniseks') == []
+
+    # Değişiklik yoksa delta dosyaları boşalır, önceki delta yeniden uygulanmaz
+    counts = urunayiklama.stream_to_delta(io.BytesIO(product_feed(SECOND)), out, update_full=True)
+    assert counts == {'eklendi': 0, 'değişti': 0, 'silindi': 0}
+    assert all(delta_rows(out, group) == [] for group in urunayiklama.GROUPS)
+
+
+def test_failed_feed_does_not_update_snapshots(tmp_path):
+    out = str(tmp_path)
+    urunayiklama.stream_to_delta(io.BytesIO(product_feed(FIRST)), out, update_full=True)
+    before = {group: (full_rows(out, group), delta_rows(out, group))
+              for group in ('erkek', 'kadın', 'üniseks')}
+
+    feed = product_feed(SECOND)
+    assert urunayiklama.stream_to_delta(io.BytesIO(feed[:len(feed) // 2]), out, update_full=True) is None
+    assert urunayiklama.stream_to_delta(BrokenStream(feed, len(feed) // 2), out, update_full=True) is None
+    assert {group: (full_rows(out, group), delta_rows(out, group))
+            for group in ('erkek', 'kadın', 'üniseks')} == before
+
+    # Durum da değişmedi: yarım feed'de görülmeyen ürünler silinmiş sayılmadı
+    counts = urunayiklama.stream_to_delta(io.BytesIO(product_feed(SECOND)), out, update_full=True)
+    assert counts == {'eklendi': 2, 'değişti': 1, 'silindi': 2}
+
+
+def test_compute_delta_uses_first_record_of_a_key():
+    rows = [('erkek', ['erkek', 'Gömlek', link(1), '100 TRY', '']),
+            ('kadın', ['kadın', 'Gömlek', link(1) + '#renk', '90 TRY', ''])]
+    changes, upserts, deletes = urunayiklama.compute_delta(rows, {})
+    assert changes['erkek'] == [('eklendi', rows[0][1])] and changes['kadın'] == []
+    assert [(k, group) for k, _, group in upserts] == [(key(1), 'erkek')]
+    assert deletes == []
@@ -0,0 +1,50 @@
+import json
+import sqlite3
+
+import pytest
+
+import webcrawl
+from mock_site import MockSite
+
+
+@pytest.fixture
+def crawler_factory(tmp_path, monkeypatch):
+    # SitemapCrawler crawler.log'u çalışma dizinine yazar
+    monkeypatch.chdir(tmp_path)
+    site = MockSite(pages=6, feed_items=0).start()
+
+    def make():
+        return webcrawl.SitemapCrawler(
+            f'{site.base_url}/sitemap.xml', output_file=str(tmp_path / 'out.jsonl'),
+            cache_path=str(tmp_path / 'cache.db'), frontier_path=str(tmp_path / 'frontier.db'),
+            output_format='jsonl', parse_workers=1, delay=0)
+
+    yield make
+    site.stop()
+
+
+def read_records(crawler):
+    with open(crawler.output_file, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_records_carry_title_and_fetch_time(crawler_factory):
+    crawler = crawler_factory()
+    crawler.crawl()
+    records = read_records(crawler)
+    assert len(records) == 6
+    for record in records:
+        # Başlık sayfanın ilk h1'i; webcrawl biçiminde metnin ilk paragrafı da odur
+        assert record['title'] and record['content'].startswith(record['title'])
+        assert record['fetched_at']
+
+    # Sitemap lastmod değişmediği için ikinci çalışma önbellekten karşılanır; kayıtlar
+    # yeniden oluşturulma anını değil sayfanın gerçekten çekildiği zamanı taşımalı
+    with sqlite3.connect(crawler.cache.path) as conn:
+        conn.execute("UPDATE pages SET fetched_at = '2024-11-13T10:00:00'")
+    crawler = crawler_factory()
+    crawler.crawl()
+    records = read_records(crawler)
+    assert len(records) == 6
+    assert {record['fetched_at'] for record in records} == {'2024-11-13T10:00:00'}
+    assert all(record['title'] for record in records)
@@ -0,0 +1,227 @@
+"""
+URL kanonikleştirme ve büyük taramalar için sıkıştırılmış "görüldü" kümesi.
+
+canonical_url aynı sayfayı gösteren URL varyantlarını tek biçime indirir: şema ve host küçük harf,
+varsayılan port ve fragment atılır, sondaki '/' kaldırılır, izleme/para birimi parametreleri
+(utm_*, gclid, currency ...) silinir ve kalan parametreler sıralanır. Çekim kanonik URL ile değil,
+ilk görülen URL ile yapılır; kanonik biçim yalnızca kimlik içindir.
+
+SeenSet URL başına dizeyi değil, 8 baytlık özetini açık adresli bir array('Q') tablosunda tutar;
+URL başına ~11-16 bayt harcar (set[str]'de URL uzunluğu + ~90 bayt). İsteğe bağlı Bloom filtresi
+tablonun önünde durur. exact=False ile yalnızca Bloom filtresi kullanılır: bellek capacity ile sabitlenir
+(%1 yanlış pozitifte URL başına ~1.2 bayt), ama yanlış pozitifler (görülmemiş bir URL'nin görülmüş
+sayılması) atlanan URL demektir. Filtre + tablo modunda yanlış pozitif oranı gerçek olarak ölçülür,
+yalnızca Bloom modunda doluluktan tahmin edilir (fp_rate()). Saf Python'da tablo araması filtreden
+ucuz olduğundan filtre + tablo hız kazandırmaz; yalnızca Bloom moduna geçmeden önce oranı görmek içindir.
+
+64 bitlik özetlerde çakışma olasılığı 10 milyon URL'de ~3e-6'dır ve göz ardı edilir.
+"""
+import hashlib
+import math
+from array import array
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Sayfa içeriğini değiştirmeyen, kampanya/izleme ya da gösterim parametreleri
+TRACKING_PARAMS = frozenset({
+    'currency', 'gclid', 'gclsrc', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid',
+    '_ga', '_gl', 'mc_cid', 'mc_eid', 'ref', 'ref_src',
+})
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonical_url(url: str) -> str:
+    """URL'yi kimlik karşılaştırması için kanonik biçime çevirir"""
+    url = url.strip()
+    scheme, sep, rest = url.partition('://')
+    if sep and scheme.isalpha():
+        # Mutlak URL'lerde urlsplit'ten birkaç kat hızlı; sıra urlsplit ile aynı (önce fragment, sonra sorgu)
+        rest = rest.partition('#')[0]
+        rest, _, query = rest.partition('?')
+        netloc, slash, path = rest.partition('/')
+        path = slash + path
+    else:
+        scheme, netloc, path, query, _ = urlsplit(url)
+    scheme = scheme.lower()
+    netloc = netloc.lower()
+    port = DEFAULT_PORTS.get(scheme)
+    if port and netloc.endswith(f':{port}'):
+        netloc = netloc[:-len(str(port)) - 1]
+    path = path.rstrip('/') or '/'
+    if query:
+        params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+                  if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)]
+        query = urlencode(sorted(params))
+    prefix = f'{scheme}://{netloc}' if scheme or netloc else ''
+    return f'{prefix}{path}?{query}' if query else f'{prefix}{path}'
+
+
+def url_hash(key: str) -> int:
+    """Sıfır olmayan 64 bitlik özet (0 tabloda boş yuva anlamına gelir)"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+
+class SeenSet:
+    """
+    Dizeler için sabit genişlikli özet kümesi. set gibi `in` ve add() destekler; add() öğe yeniyse True döner.
+    key verilirse (ör. canonical_url) öğeler önce bununla dönüştürülür.
+
+    capacity beklenen öğe sayısıdır; Bloom filtresi bu sayıya göre bloom_fp oranında boyutlanır. Tablo
+    load_factor aşıldıkça iki katına büyür ve filtre tablodaki özetlerden yeniden kurulur. Yalnızca Bloom
+    modunda filtre büyüyemez; capacity aşılınca yanlış pozitif oranı hızla artar.
+    """
+
+    def __init__(self, capacity: int = 1 << 20, key: Optional[Callable[[str], str]] = None,
+                 bloom_fp: Optional[float] = None, exact: bool = True, load_factor: float = 0.7):
+        if not exact and not bloom_fp:
+            raise ValueError("exact=False yalnızca Bloom filtresiyle (bloom_fp) kullanılabilir")
+        self.capacity = max(1, capacity)
+        self.key = key
+        self.exact = exact
+        self.load_factor = load_factor
+        self.bloom_fp = bloom_fp
+        self._count = 0
+        self._bits: Optional[bytearray] = None
+        if bloom_fp:
+            self._build_bloom(self.capacity)
+        self._slots = array('Q')
+        if exact:
+            self._resize(int(self.capacity / load_factor) + 1)
+        # Bloom filtresinin "var olabilir" dediği sorgular ve bunlardan tabloda çıkmayanlar
+        self.bloom_positives = 0
+        self.false_positives = 0
+        # Gerçekte görülmemiş öğe sorguları (exact modda); ölçülen yanlış pozitif oranının paydası
+        self.negatives = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _build_bloom(self, capacity: int) -> None:
+        # Standart boyutlama: m = -n ln p / (ln 2)^2, k = m/n ln 2
+        self._bloom_capacity = capacity
+        self._m = max(64, math.ceil(-capacity * math.log(self.bloom_fp) / math.log(2) ** 2))
+        self._k = max(1, round(self._m / capacity * math.log(2)))
+        self._bits = bytearray((self._m + 7) // 8)
+
+    def _resize(self, size: int) -> None:
+        old = self._slots
+        self._slots = array('Q', bytes(8 * size))
+        self._limit = int(size * self.load_factor)
+        self._count = 0
+        for h in old:
+            if h:
+                self._insert(h)
+        if self._bits is not None and self._limit > self._bloom_capacity:
+            # Filtre tablonun yeni kapasitesine göre büyütülüp mevcut özetlerle doldurulur
+            self._build_bloom(self._limit)
+            for h in old:
+                if h:
+                    self._bloom(h, update=True)
+
+    def _insert(self, h: int) -> bool:
+        """Doğrusal yoklamalı ekleme. Returns: özet tabloda yoksa True"""
+        slots = self._slots
+        size = len(slots)
+        i = h % size
+        while True:
+            value = slots[i]
+            if value == 0:
+                slots[i] = h
+                self._count += 1
+                if self._count > self._limit:
+                    self._resize(size * 2)
+                return True
+            if value == h:
+                return False
+            i += 1
+            if i == size:
+                i = 0
+
+    def _lookup(self, h: int) -> bool:
+        slots = self._slots
+        size = len(slots)
+        i = h % size
+        while True:
+            value = slots[i]
+            if value == h:
+                return True
+            if value == 0:
+                return False
+            i += 1
+            if i == size:
+                i = 0
+
+    def _bloom(self, h: int, update: bool) -> bool:
+        """Özetin k bitini (çift özetleme) kontrol eder, update ise set eder. Returns: tüm bitler zaten açıksa True"""
+        bits, m = self._bits, self._m
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        present = True
+        for i in range(self._k):
+            position = (h1 + i * h2) % m
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                if not update:
+                    return False
+                present = False
+                bits[position >> 3] |= mask
+        return present
+
+    def _hash(self, item: str) -> int:
+        return url_hash(self.key(item) if self.key is not None else item)
+
+    def __contains__(self, item: str) -> bool:
+        h = self._hash(item)
+        if self._bits is not None:
+            if not self._bloom(h, update=False):
+                self.negatives += self.exact
+                return False
+            if not self.exact:
+                return True
+            self.bloom_positives += 1
+        found = self._lookup(h)
+        if not found:
+            self.negatives += 1
+            if self._bits is not None:
+                self.false_positives += 1
+        return found
+
+    def add(self, item: str) -> bool:
+        """Öğeyi ekler. Returns: öğe daha önce görülmemişse True"""
+        h = self._hash(item)
+        if self._bits is not None:
+            maybe_seen = self._bloom(h, update=True)
+            if not self.exact:
+                self._count += not maybe_seen
+                return not maybe_seen
+            if maybe_seen:
+                self.bloom_positives += 1
+        new = self._insert(h)
+        if new:
+            self.negatives += 1
+            if self._bits is not None and maybe_seen:
+                self.false_positives += 1
+        return new
+
+    def fp_rate(self) -> Optional[float]:
+        """
+        Bloom filtresinin yanlış pozitif oranı: exact modda ölçülen (yanlış pozitif / yeni öğe sorgusu),
+        yalnızca Bloom modunda eklenen öğe sayısından tahmin edilen. Filtre yoksa None.
+        """
+        if self._bits is None:
+            return None
+        if self.exact:
+            return self.false_positives / self.negatives if self.negatives else 0.0
+        return (1 - math.exp(-self._k * self._count / self._m)) ** self._k
+
+    @property
+    def nbytes(self) -> int:
+        """Tablo ve filtrenin kapladığı bayt"""
+        return self._slots.itemsize * len(self._slots) + (len(self._bits) if self._bits is not None else 0)
+
+    def stats(self) -> Dict[str, float]:
+        stats = {'items': self._count, 'bytes': self.nbytes}
+        if self._bits is not None:
+            stats['bloom_fp_rate'] = round(self.fp_rate(), 6)
+        return stats
@@ -1,9 +1,18 @@
 import xml.etree.ElementTree as ET
+import argparse
+import contextlib
 import csv
 import os
 import requests
-from io import StringIO
 import html
+import urllib3
+
+import normalize
+from feed_state import FeedState, product_hash, product_key
+import product_columns
+from product_columns import PARQUET_FILE, ParquetSink, write_from_csvs
+from chunker import ChunkWriter, chunk_product_csvs
+from search_index import PRODUCT, SearchIndex, iter_product_csvs, read_product_deltas
 
 def fetch_xml_content(url):
     """URL'den XML içeriğini çeker"""
@@ -27,38 +36,73 @@ def decode_html_entities(text):
 
 def clean_cdata(text):
     """CDATA içeriğini temizler ve Türkçe karakterleri düzeltir"""
-    if text is None:
-        return ""
-    # CDATA etiketlerini kaldır
-    text = text.replace('<![CDATA[', '').replace(']]>', '')
-    # HTML entitylerini decode et
-    text = decode_html_entities(text)
-    # Türkçe karakter dönüşümlerini yap
-    text = text.replace('&uuml;', 'ü').replace('&Uuml;', 'Ü')
-    text = text.replace('&ouml;', 'ö').replace('&Ouml;', 'Ö')
-    text = text.replace('&ccedil;', 'ç').replace('&Ccedil;', 'Ç')
-    text = text.replace('&yacute;', 'ı').replace('&Yacute;', 'İ')
-    text = text.replace('&sect;', 'ş').replace('&Sect;', 'Ş')
-    text = text.replace('&gbreve;', 'ğ').replace('&Gbreve;', 'Ğ')
-    return text.strip()
+    return normalize.clean_text(text)
 
 def parse_description(desc):
     """Ürün açıklamasını temizler ve formatlar"""
-    if desc is None:
-        return ""
-    # HTML etiketlerini kaldır
-    desc = decode_html_entities(desc)
-    desc = desc.replace('<ul>', '').replace('</ul>', '')
-    desc = desc.replace('<li>', '').replace('</li>', '-')
-    desc = desc.replace('<br />', ' ').replace('<p>', '').replace('</p>', ' ')
-    desc = desc.replace('<strong>', '').replace('</strong>', '')
-    desc = desc.replace('<span>', '').replace('</span>', '')
+    return normalize.clean_description(desc)
+
+GOOGLE_NS = '{http://base.google.com/ns/1.0}'
+
+CSV_HEADERS = ['Cinsiyet', 'Ürün Adı', 'Ürün Satın Alma Linki', 'Ürün Fiyatı', 'Ürün Açıklaması']
+
+def classify_gender(gender):
+    """Cinsiyet alanını CSV gruplarından birine eşler"""
+    gender = gender.lower()
+    if 'erkek' in gender:
+        return 'erkek'
+    elif 'kadın' in gender or 'kadin' in gender:
+        return 'kadın'
+    elif 'unisex' in gender or 'üniseks' in gender:
+        return 'üniseks'
+    return 'belirsiz'
+
+FEED_FIELDS = ('gender', 'title', 'link', 'price', 'description')
+
+# Akış modunda sütun sütun normalize edilen ürün sayısı
+PARSE_BATCH_SIZE = 1000
+
+def item_fields(item):
+    """<item> elemanının ham alan metinleri (FEED_FIELDS sırasıyla), alan eksikse AttributeError"""
+    return [item.find(f'.//{GOOGLE_NS}{name}').text for name in FEED_FIELDS]
+
+def parse_item(item):
+    """Tek bir <item> elemanından ürün satırını çıkarır, başlık ya da link boşsa None döner"""
+    gender, title, link, price, description = item_fields(item)
+    gender = normalize.clean_text(gender).lower()
+    title = normalize.clean_text(title)
+    link = normalize.clean_text(link)
+    price = normalize.clean_text(price)
+    description = normalize.clean_description(normalize.clean_text(description))
     
-    # Fazla boşlukları ve tireleri temizle
-    parts = [x.strip() for x in desc.split('-') if x.strip()]
-    desc = ' - '.join(parts)
+    # Boş değerleri kontrol et
+    if not title.strip() or not link.strip():
+        return None
     
-    return desc
+    return [
+        gender,
+        title,
+        link,
+        price,
+        description
+    ]
+
+def parse_items(raw_items):
+    """
+    item_fields çıktılarını sütun sütun normalize eder, parse_item ile aynı satırları sırayla döndürür.
+    Tekrarlayan alanlar (cinsiyet, fiyat, varyantların açıklamaları) bir kez işlenir.
+    """
+    if not raw_items:
+        return []
+    genders, titles, links, prices, descriptions = zip(*raw_items)
+    rows = zip(
+        [gender.lower() for gender in normalize.clean_texts(genders)],
+        normalize.clean_texts(titles),
+        normalize.clean_texts(links),
+        normalize.clean_texts(prices),
+        normalize.clean_descriptions(normalize.clean_texts(descriptions)),
+    )
+    return [list(row) for row in rows if row[1].strip() and row[2].strip()]
 
 def process_xml(xml_content):
     """XML içeriğini işler ve ürünleri cinsiyete göre gruplar"""
@@ -76,33 +120,12 @@ def process_xml(xml_content):
         # Her ürünü işle
         for item in root.findall('.//item'):
             try:
-                gender = clean_cdata(item.find('.//{http://base.google.com/ns/1.0}gender').text).lower()
-                title = clean_cdata(item.find('.//{http://base.google.com/ns/1.0}title').text)
-                link = clean_cdata(item.find('.//{http://base.google.com/ns/1.0}link').text)
-                price = clean_cdata(item.find('.//{http://base.google.com/ns/1.0}price').text)
-                description = parse_description(clean_cdata(item.find('.//{http://base.google.com/ns/1.0}description').text))
-                
-                # Boş değerleri kontrol et
-                if not title.strip() or not link.strip():
+                product_data = parse_item(item)
+                if product_data is None:
                     continue
                 
-                product_data = [
-                    gender,
-                    title,
-                    link,
-                    price,
-                    description
-                ]
-                
                 # Cinsiyete göre grupla
-                if 'erkek' in gender.lower():
-                    products_by_gender['erkek'].append(product_data)
-                elif 'kadın' in gender.lower() or 'kadin' in gender.lower():
-                    products_by_gender['kadın'].append(product_data)
-                elif 'unisex' in gender.lower() or 'üniseks' in gender.lower():
-                    products_by_gender['üniseks'].append(product_data)
-                else:
-                    products_by_gender['belirsiz'].append(product_data)
+                products_by_gender[classify_gender(product_data[0])].append(product_data)
                     
             except AttributeError as e:
                 print(f"Ürün verileri işlenirken hata oluştu: {e}")
@@ -114,20 +137,268 @@ def process_xml(xml_content):
         print(f"XML parse edilirken hata oluştu: {e}")
         return None
 
+def iter_products(stream):
+    """
+    XML akışını iterparse ile okur ve (cinsiyet grubu, ürün satırı) çiftlerini üretir.
+    İşlenen her <item> temizlendiği için bellek kullanımı feed boyutundan bağımsızdır;
+    ham alanlar PARSE_BATCH_SIZE ürünlük gruplar halinde sütun sütun normalize edilir.
+    """
+    # Açık elemanların yığını; ürün bittiğinde ataları da temizlenir
+    stack = []
+    batch = []
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            stack.append(elem)
+            continue
+        stack.pop()
+        if elem.tag != 'item':
+            continue
+        try:
+            batch.append(item_fields(elem))
+        except AttributeError as e:
+            print(f"Ürün verileri işlenirken hata oluştu: {e}")
+        # İşlenen ürünü ve ona referans tutan ataları (channel, rss) temizle
+        elem.clear()
+        for ancestor in stack:
+            ancestor.clear()
+        if len(batch) >= PARSE_BATCH_SIZE:
+            for product_data in parse_items(batch):
+                yield classify_gender(product_data[0]), product_data
+            batch = []
+    for product_data in parse_items(batch):
+        yield classify_gender(product_data[0]), product_data
+
+def fetch_xml_stream(url):
+    """URL'den XML'i akış olarak açar, gövde indirilirken okunabilir"""
+    try:
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        response = requests.get(url, headers=headers, stream=True)
+        response.raise_for_status()
+        response.raw.decode_content = True  # gzip/deflate aktarımını çöz
+        return response
+    except requests.RequestException as e:
+        print(f"XML verisi çekilirken hata oluştu: {e}")
+        return None
+
+# Akış okunurken bağlantı kopması ya da zaman aşımı (response.raw urllib3 hatası verir)
+STREAM_ERRORS = (urllib3.exceptions.HTTPError, requests.RequestException)
+
+class CsvSinks:
+    """
+    Cinsiyet başına açık kalan CSV yazıcıları. Dosyalar ilk ürün geldiğinde .tmp adıyla açılır,
+    satırlar geldikçe yazılır. Akış başarıyla biterse dosyalar tek adımda yerine konur; hata ile
+    çıkılan `with` bloğunda geçici dosyalar silinir ve önceki CSV'ler korunur.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.files = {}
+        self.writers = {}
+        self.counts = {}
+
+    def __enter__(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, gender, product_data):
+        writer = self.writers.get(gender)
+        if writer is None:
+            output_file = os.path.join(self.output_dir, f'sarar_{gender}_urunler.csv')
+            f = open(output_file + '.tmp', 'w', newline='', encoding='utf-8-sig')  # UTF-8 with BOM
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADERS)
+            self.files[gender] = f
+            self.writers[gender] = writer
+            self.counts[gender] = 0
+        writer.writerow(product_data)
+        self.counts[gender] += 1
+
+    def close(self):
+        for gender, f in self.files.items():
+            f.close()
+            output_file = f.name[:-len('.tmp')]
+            os.replace(f.name, output_file)
+            print(f"{gender.capitalize()} ürünleri için CSV dosyası oluşturuldu: {output_file}")
+            print(f"Toplam {self.counts[gender]} ürün kaydedildi.")
+        self.files.clear()
+        self.writers.clear()
+
+    def abort(self):
+        """Yarım kalan geçici dosyaları siler, mevcut CSV'lere dokunmaz"""
+        for f in self.files.values():
+            f.close()
+            os.remove(f.name)
+        self.files.clear()
+        self.writers.clear()
+
+def stream_to_csv(stream, output_dir, parquet_path=None, chunks_path=None, chunks_changed_only=False):
+    """
+    XML akışındaki ürünleri, tüm feed'i belleğe almadan cinsiyete göre CSV dosyalarına yazar.
+    parquet_path verilirse ürünler aynı geçişte tipli sütunlu dosyaya da yazılır (bkz. product_columns.py),
+    chunks_path verilirse token sınırlı parçalara bölünüp JSONL'e yazılır (bkz. chunker.py).
+    XML hatalıysa, akış yarıda kesilirse ya da Parquet yazılamazsa önceki CSV dosyaları korunur.
+    Returns: cinsiyet başına yazılan ürün sayıları, XML hatalıysa, bağlantı koptuysa ya da Parquet
+             yazılamadıysa None
+    """
+    try:
+        with contextlib.ExitStack() as stack:
+            csv_sinks = stack.enter_context(CsvSinks(output_dir))
+            sinks = [csv_sinks]
+            if parquet_path:
+                sinks.append(stack.enter_context(ParquetSink(parquet_path)))
+            chunks = None
+            if chunks_path:
+                chunks = stack.enter_context(ChunkWriter(chunks_path, changed_only=chunks_changed_only))
+                sinks.append(chunks)
+            for gender, product_data in iter_products(stream):
+                for sink in sinks:
+                    sink.write(gender, product_data)
+        if chunks is not None:
+            print(f"Ürün parçaları yazıldı ({chunks_path}): {chunks.counts}")
+        return dict(csv_sinks.counts)
+    except ET.ParseError as e:
+        print(f"XML parse edilirken hata oluştu: {e}")
+        return None
+    except STREAM_ERRORS as e:
+        print(f"XML akışı okunurken bağlantı hatası oluştu: {e}")
+        return None
+    except product_columns.ARROW_ERRORS as e:
+        print(f"Sütunlu ürün dosyası yazılırken hata oluştu: {e}")
+        return None
+
+# Artımlı modda delta dosyalarının ilk sütunu
+DELTA_HEADERS = ['Değişiklik'] + CSV_HEADERS
+ADDED, CHANGED, REMOVED = 'eklendi', 'değişti', 'silindi'
+GROUPS = ('erkek', 'kadın', 'üniseks', 'belirsiz')
+
+def compute_delta(products, previous):
+    """
+    Ürünleri önceki durumla karşılaştırır. products (cinsiyet grubu, satır) çiftleri üretir,
+    previous FeedState.load() çıktısıdır. Aynı anahtarın feed'deki ilk kaydı kullanılır.
+    Grubu değişen ürün eski grupta silindi, yeni grupta eklendi olarak işaretlenir.
+    Returns: ({grup: [(değişiklik, satır)]}, [(anahtar, özet, grup)] güncellemeleri, silinen anahtarlar)
+    """
+    changes = {group: [] for group in GROUPS}
+    upserts = []
+    seen = set()
+    for gender, product_data in products:
+        key = product_key(product_data[2])
+        if key in seen:
+            continue
+        seen.add(key)
+        digest = product_hash(product_data)
+        old = previous.get(key)
+        if old is None:
+            changes[gender].append((ADDED, product_data))
+        elif old[0] == digest and old[1] == gender:
+            continue
+        elif old[1] != gender:
+            changes[old[1]].append((REMOVED, ['', '', key, '', '']))
+            changes[gender].append((ADDED, product_data))
+        else:
+            changes[gender].append((CHANGED, product_data))
+        upserts.append((key, digest, gender))
+    
+    deletes = [key for key in previous if key not in seen]
+    for key in deletes:
+        changes[previous[key][1]].append((REMOVED, ['', '', key, '', '']))
+    return changes, upserts, deletes
+
+def _replace_csv(path, headers, rows):
+    """CSV dosyasını geçici dosyaya yazıp tek adımda yerine koyar"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', newline='', encoding='utf-8-sig') as f:  # UTF-8 with BOM
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+
+def write_delta(changes, output_dir):
+    """
+    Her grup için sarar_{grup}_urunler_delta.csv yazar. Değişiklik olmayan gruplarda dosya yalnızca
+    başlık içerir, böylece önceki çalışmanın delta'sı yanlışlıkla yeniden uygulanmaz.
+    """
+    for group in GROUPS:
+        output_file = os.path.join(output_dir, f'sarar_{group}_urunler_delta.csv')
+        _replace_csv(output_file, DELTA_HEADERS, ([change] + row for change, row in changes[group]))
+
+def update_snapshots(changes, output_dir):
+    """Tam CSV'lere yalnızca değişen grupların satırlarını uygular, diğer dosyalara dokunmaz"""
+    for group in GROUPS:
+        if not changes[group]:
+            continue
+        output_file = os.path.join(output_dir, f'sarar_{group}_urunler.csv')
+        rows = {}
+        if os.path.exists(output_file):
+            with open(output_file, newline='', encoding='utf-8-sig') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                for row in reader:
+                    rows.setdefault(product_key(row[2]), row)
+        for change, row in changes[group]:
+            key = product_key(row[2])
+            if change == REMOVED:
+                rows.pop(key, None)
+            else:
+                # Değişen ürün dosyadaki yerinde güncellenir, yeni ürün sona eklenir
+                rows[key] = row
+        _replace_csv(output_file, CSV_HEADERS, rows.values())
+
+def stream_to_delta(stream, output_dir, state_path=None, update_full=False):
+    """
+    Artımlı mod: feed'i önceki çalışmanın durumuyla karşılaştırır ve yalnızca eklenen, değişen ve
+    silinen ürünleri delta dosyalarına yazar. update_full=True ise tam CSV'ler de yerinde güncellenir.
+    Durum, dosyalar yazıldıktan sonra kaydedilir; yarıda kalan çalışma tekrarlandığında aynı delta üretilir.
+    Returns: değişiklik türü başına sayılar, XML hatalıysa ya da bağlantı koptuysa None
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    state = FeedState(state_path or os.path.join(output_dir, 'sarar_urun_durum.db'))
+    try:
+        try:
+            changes, upserts, deletes = compute_delta(iter_products(stream), state.load())
+        except ET.ParseError as e:
+            # Feed yarım geldiyse görülmeyen ürünler silinmiş sayılmasın
+            print(f"XML parse edilirken hata oluştu: {e}")
+            return None
+        except STREAM_ERRORS as e:
+            print(f"XML akışı okunurken bağlantı hatası oluştu: {e}")
+            return None
+        
+        write_delta(changes, output_dir)
+        if update_full:
+            update_snapshots(changes, output_dir)
+        state.apply(upserts, deletes)
+        
+        counts = {ADDED: 0, CHANGED: 0, REMOVED: 0}
+        for group in GROUPS:
+            for change, _ in changes[group]:
+                counts[change] += 1
+        # Grup değişiklikleri silindi + eklendi olarak iki kez sayılır
+        print(f"Delta: {counts[ADDED]} eklendi, {counts[CHANGED]} değişti, {counts[REMOVED]} silindi")
+        return counts
+    finally:
+        state.close()
+
 def save_to_csv(products, output_dir):
     """Ürünleri CSV dosyalarına kaydeder"""
     try:
         os.makedirs(output_dir, exist_ok=True)
         
-        headers = ['Cinsiyet', 'Ürün Adı', 'Ürün Satın Alma Linki', 'Ürün Fiyatı', 'Ürün Açıklaması']
-        
         for gender, products_list in products.items():
             if products_list:
                 output_file = os.path.join(output_dir, f'sarar_{gender}_urunler.csv')
                 
                 with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:  # UTF-8 with BOM
                     writer = csv.writer(f)
-                    writer.writerow(headers)
+                    writer.writerow(CSV_HEADERS)
                     writer.writerows(products_list)
                 print(f"{gender.capitalize()} ürünleri için CSV dosyası oluşturuldu: {output_file}")
                 print(f"Toplam {len(products_list)} ürün kaydedildi.")
@@ -135,20 +406,78 @@ def save_to_csv(products, output_dir):
     except Exception as e:
         print(f"CSV dosyası kaydedilirken hata oluştu: {e}")
 
+def update_search_index(index_path, output_dir, from_delta=False):
+    """
+    Ürün arama indeksini günceller. from_delta=True ise yalnızca delta dosyalarındaki
+    eklenen/değişen/silinen ürünler işlenir, aksi halde tam CSV'lerle eşitlenir.
+    """
+    with SearchIndex(index_path) as index:
+        if from_delta:
+            upserts, removed = read_product_deltas(output_dir)
+            counts = index.update(PRODUCT, upserts, removed)
+        else:
+            counts = index.sync(PRODUCT, iter_product_csvs(output_dir))
+    print(f"Arama indeksi güncellendi ({index_path}): {counts}")
+    return counts
+
+def update_chunks(chunks_path, output_dir, changed_only=False):
+    """Tam CSV'lerdeki ürünleri parçalar; metni değişmeyen ürünler önbellekten gelir"""
+    with ChunkWriter(chunks_path, changed_only=changed_only) as chunks:
+        counts = chunk_product_csvs(output_dir, chunks)
+    print(f"Ürün parçaları yazıldı ({chunks_path}): {counts}")
+    return counts
+
 def main():
-    xml_url = "https://sarar.com/connectprof/tdlb6h1c_yapayzeka"
-    output_dir = r"C:\sarar_urun2"
+    parser = argparse.ArgumentParser(description="Sarar ürün feed'ini cinsiyete göre CSV dosyalarına ayırır")
+    parser.add_argument("--url", default="https://sarar.com/connectprof/tdlb6h1c_yapayzeka",
+                        help="Ürün feed'inin URL'si")
+    parser.add_argument("--output-dir", default=r"C:\sarar_urun2", help="CSV dosyalarının yazılacağı dizin")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Yalnızca eklenen/değişen/silinen ürünleri delta dosyalarına yaz")
+    parser.add_argument("--update-snapshots", action="store_true",
+                        help="Artımlı modda tam CSV dosyalarını da yerinde güncelle")
+    parser.add_argument("--state", default=None,
+                        help="Artımlı mod durum dosyası (varsayılan: çıktı dizininde sarar_urun_durum.db)")
+    parser.add_argument("--index", default=None,
+                        help="Ürünlerin eklendiği arama indeksi dizini (bkz. search_index.py)")
+    parser.add_argument("--parquet", action="store_true",
+                        help=f"Ürünleri tipli sütunlu {PARQUET_FILE} dosyasına da yaz (pyarrow gerekir)")
+    parser.add_argument("--chunks", default=None,
+                        help="Ürünlerin token sınırlı parçalarının yazılacağı JSONL (bkz. chunker.py)")
+    parser.add_argument("--chunks-changed-only", action="store_true",
+                        help="Parça dosyasına yalnızca eklenen/değişen ürünleri ve silinenleri yaz")
+    args = parser.parse_args()
+    xml_url = args.url
+    output_dir = args.output_dir
+    parquet_path = os.path.join(output_dir, PARQUET_FILE) if args.parquet else None
+    if parquet_path and not product_columns.AVAILABLE:
+        print("--parquet için pyarrow gerekli: pip install pyarrow")
+        return
+    if (parquet_path or args.chunks) and args.incremental and not args.update_snapshots:
+        print("--parquet ve --chunks artımlı modda tam CSV'lerden üretilir, --update-snapshots ile birlikte kullanın.")
+        return
     
     print("XML verisi çekiliyor...")
-    xml_content = fetch_xml_content(xml_url)
+    response = fetch_xml_stream(xml_url)
     
-    if xml_content:
-        print("XML verisi başarıyla çekildi, işleniyor...")
-        products = process_xml(xml_content)
+    if response is not None:
+        with response:
+            if args.incremental:
+                print("XML akışı açıldı, ürünler önceki çalışmayla karşılaştırılıyor...")
+                counts = stream_to_delta(response.raw, output_dir, state_path=args.state,
+                                         update_full=args.update_snapshots)
+            else:
+                print("XML akışı açıldı, ürünler geldikçe CSV dosyalarına yazılıyor...")
+                counts = stream_to_csv(response.raw, output_dir, parquet_path=parquet_path,
+                                       chunks_path=args.chunks, chunks_changed_only=args.chunks_changed_only)
         
-        if products:
-            print("Veriler işlendi, CSV dosyaları oluşturuluyor...")
-            save_to_csv(products, output_dir)
+        if counts is not None:
+            if parquet_path and args.incremental:
+                write_from_csvs(output_dir, parquet_path)
+            if args.chunks and args.incremental:
+                update_chunks(args.chunks, output_dir, changed_only=args.chunks_changed_only)
+            if args.index:
+                update_search_index(args.index, output_dir, from_delta=args.incremental)
             print(f"\nİşlem tamamlandı! Tüm dosyalar şu dizine kaydedildi: {output_dir}")
         else:
             print("Veriler işlenemedi!")
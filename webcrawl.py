@@ -1,25 +1,126 @@
 import requests
-from bs4 import BeautifulSoup
-import xml.etree.ElementTree as ET
 from urllib.parse import urljoin
 import time
 import logging
 from pathlib import Path
 import concurrent.futures
-import re
+import queue
+import threading
+
+import argparse
+import os
+from datetime import datetime
+
+from fetch_cache import FetchCache, content_hash
+from frontier import Frontier, WRITTEN, FAILED, SKIPPED
+from sitemap import iter_sitemap
+from extractors import BACKENDS, extract_page
+from sink import FORMATS, OutputWriter, format_jsonl, make_record
+from dedup import ACTIONS as DEDUP_ACTIONS, Deduplicator
+from metrics import Metrics, MetricsReporter
+from fetch_control import RETRY_STATUSES, AIMDController, RetryPolicy, ThreadGate, parse_retry_after
+
+class RateLimiter:
+    """
+    Thread'ler arasında paylaşılan, ardışık istekler arasında en az `interval` saniye bırakan sınırlayıcı.
+    Sunucu zorlandığında (slow_down) aralık iki katına çıkar, sağlıklı yanıtlarla (speed_up)
+    yeniden başlangıç değerine iner.
+    """
+
+    def __init__(self, interval, max_interval=10.0):
+        self.base_interval = interval
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def slow_down(self):
+        with self._lock:
+            self.interval = min(self.max_interval, max(self.interval * 2, 0.05))
+
+    def speed_up(self):
+        with self._lock:
+            if self.interval > self.base_interval:
+                self.interval = max(self.base_interval, self.interval * 0.9)
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+def _timed_extract(html, backend):
+    """Ayrıştırma süreçlerinde çalışır, süreyi de döndürür. Returns: ((başlık, metin) ya da None, saniye)"""
+    start = time.perf_counter()
+    page = extract_page(html, backend)
+    return page, time.perf_counter() - start
 
 class SitemapCrawler:
-    def __init__(self, sitemap_url, output_file="crawled_content.txt", max_workers=5, delay=1):
+    def __init__(self, sitemap_url, output_file="crawled_content.txt", max_workers=5, delay=1,
+                 use_cache=True, cache_path=None, frontier_path=None, checkpoint_every=50,
+                 extractor='soup', parse_workers=None, queue_size=None, output_format='text', ordered=False,
+                 dedup=None, dedup_threshold=0.95, dedup_path=None, log_urls=False,
+                 metrics_path=None, metrics_interval=None, max_concurrency=None, max_retries=3, timeout=30):
+        if extractor not in BACKENDS:
+            raise ValueError(f"Bilinmeyen extractor: {extractor} (seçenekler: {', '.join(BACKENDS)})")
+        if output_format not in FORMATS:
+            raise ValueError(f"Bilinmeyen çıktı biçimi: {output_format} (seçenekler: {', '.join(FORMATS)})")
+        if dedup is not None and dedup not in DEDUP_ACTIONS:
+            raise ValueError(f"Bilinmeyen dedup işlemi: {dedup} (seçenekler: {', '.join(DEDUP_ACTIONS)})")
+        # Çıktı biçimi ('text' ya da 'jsonl') ve kayıtların sitemap sırasıyla yazılıp yazılmayacağı
+        self.output_format = output_format
+        self.ordered = ordered
         self.sitemap_url = sitemap_url
+        # İçerik çıkarma backend'i: 'soup' (tam ağaç) ya da 'lxml' (hızlı, yalnızca hedef alt ağaç)
+        self.extractor = extractor
         self.output_file = output_file
+        # max_workers: I/O (çekim) thread sayısı, parse_workers: ayrıştırma süreç sayısı.
+        # delay tüm çekim thread'leri için ortak olduğundan istek hızı worker sayısından bağımsızdır.
         self.max_workers = max_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = queue_size or self.parse_workers * 4
         self.delay = delay
+        self.rate_limiter = RateLimiter(delay)
+        self.timeout = timeout
+        # max_concurrency verilirse eşzamanlı istek sayısı max_workers'tan başlayıp AIMD ile bu değere kadar artar
+        self.max_concurrency = max(max_workers, max_concurrency or max_workers)
+        self.retry_policy = RetryPolicy(max_retries=max_retries)
+        self._local = threading.local()
+        # Sitemap'teki <lastmod> değerleri ve önceki çalışmalardan kalan URL önbelleği
+        self.sitemap_lastmod = {}
+        self.cache = None
+        if use_cache:
+            self.cache = FetchCache(cache_path or str(Path(output_file).with_suffix('.cache.db')))
+        # URL durumlarını tutan kalıcı frontier, yarıda kalan taramaların devamı için
+        self.frontier = Frontier(frontier_path or str(Path(output_file).with_suffix('.frontier.db')),
+                                 batch_size=checkpoint_every)
+        # Yakın kopya tespiti: 'drop' kopyaları yazmaz, 'tag' duplicate_of alanıyla işaretler
+        self.dedup_action = dedup
+        self.dedup = None
+        if dedup:
+            self.dedup = Deduplicator(dedup_path or str(Path(output_file).with_suffix('.dedup.db')),
+                                      threshold=dedup_threshold)
+        # Aşama süreleri, durum kodları ve kuyruk derinlikleri; metrics_path verilirse dosyaya yazılır
+        self.metrics = Metrics()
+        self.metrics_path = metrics_path
+        self.metrics_interval = metrics_interval
+        # URL başına log satırları (DEBUG) isteğe bağlıdır
+        self.log_urls = log_urls
+        self.controller = AIMDController(
+            initial=max_workers,
+            min_limit=1 if self.max_concurrency > max_workers else max_workers,
+            max_limit=self.max_concurrency,
+            metrics=self.metrics,
+        )
+        self.gate = ThreadGate(self.controller)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
         logging.basicConfig(
-            level=logging.INFO,
+            level=logging.DEBUG if log_urls else logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.FileHandler('crawler.log'),
@@ -28,24 +129,21 @@ class SitemapCrawler:
         )
         self.logger = logging.getLogger(__name__)
 
+    def iter_urls_from_sitemap(self, sitemap_url=None):
+        """Sitemap'i akış halinde okur, (url, lastmod) çiftlerini ayrıştırıldıkça üretir"""
+        # Eğer sitemap_url parametresi verilmemişse, sınıfın kendi sitemap_url'ini kullan
+        current_sitemap = sitemap_url or self.sitemap_url
+        return iter_sitemap(current_sitemap, headers=self.headers, verify=False, logger=self.logger)
+
     def get_urls_from_sitemap(self, sitemap_url=None):
         """Sitemap'ten URL'leri çeker"""
         try:
-            # Eğer sitemap_url parametresi verilmemişse, sınıfın kendi sitemap_url'ini kullan
-            current_sitemap = sitemap_url or self.sitemap_url
-            
-            response = requests.get(current_sitemap, headers=self.headers, verify=False)
-            response.raise_for_status()
-            
-            # XML içeriğini temizle ve parse et
-            content = response.content.decode('utf-8')
-            content = re.sub(r'xmlns="[^"]+"', '', content)  # namespace'leri kaldır
-            root = ET.fromstring(content)
-            
             urls = []
-            # URL'leri topla
-            for url in root.findall('.//loc'):
-                urls.append(url.text)
+            # URL'leri ve varsa lastmod değerlerini topla
+            for loc, lastmod in self.iter_urls_from_sitemap(sitemap_url):
+                urls.append(loc)
+                if lastmod:
+                    self.sitemap_lastmod[loc] = lastmod
             
             return urls
             
@@ -53,106 +151,390 @@ class SitemapCrawler:
             self.logger.error(f"Sitemap çekilirken hata: {str(e)}")
             return []
 
-    def extract_content(self, url):
-        """Verilen URL'den içeriği çeker"""
+    def _session(self):
+        """Her çekim thread'i kendi keep-alive oturumunu kullanır"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.verify = False
+            self._local.session = session
+        return session
+
+    def _get(self, url, headers=None):
+        """
+        GET isteği atar; 429/5xx ve ağ hatalarında üstel bekleme + jitter ile yeniden dener.
+        Retry-After başlığı tüm çekim thread'lerini o süre bekletir. Sonuçlar AIMD sınırını ve hız
+        sınırlayıcıyı besler. Son denemenin yanıtını döndürür ya da ağ hatasını yükseltir.
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.wait()
+            with self.gate:
+                start = time.perf_counter()
+                try:
+                    response, error = self._session().get(url, headers=headers, timeout=self.timeout), None
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    response, error = None, e
+                latency = time.perf_counter() - start
+
+            status = response.status_code if response is not None else None
+            if response is not None:
+                # requests bağlantı/DNS süresini ayrıca vermez; elapsed istek gönderiminden başlıkların gelişine kadardır
+                self.metrics.observe('fetch_ttfb_seconds', response.elapsed.total_seconds())
+                self.metrics.observe('fetch_download_seconds', max(0.0, latency - response.elapsed.total_seconds()))
+                self.metrics.inc('http_responses_total', status=status)
+                self.metrics.inc('bytes_received_total', len(response.content))
+            throttled = status is None or status in RETRY_STATUSES
+            self.controller.record(latency, throttled)
+            if not throttled:
+                self.rate_limiter.speed_up()
+                return response
+            self.rate_limiter.slow_down()
+
+            if error is not None:
+                self.metrics.inc('fetch_errors_total', error=type(error).__name__)
+            if not self.retry_policy.should_retry(attempt, status):
+                if error is not None:
+                    raise error
+                return response
+
+            retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+            if retry_after is not None:
+                self.controller.pause(min(retry_after, self.retry_policy.max_delay))
+            delay = self.retry_policy.delay(attempt, retry_after)
+            self.metrics.inc('retries_total', reason=status or 'error')
+            self.logger.warning(f"{url}: {status or error}, {delay:.1f} sn sonra yeniden denenecek "
+                                f"({attempt + 1}/{self.retry_policy.max_retries})")
+            time.sleep(delay)
+            attempt += 1
+
+    def fetch_page(self, url, lastmod=None):
+        """
+        URL'yi önbelleği dikkate alarak çeker, ayrıştırma yapmaz.
+        Returns: ('done', içerik sözlüğü ya da None) önbellekten karşılandıysa,
+                 ('parse', yanıt bilgisi) ham gövdenin ayrıştırılması gerekiyorsa
+        """
         try:
-            time.sleep(self.delay)
-            response = requests.get(url, headers=self.headers, verify=False)
+            lastmod = lastmod or self.sitemap_lastmod.get(url)
+            entry = None
+            if self.cache is not None:
+                fresh = self.cache.is_fresh(url, lastmod)
+                if fresh:
+                    # Sitemap lastmod değişmemiş, istek atmadan önceki çıkarımı kullan
+                    self.metrics.inc('cache_hits_total', kind='lastmod')
+                    return 'done', self._cached_content(url, fresh, fresh['fetched_at'])
+                entry = self.cache.get(url)
+
+            response = self._get(url, headers=FetchCache.conditional_headers(entry))
+            fetched_at = datetime.now().isoformat(timespec='seconds')
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Blog içeriğini özel olarak bul
-            content = soup.find('div', class_='blog-single-content')
-            
-            if not content:
-                content = soup.find('div', class_='content')
-            
-            if content:
-                # Paragrafları ve başlıkları topla
-                text_elements = []
-                
-                # Başlık bilgisini al
-                title = soup.find('h1')
-                if title:
-                    text_elements.append(title.get_text(strip=True))
-                
-                # İçerik elementlerini topla
-                for element in content.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                    text = element.get_text(strip=True)
-                    if text:  # Boş olmayan metinleri ekle
-                        text_elements.append(text)
-                
-                # Tüm metinleri birleştir
-                text = '\n\n'.join(text_elements)
-                
-                return {
-                    'url': url,
-                    'content': text
-                }
-            else:
-                self.logger.warning(f"İçerik bulunamadı: {url}")
-                return None
+
+            if response.status_code == 304 and entry:
+                self.metrics.inc('cache_hits_total', kind='not_modified')
+                self.cache.touch(url, lastmod)
+                return 'done', self._cached_content(url, entry, fetched_at)
+
+            body_hash = content_hash(response.content)
+            page = {
+                'url': url,
+                'body': response.content,
+                'lastmod': lastmod,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'content_hash': body_hash,
+                'fetched_at': fetched_at,
+            }
+            if entry and entry['content_hash'] == body_hash and entry['content'] is not None:
+                # Gövde değişmemiş, yeniden ayrıştırmaya gerek yok
+                return 'done', self.store_parsed(page, entry['content'], entry['title'])
+            return 'parse', page
             
         except Exception as e:
             self.logger.error(f"URL işlenirken hata ({url}): {str(e)}")
+            return 'done', None
+
+    @staticmethod
+    def _cached_content(url, entry, fetched_at):
+        """Önbellek kaydından içerik sözlüğü üretir, içerik yoksa None"""
+        if not entry['content']:
             return None
+        return {'url': url, 'title': entry['title'], 'content': entry['content'], 'fetched_at': fetched_at}
 
-    def save_content(self, content_dict):
-        """İçeriği dosyaya kaydeder"""
-        if not content_dict:
-            return
-            
+    def store_parsed(self, page, text, title=None):
+        """Ayrıştırma sonucunu önbelleğe yazar ve içerik sözlüğünü döndürür"""
+        if self.cache is not None:
+            self.cache.put(
+                page['url'],
+                lastmod=page['lastmod'],
+                etag=page['etag'],
+                last_modified=page['last_modified'],
+                content_hash=page['content_hash'],
+                title=title,
+                content=text,
+                fetched_at=page['fetched_at'],
+            )
+        if text is None:
+            return None
+        return {
+            'url': page['url'],
+            'title': title,
+            'content': text,
+            'fetched_at': page['fetched_at'],
+        }
+
+    def extract_content(self, url):
+        """Verilen URL'den içeriği çeker ve aynı thread'de ayrıştırır"""
+        kind, result = self.fetch_page(url)
+        if kind == 'done':
+            return result
         try:
-            with open(self.output_file, 'a', encoding='utf-8') as f:
-                f.write(f"\n\n{'='*80}\n")
-                f.write(f"URL: {content_dict['url']}\n")
-                f.write(f"{'='*80}\n\n")
-                f.write(content_dict['content'])
-                
+            title, text = self.parse_content(result['body'], url) or (None, None)
+            return self.store_parsed(result, text, title)
         except Exception as e:
-            self.logger.error(f"İçerik kaydedilirken hata: {str(e)}")
+            self.logger.error(f"URL işlenirken hata ({url}): {str(e)}")
+            return None
+
+    def parse_content(self, html, url):
+        """HTML'den blog içeriğini çıkarır. Returns: (başlık, metin), içerik bulunamazsa None"""
+        page = extract_page(html, backend=self.extractor)
+        if page is None:
+            self.logger.warning(f"İçerik bulunamadı: {url}")
+        return page
+
+    def format_record(self, record):
+        """Kaydı metin çıktı biçimine çevirir"""
+        return f"\n\n{'='*80}\nURL: {record['url']}\n{'='*80}\n\n{record['content']}"
+
+    def _on_written(self, records):
+        """Yazıcı thread'inde, toplu yazımdan sonra frontier durumlarını günceller"""
+        checkpoint_due = False
+        for record in records:
+            if record['content'] is not None:
+                checkpoint_due |= self.frontier.mark(record['url'], WRITTEN)
+                self.metrics.inc('pages_total', state=WRITTEN)
+            elif record.get('duplicate_of'):
+                checkpoint_due |= self.frontier.mark(record['url'], SKIPPED, f"kopya: {record['duplicate_of']}")
+                self.metrics.inc('pages_total', state=SKIPPED)
+            else:
+                checkpoint_due |= self.frontier.mark(record['url'], FAILED, "içerik alınamadı")
+                self.metrics.inc('pages_total', state=FAILED)
+        return checkpoint_due
+
+    def _url_source(self, resume):
+        """
+        Taranacak (url, lastmod) çiftlerini üretir.
+        Devam modunda önce frontier'da yarım kalan URL'ler, ardından sitemap'ten gelen yeni URL'ler verilir.
+        """
+        if resume:
+            # Sitemap'ten gelen lastmod frontier'da saklanır; devam eden URL'ler de lastmod atlamasından yararlanır
+            yield from self.frontier.remaining()
+        batch = {}
+        for loc, lastmod in self.iter_urls_from_sitemap():
+            batch[loc] = lastmod
+            if len(batch) >= 500:
+                for url in self.frontier.add(batch):
+                    yield url, batch[url]
+                batch = {}
+        for url in self.frontier.add(batch):
+            yield url, batch[url]
 
-    def crawl(self):
-        """Ana crawling işlemini başlatır"""
+    def _dedup_record(self, url, content_dict):
+        """Yakın kopyaları atar ya da işaretler"""
+        content, title, fetched_at = content_dict['content'], content_dict['title'], content_dict['fetched_at']
+        with self.metrics.time('dedup_seconds'):
+            match = self.dedup.check(url, content)
+        if match is None:
+            return make_record(url, content, title, fetched_at)
+        self.metrics.inc('duplicates_total', action=self.dedup_action)
+        duplicate_of, similarity = match
+        self.logger.debug(f"Yakın kopya ({similarity:.2f}) {url} -> {duplicate_of}")
+        if self.dedup_action == 'drop':
+            return make_record(url, None, title, fetched_at, duplicate_of=duplicate_of)
+        return make_record(url, content, title, fetched_at, duplicate_of=duplicate_of,
+                           similarity=round(similarity, 4))
+
+    def _record(self, writer, seq, url, content_dict, index):
+        """Bir URL'nin sonucunu yazıcıya gönderir"""
+        if not content_dict:
+            record = make_record(url, None)
+        elif self.dedup is None:
+            record = make_record(url, content_dict['content'], content_dict['title'], content_dict['fetched_at'])
+        else:
+            record = self._dedup_record(url, content_dict)
+        writer.put(seq, record)
+        self.logger.debug(f"İşlenen URL ({index}): {url}")
+        if index % 100 == 0:
+            self.logger.info(f"İşlenen URL sayısı: {index}")
+
+    def crawl(self, resume=False):
+        """
+        Ana crawling işlemini başlatır.
+        Çekim thread'leri ham sayfaları sınırlı bir kuyruğa koyar, ayrıştırma süreç havuzunda yapılır.
+        Kuyruk dolduğunda çekim bekler; böylece ayrıştırma çekirdek sayısıyla ölçeklenirken istek hızı sabit kalır.
+        resume=True ise önceki çalışmanın frontier'ından devam eder ve çıktıyı silmez.
+        """
         self.logger.info(f"Crawling başlatılıyor: {self.sitemap_url}")
         
-        # Önceki çıktı dosyasını temizle
-        Path(self.output_file).unlink(missing_ok=True)
+        if resume and self.frontier.get_meta('sitemap_url') not in (None, self.sitemap_url):
+            self.logger.warning("Frontier farklı bir sitemap'e ait, tarama baştan başlatılıyor")
+            resume = False
         
-        # Sitemap'ten URL'leri al
-        urls = self.get_urls_from_sitemap()
+        if resume:
+            # Son checkpoint'ten sonra yazılmış yarım kayıtları at
+            offset = self.frontier.output_offset()
+            if offset is not None and os.path.exists(self.output_file):
+                os.truncate(self.output_file, offset)
+        else:
+            # Önceki çıktı dosyasını ve frontier'ı temizle
+            Path(self.output_file).unlink(missing_ok=True)
+            self.frontier.reset()
+            self.frontier.set_meta('sitemap_url', self.sitemap_url)
         
-        if not urls:
-            self.logger.error("Sitemap'ten URL alınamadı!")
-            return
-            
-        total_urls = len(urls)
-        self.logger.info(f"Toplam {total_urls} URL bulundu")
+        writer = OutputWriter(
+            self.output_file,
+            formatter=format_jsonl if self.output_format == 'jsonl' else self.format_record,
+            mode='a',
+            ordered=self.ordered,
+            on_written=self._on_written,
+            on_checkpoint=lambda offset: self.frontier.checkpoint(output_offset=offset),
+            logger=self.logger,
+            metrics=self.metrics,
+        )
         
-        # Paralel işleme
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_url = {executor.submit(self.extract_content, url): url for url in urls}
-            
-            for i, future in enumerate(concurrent.futures.as_completed(future_to_url), 1):
-                url = future_to_url[future]
+        url_queue = queue.Queue(maxsize=self.queue_size)
+        page_queue = queue.Queue(maxsize=self.queue_size)
+        
+        def feeder():
+            # Sitemap'ten URL'ler ayrıştırıldıkça çekim kuyruğuna girer
+            try:
+                # Sıra numarası, sıralı yazımda sitemap sırasını korumak için taşınır
+                for seq, (url, lastmod) in enumerate(self._url_source(resume)):
+                    url_queue.put((seq, url, lastmod))
+            except Exception as e:
+                self.logger.error(f"Sitemap çekilirken hata: {str(e)}")
+            finally:
+                for _ in range(self.max_concurrency):
+                    url_queue.put(None)
+        
+        def fetcher():
+            while True:
+                item = url_queue.get()
+                if item is None:
+                    page_queue.put(None)
+                    return
+                seq, url, lastmod = item
+                self.metrics.gauge('queue_depth', url_queue.qsize(), queue='urls')
+                page_queue.put((seq, url, self.fetch_page(url, lastmod)))
+        
+        threads = [threading.Thread(target=feeder, daemon=True)]
+        # Thread sayısı üst sınır kadardır; aynı anda kaç isteğin uçuşta olacağını AIMD kapısı belirler
+        threads += [threading.Thread(target=fetcher, daemon=True) for _ in range(self.max_concurrency)]
+        for thread in threads:
+            thread.start()
+        
+        processed = 0
+        finished_fetchers = 0
+        # Havuzda aynı anda bekleyen ayrıştırma işi sınırı
+        max_in_flight = self.parse_workers * 2
+        in_flight = {}
+        
+        reporter = MetricsReporter(self.metrics, self.metrics_path, self.metrics_interval)
+        with reporter, writer, concurrent.futures.ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+            while finished_fetchers < self.max_concurrency or in_flight:
+                # Tamamlanan ayrıştırmaları işle
+                for future in [f for f in in_flight if f.done()]:
+                    seq, page = in_flight.pop(future)
+                    try:
+                        extracted, seconds = future.result()
+                        self.metrics.observe('parse_seconds', seconds)
+                        if extracted is None:
+                            self.logger.warning(f"İçerik bulunamadı: {page['url']}")
+                        title, text = extracted or (None, None)
+                        content_dict = self.store_parsed(page, text, title)
+                    except Exception as e:
+                        self.logger.error(f"URL işlenirken hata ({page['url']}): {str(e)}")
+                        content_dict = None
+                    processed += 1
+                    self._record(writer, seq, page['url'], content_dict, processed)
+                
+                if finished_fetchers >= self.max_concurrency or len(in_flight) >= max_in_flight:
+                    # Ayrıştırıcılar dolu: kuyruk dolar ve çekim thread'leri bekler
+                    concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                    continue
+                
                 try:
-                    content_dict = future.result()
-                    if content_dict:
-                        self.save_content(content_dict)
-                    self.logger.info(f"İşlenen URL ({i}/{total_urls}): {url}")
-                except Exception as e:
-                    self.logger.error(f"URL işlenirken hata ({url}): {str(e)}")
+                    item = page_queue.get(timeout=0.05 if in_flight else None)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    finished_fetchers += 1
+                    continue
+                
+                seq, url, (kind, result) = item
+                self.metrics.gauge('queue_depth', page_queue.qsize(), queue='pages')
+                if kind == 'parse':
+                    future = pool.submit(_timed_extract, result['body'], self.extractor)
+                    in_flight[future] = (seq, result)
+                    self.metrics.gauge('queue_depth', len(in_flight), queue='parse_in_flight')
+                else:
+                    processed += 1
+                    self._record(writer, seq, url, result, processed)
+        
+        if processed == 0:
+            self.logger.error("Sitemap'ten URL alınamadı!" if not resume else "Devam edilecek URL kalmadı")
+        else:
+            self.logger.info(f"Toplam {processed} URL işlendi")
+        for line in self.metrics.summary():
+            self.logger.info(line)
 
 def main():
+    parser = argparse.ArgumentParser(description="Sarar blog sitemap crawler")
+    parser.add_argument("--resume", action="store_true",
+                        help="Yarıda kalan taramaya devam et, çıktıyı silmeden ekle")
+    parser.add_argument("--extractor", choices=BACKENDS, default='soup',
+                        help="İçerik çıkarma backend'i (lxml daha hızlıdır)")
+    parser.add_argument("--parse-workers", type=int, default=None,
+                        help="Ayrıştırma süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--format", choices=FORMATS, default='text', dest='output_format',
+                        help="Çıktı biçimi: metin ya da JSONL (url, title, content, fetched_at, content_hash)")
+    parser.add_argument("--ordered", action="store_true",
+                        help="Kayıtları tamamlanma sırası yerine sitemap sırasıyla yaz")
+    parser.add_argument("--dedup", choices=DEDUP_ACTIONS, default=None,
+                        help="Yakın kopyaları at (drop) ya da işaretle (tag)")
+    parser.add_argument("--dedup-threshold", type=float, default=0.95,
+                        help="Yakın kopya benzerlik eşiği (0-1, varsayılan 0.95)")
+    parser.add_argument("--max-concurrency", type=int, default=None,
+                        help="Sunucu sağlıklı yanıt verdikçe eşzamanlılığın çıkabileceği üst sınır (AIMD)")
+    parser.add_argument("--retries", type=int, default=3,
+                        help="429/5xx ve ağ hatalarında en fazla yeniden deneme sayısı")
+    parser.add_argument("--log-urls", action="store_true",
+                        help="URL başına log satırlarını (DEBUG) aç")
+    parser.add_argument("--metrics", dest="metrics_path", default=None,
+                        help="Metriklerin yazılacağı dosya (.prom: Prometheus metin biçimi, diğerleri: JSON)")
+    parser.add_argument("--metrics-interval", type=float, default=None,
+                        help="Metrik dosyasını tarama sırasında kaç saniyede bir güncelleyeceği")
+    args = parser.parse_args()
+
     sitemap_url = "https://blog.sarar.com/post-sitemap.xml"
     crawler = SitemapCrawler(
         sitemap_url=sitemap_url,
         output_file="site_content.txt",
         max_workers=3,  # Paralel işlem sayısını azalttım
-        delay=2  # Bekleme süresini artırdım
+        delay=2,  # Bekleme süresini artırdım
+        extractor=args.extractor,
+        parse_workers=args.parse_workers,
+        output_format=args.output_format,
+        ordered=args.ordered,
+        dedup=args.dedup,
+        dedup_threshold=args.dedup_threshold,
+        log_urls=args.log_urls,
+        metrics_path=args.metrics_path,
+        metrics_interval=args.metrics_interval,
+        max_concurrency=args.max_concurrency,
+        max_retries=args.retries
     )
-    crawler.crawl()
+    crawler.crawl(resume=args.resume)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file